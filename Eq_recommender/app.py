@@ -1,25 +1,95 @@
+import time
+
+_IMPORT_STARTED = time.perf_counter()
+
+import atexit
+import hashlib
+import importlib.util
+import json
 import os
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import List
 
-from flask import Flask, jsonify, request, send_from_directory
+import click
+from flask import Flask, abort, g, jsonify, request, stream_with_context
 from flask_sqlalchemy import SQLAlchemy
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import linear_kernel
-
-try:
-    from Sastrawi.Stemmer.StemmerFactory import StemmerFactory
-except ImportError:
-    StemmerFactory = None
+from sqlalchemy.orm import joinedload, load_only
+from sqlalchemy.schema import CreateIndex
+
+from data import storage
+from nlp.normalize import canonical_lookup, canonicalize, tokenize
+from nlp.stemming import LazyStemmer, StemCache
+from recommender.catalog_index import NO_FILTER, CandidateFilter, CatalogIndexHolder, TokenCache
+from recommender.shared_index import SharedIndexStore
+from recommender.sharding import ShardPool
+from utils.audit import AuditWriter
+from utils.metrics import finish_breakdown, registry, server_timing, stage, start_breakdown
+from utils.result_cache import ResultCache
+from utils.startup import lazy_import, record, render_report, timed
+from utils.static_assets import AssetBundle, build_asset
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DB_PATH = os.path.join(BASE_DIR, "app.db")
 
 app = Flask(__name__, static_folder="static", static_url_path="/static")
-app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{DB_PATH}"
+app.config["SQLALCHEMY_DATABASE_URI"] = os.environ.get("EQ_DATABASE_URI", f"sqlite:///{DB_PATH}")
 app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+# "default": SQLite bawaan. "production": WAL + pragmas (data/storage.py) dan pool untuk server multi-thread.
+app.config["STORAGE_PROFILE"] = os.environ.get("EQ_STORAGE_PROFILE", "default")
+app.config["SQLITE_MMAP_SIZE"] = int(os.environ["EQ_SQLITE_MMAP_SIZE"]) if "EQ_SQLITE_MMAP_SIZE" in os.environ else None
+app.config["SQLITE_CACHE_SIZE"] = int(os.environ["EQ_SQLITE_CACHE_SIZE"]) if "EQ_SQLITE_CACHE_SIZE" in os.environ else None
+app.config["SQLALCHEMY_ENGINE_OPTIONS"] = storage.engine_options(
+    app.config["STORAGE_PROFILE"],
+    app.config["SQLALCHEMY_DATABASE_URI"],
+    pool_size=int(os.environ.get("EQ_DB_POOL_SIZE", 10)),
+    max_overflow=int(os.environ.get("EQ_DB_MAX_OVERFLOW", 20)),
+)
+# "sync": user_input/rekomendasi di-commit di dalam request.
+# "async": ditulis belakangan oleh AuditWriter (write-behind, bulk insert).
+app.config["AUDIT_MODE"] = os.environ.get("EQ_AUDIT_MODE", "sync")
+app.config["AUDIT_QUEUE_MAX"] = int(os.environ.get("EQ_AUDIT_QUEUE_MAX", 10000))
+app.config["AUDIT_FLUSH_INTERVAL"] = float(os.environ.get("EQ_AUDIT_FLUSH_INTERVAL", 1.0))
+app.config["AUDIT_FLUSH_SIZE"] = int(os.environ.get("EQ_AUDIT_FLUSH_SIZE", 200))
+# Baris rekomendasi yang diaudit per query, terlepas dari top_k yang diminta (maks 1000).
+app.config["AUDIT_TOP_K"] = int(os.environ.get("EQ_AUDIT_TOP_K", 10))
+app.config["STEM_CACHE_PATH"] = os.environ.get("EQ_STEM_CACHE_PATH", os.path.join(BASE_DIR, "stem_cache.json"))
+app.config["STEM_CACHE_SIZE"] = int(os.environ.get("EQ_STEM_CACHE_SIZE", 50000))
+# startup() memuat scikit-learn/scipy, stemmer dan index sebelum request pertama; 0 = biarkan lazy.
+app.config["WARM_UP"] = os.environ.get("EQ_WARM_UP", "1") != "0"
+# Header Server-Timing untuk semua request; tanpa ini hanya request dengan header "X-Timing: 1".
+app.config["TIMING_HEADER"] = os.environ.get("EQ_TIMING_HEADER", "0") == "1"
+# Cache hasil /api/recommend; SIZE=0 mematikan. BUDGET_STEP > 1 membagi budget ke bucket
+# (hasil untuk budget lain di bucket yang sama ikut dipakai ulang).
+app.config["RESULT_CACHE_SIZE"] = int(os.environ.get("EQ_RESULT_CACHE_SIZE", 1024))
+app.config["RESULT_CACHE_TTL"] = float(os.environ.get("EQ_RESULT_CACHE_TTL", 300))
+app.config["RESULT_CACHE_BUDGET_STEP"] = int(os.environ.get("EQ_RESULT_CACHE_BUDGET_STEP", 1))
+app.config["RESULT_CACHE_PREWARM"] = int(os.environ.get("EQ_RESULT_CACHE_PREWARM", 0))
+# Mode ASGI (asgi.py): CONCURRENCY request rekomendasi diproses bersamaan, QUEUE lainnya
+# menunggu (sisanya langsung 503), TIMEOUT detik per request (504). Scoring berjalan di
+# pool CPU_WORKERS thread, SQLite/audit di pool IO_WORKERS thread.
+app.config["ASGI_CONCURRENCY"] = int(os.environ.get("EQ_ASGI_CONCURRENCY", 32))
+app.config["ASGI_QUEUE"] = int(os.environ.get("EQ_ASGI_QUEUE", 64))
+app.config["ASGI_TIMEOUT"] = float(os.environ.get("EQ_ASGI_TIMEOUT", 10))
+app.config["ASGI_CPU_WORKERS"] = int(os.environ.get("EQ_ASGI_CPU_WORKERS", os.cpu_count() or 2))
+app.config["ASGI_IO_WORKERS"] = int(os.environ.get("EQ_ASGI_IO_WORKERS", 8))
+# SHARDS > 1: katalog dengan >= SHARD_MIN_ROWS alat di-scoring paralel oleh proses shard.
+app.config["SCORING_SHARDS"] = int(os.environ.get("EQ_SCORING_SHARDS", 1))
+app.config["SHARD_MIN_ROWS"] = int(os.environ.get("EQ_SHARD_MIN_ROWS", 50000))
+# Folder index bersama (satu per database): diisi sekali lalu di-mmap oleh semua proses worker.
+# Kosong = tiap proses memuat katalog dan membangun index sendiri.
+app.config["SHARED_INDEX_DIR"] = os.environ.get("EQ_SHARED_INDEX_DIR", "")
+app.config["SHARED_INDEX_KEEP"] = int(os.environ.get("EQ_SHARED_INDEX_KEEP", 2))
 
 db = SQLAlchemy(app)
+with app.app_context():
+    storage.apply_pragmas(
+        db.engine,
+        storage.pragmas_for(
+            app.config["STORAGE_PROFILE"],
+            mmap_size=app.config["SQLITE_MMAP_SIZE"],
+            cache_size=app.config["SQLITE_CACHE_SIZE"],
+        ),
+    )
 
 
 class Category(db.Model):
@@ -41,6 +111,9 @@ class Alat(db.Model):
     rating_alat = db.Column(db.Float, nullable=False, default=0.0)
     gambar = db.Column(db.String(255), nullable=True)
 
+    # Untuk lookup nama case-insensitive: WHERE lower(nama_alat) = ?
+    __table_args__ = (db.Index("ix_alat_nama_lower", db.func.lower(nama_alat)),)
+
 
 class UserInput(db.Model):
     __tablename__ = "user_input"
@@ -49,14 +122,14 @@ class UserInput(db.Model):
     deskripsi_konten = db.Column(db.Text, nullable=True)
     budget = db.Column(db.Integer, nullable=False, default=0)
     lokasi = db.Column(db.String(100), nullable=True)
-    timestamp = db.Column(db.DateTime, default=datetime.utcnow)
+    timestamp = db.Column(db.DateTime, default=datetime.utcnow, index=True)
 
 
 class Rekomendasi(db.Model):
     __tablename__ = "rekomendasi"
     id_rekom = db.Column(db.Integer, primary_key=True)
-    id_input = db.Column(db.Integer, db.ForeignKey("user_input.id_input"), nullable=False)
-    id_alat = db.Column(db.Integer, db.ForeignKey("alat.id_alat"), nullable=False)
+    id_input = db.Column(db.Integer, db.ForeignKey("user_input.id_input"), nullable=False, index=True)
+    id_alat = db.Column(db.Integer, db.ForeignKey("alat.id_alat"), nullable=False, index=True)
     skor_kecocokan = db.Column(db.Float, nullable=False, default=0.0)
     alasan = db.Column(db.Text, nullable=True)
     timestamp = db.Column(db.DateTime, default=datetime.utcnow)
@@ -65,6 +138,74 @@ class Rekomendasi(db.Model):
     user_input = db.relationship("UserInput")
 
 
+class CatalogChange(db.Model):
+    """Append-only log of catalog writes; ``version`` is the catalog version after the change."""
+
+    __tablename__ = "catalog_change"
+    version = db.Column(db.Integer, primary_key=True)
+    id_alat = db.Column(db.Integer, nullable=False, index=True)
+    operasi = db.Column(db.String(10), nullable=False)  # "upsert" | "delete"
+    timestamp = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+_schema_ready = False
+
+
+def migrate_indexes():
+    """Create indexes declared on the models that an older database does not have yet.
+
+    ``create_all`` only creates indexes together with new tables, so databases
+    initialized before an index was added need this step.
+    """
+    # IF NOT EXISTS: refleksi SQLite tidak melihat index ekspresi seperti lower(nama_alat).
+    with db.engine.begin() as connection:
+        for table in db.metadata.sorted_tables:
+            for index in table.indexes:
+                connection.execute(CreateIndex(index, if_not_exists=True))
+
+
+def ensure_schema():
+    """Create tables and indexes added after the database was first initialized (idempotent)."""
+    global _schema_ready
+    if not _schema_ready:
+        db.create_all()
+        migrate_indexes()
+        _schema_ready = True
+
+
+@app.before_request
+def _ensure_schema_before_request():
+    ensure_schema()
+
+
+def record_catalog_change(id_alat: int, operasi: str = "upsert"):
+    db.session.add(CatalogChange(id_alat=id_alat, operasi=operasi))
+
+
+def catalog_version() -> int:
+    return db.session.query(db.func.max(CatalogChange.version)).scalar() or 0
+
+
+def catalog_generation():
+    """``(generation, row count)``: change-log version + row count + highest id + text pipeline.
+
+    The change log restarts at 0 after ``flask initdb`` or an import into a
+    fresh database; the row count and highest id still tell those catalogs apart.
+    """
+    count, max_id = db.session.query(db.func.count(Alat.id_alat), db.func.max(Alat.id_alat)).one()
+    return f"{catalog_version()}-{count}-{max_id or 0}-{TEXT_PIPELINE}", count
+
+
+def catalog_state():
+    """``(version, timestamp)`` of the latest catalog change; ``(0, None)`` if none."""
+    latest = (
+        db.session.query(CatalogChange.version, CatalogChange.timestamp)
+        .order_by(CatalogChange.version.desc())
+        .first()
+    )
+    return (latest.version, latest.timestamp) if latest else (0, None)
+
+
 STOPWORDS = {
     "dan", "yang", "untuk", "dengan", "di", "ke", "dari", "atau", "pada", "ini",
     "itu", "saat", "karena", "dalam", "agar", "bagi", "guna", "serta", "ada", "akan",
@@ -91,36 +232,45 @@ NEGATIVE_CUES = {
     "lowlight": {"low", "light", "lowlight", "gelap", "malam"},
 }
 
-stemmer = StemmerFactory().create_stemmer() if StemmerFactory else None
+
+
+def _sastrawi_stemmer():
+    factory = lazy_import("Sastrawi.Stemmer.StemmerFactory").StemmerFactory
+    with timed("init stemmer Sastrawi"):
+        return factory().create_stemmer()
+
+
+# Sastrawi diimpor dan kamus katanya dimuat pada stem pertama yang tidak ada di cache (atau di warm_up).
+stemmer = LazyStemmer(_sastrawi_stemmer) if importlib.util.find_spec("Sastrawi") else None
+stem_cache = StemCache(stemmer.stem, maxsize=app.config["STEM_CACHE_SIZE"]) if stemmer else None
+if stem_cache:
+    with timed("load stem cache"):
+        stem_cache.load(app.config["STEM_CACHE_PATH"])
+
+
+CANON_LOOKUP = canonical_lookup(CANON)
+# Sidik jari pipeline teks; ikut di kunci generasi index bersama supaya artifact yang
+# dibangun dengan stopword/sinonim/stemmer lain tidak dipakai.
+TEXT_PIPELINE = hashlib.sha1(
+    json.dumps(
+        [sorted(STOPWORDS), {key: sorted(value) for key, value in CANON.items()}, sorted(NEGATIVE_CUES["lowlight"]), bool(stemmer)]
+    ).encode()
+).hexdigest()[:8]
 
 
 def normalize_tokens(tokens: List[str]) -> List[str]:
-    normalized: List[str] = []
-    for tok in tokens:
-        placed = False
-        for canon, variants in CANON.items():
-            if tok in variants:
-                normalized.append(canon)
-                placed = True
-                break
-        if not placed:
-            normalized.append(tok)
-    return normalized
+    return canonicalize(tokens, CANON_LOOKUP)
+
+
+def normalized_tokens(text: str) -> List[str]:
+    """Tokenize, drop stopwords and map synonyms; everything except stemming."""
+    return normalize_tokens(tokenize(text, STOPWORDS))
 
 
 def preprocess_tokens(text: str) -> List[str]:
-    if not text:
-        return []
-    raw = text.lower()
-    tokens: List[str] = []
-    for token in raw.replace("/", " ").replace(",", " ").replace(".", " ").replace("-", " ").split():
-        clean = "".join(ch for ch in token if ch.isalnum())
-        if clean:
-            tokens.append(clean)
-    tokens = [t for t in tokens if t not in STOPWORDS]
-    tokens = normalize_tokens(tokens)
-    if stemmer:
-        tokens = [stemmer.stem(t) for t in tokens]
+    tokens = normalized_tokens(text)
+    if stem_cache:
+        tokens = [stem_cache.stem(t) for t in tokens]
     return [t for t in tokens if t]
 
 
@@ -140,6 +290,50 @@ def simple_preprocess(text: str) -> str:
     return " ".join(preprocess_tokens(text))
 
 
+shard_pool = ShardPool(app.config["SCORING_SHARDS"]) if app.config["SCORING_SHARDS"] > 1 else None
+if shard_pool is not None:
+    atexit.register(shard_pool.shutdown)
+shared_index = (
+    SharedIndexStore(app.config["SHARED_INDEX_DIR"], keep=app.config["SHARED_INDEX_KEEP"])
+    if app.config["SHARED_INDEX_DIR"]
+    else None
+)
+catalog_index = CatalogIndexHolder(
+    TokenCache(preprocess_tokens, detect_flags),
+    shard_pool=shard_pool,
+    shard_min_rows=app.config["SHARD_MIN_ROWS"],
+    store=shared_index,
+)
+result_cache = ResultCache(maxsize=app.config["RESULT_CACHE_SIZE"], ttl=app.config["RESULT_CACHE_TTL"])
+
+
+def invalidate_catalog(alat_id: int | None = None) -> None:
+    """Drop the fitted index and cached results after a catalog write."""
+    catalog_index.invalidate(alat_id)
+    result_cache.clear()
+
+
+def prewarm_stem_cache(save: bool = True) -> int:
+    """Stem the vocabulary of the current catalog ahead of the first request."""
+    if not stem_cache:
+        return 0
+    vocabulary = set()
+    for kebutuhan, deskripsi in db.session.query(Alat.kebutuhan_konten, Alat.deskripsi):
+        vocabulary.update(normalized_tokens(f"{kebutuhan} {deskripsi}"))
+    added = stem_cache.prewarm(sorted(vocabulary))
+    if save:
+        stem_cache.save(app.config["STEM_CACHE_PATH"])
+    return added
+
+
+def _save_stem_cache() -> None:
+    if stem_cache and stem_cache.misses:
+        stem_cache.save(app.config["STEM_CACHE_PATH"])
+
+
+atexit.register(_save_stem_cache)
+
+
 def seed_data():
     if Category.query.count() == 0:
         for name in ["Kamera", "Audio", "Pencahayaan", "Stabilisasi"]:
@@ -168,32 +362,174 @@ def seed_data():
         db.session.commit()
 
 
-def alat_to_dict(item: Alat):
-    return {
-        "id_alat": item.id_alat,
-        "id_kategori": item.id_kategori,
-        "nama_alat": item.nama_alat,
-        "deskripsi": item.deskripsi,
-        "kebutuhan_konten": item.kebutuhan_konten,
-        "harga_sewa": item.harga_sewa,
-        "stok": item.stok,
-        "rating_alat": item.rating_alat,
-        "gambar": item.gambar,
-        "kategori": item.kategori.nama_kategori if item.kategori else None,
-    }
+ALAT_FIELDS = (
+    "id_alat", "id_kategori", "nama_alat", "deskripsi", "kebutuhan_konten",
+    "harga_sewa", "stok", "rating_alat", "gambar", "kategori",
+)
+ALATS_PAGE_DEFAULT = 50
+ALATS_PAGE_MAX = 500
+
+
+def alat_to_dict(item: Alat, fields=ALAT_FIELDS):
+    data = {}
+    for field in fields:
+        if field == "kategori":
+            data[field] = item.kategori.nama_kategori if item.kategori else None
+        else:
+            data[field] = getattr(item, field)
+    return data
+
+
+def _int_arg(name: str):
+    raw = request.args.get(name)
+    if raw in (None, ""):
+        return None
+    try:
+        return int(raw)
+    except ValueError:
+        raise ValueError(f"Parameter {name} harus berupa angka")
+
+
+def list_alats():
+    """Keyset-paginated catalog listing: ``?cursor=<id_alat>&limit=&fields=`` plus filters."""
+    try:
+        limit = _int_arg("limit")
+        cursor = _int_arg("cursor")
+        id_kategori = _int_arg("id_kategori")
+        min_harga = _int_arg("min_harga")
+        max_harga = _int_arg("max_harga")
+        min_stok = _int_arg("min_stok")
+    except ValueError as exc:
+        return jsonify({"message": str(exc)}), 400
+    if limit is None:
+        limit = ALATS_PAGE_DEFAULT
+    elif not 1 <= limit <= ALATS_PAGE_MAX:
+        return jsonify({"message": f"Parameter limit harus antara 1 dan {ALATS_PAGE_MAX}"}), 400
+
+    try:
+        fields = _parse_fields()
+    except ValueError as exc:
+        return jsonify({"message": str(exc)}), 400
+
+    query = Alat.query
+    columns = [getattr(Alat, f) for f in fields if f != "kategori"]
+    query = query.options(load_only(Alat.id_alat, Alat.id_kategori, *columns))
+    if "kategori" in fields:
+        # kategori ikut di-join dalam query yang sama, bukan lazy load per baris (N+1)
+        query = query.options(joinedload(Alat.kategori).load_only(Category.nama_kategori))
+
+    if cursor is not None:
+        query = query.filter(Alat.id_alat < cursor)
+    if id_kategori is not None:
+        query = query.filter(Alat.id_kategori == id_kategori)
+    if request.args.get("kategori"):
+        query = query.join(Category, Alat.id_kategori == Category.id_kategori).filter(
+            Category.nama_kategori == request.args["kategori"]
+        )
+    if min_harga is not None:
+        query = query.filter(Alat.harga_sewa >= min_harga)
+    if max_harga is not None:
+        query = query.filter(Alat.harga_sewa <= max_harga)
+    if min_stok is not None:
+        query = query.filter(Alat.stok >= min_stok)
+
+    # versi dibaca sebelum data: perubahan sesudahnya pasti muncul di /api/alats/changes
+    version, last_modified = catalog_state()
+    # ETag memakai generasi (versi + jumlah + id max), bukan versi saja: log perubahan
+    # mulai lagi dari 0 setelah initdb, jadi ETag database lama tidak boleh dapat 304.
+    generation = catalog_generation()[0]
+    args_key = hashlib.sha1(request.query_string).hexdigest()[:12]
+
+    def build():
+        items = query.order_by(Alat.id_alat.desc()).limit(limit + 1).all()
+        next_cursor = items[limit - 1].id_alat if len(items) > limit else None
+        return jsonify({
+            "items": [alat_to_dict(i, fields) for i in items[:limit]],
+            "next_cursor": next_cursor,
+            "version": version,
+        })
+
+    return conditional_json(f"alats-{generation}-{args_key}", build, last_modified)
+
+
+def _parse_fields():
+    if not request.args.get("fields"):
+        return ALAT_FIELDS
+    fields = tuple(f.strip() for f in request.args["fields"].split(",") if f.strip())
+    unknown = [f for f in fields if f not in ALAT_FIELDS]
+    if unknown:
+        raise ValueError(f"Field tidak dikenal: {', '.join(unknown)}")
+    return fields
+
+
+@app.route("/api/alats/changes", methods=["GET"])
+def alats_changes():
+    """Rows upserted and ids deleted since ``?since=<version>``.
+
+    ``since`` newer than the change log (it restarts after ``flask initdb``)
+    answers ``reset: true`` and no delta; the client must reload the full list.
+    """
+    try:
+        since = _int_arg("since") or 0
+        fields = _parse_fields()
+    except ValueError as exc:
+        return jsonify({"message": str(exc)}), 400
+
+    latest = catalog_version()
+    if since > latest:
+        return jsonify({"version": latest, "reset": True, "upserted": [], "deleted": []})
+    changes = (
+        CatalogChange.query.filter(CatalogChange.version > since)
+        .order_by(CatalogChange.version)
+        .with_entities(CatalogChange.version, CatalogChange.id_alat, CatalogChange.operasi)
+        .all()
+    )
+    version = changes[-1].version if changes else latest
+    last_op = {}
+    for change in changes:
+        last_op[change.id_alat] = change.operasi
+
+    upsert_ids = [id_alat for id_alat, op in last_op.items() if op == "upsert"]
+    deleted = [id_alat for id_alat, op in last_op.items() if op == "delete"]
+    upserted = []
+    if upsert_ids:
+        query = Alat.query.filter(Alat.id_alat.in_(upsert_ids))
+        if "kategori" in fields:
+            query = query.options(joinedload(Alat.kategori))
+        found = query.order_by(Alat.id_alat.desc()).all()
+        upserted = [alat_to_dict(i, fields) for i in found]
+        # baris yang sudah hilang tanpa log delete tetap dilaporkan sebagai terhapus
+        deleted.extend(set(upsert_ids) - {i.id_alat for i in found})
+    return jsonify({"version": version, "reset": False, "upserted": upserted, "deleted": sorted(deleted)})
+
+
+def conditional_json(etag: str, build, last_modified=None):
+    """Answer ``304`` from the validators alone; call ``build()`` only when the client is stale."""
+    fresh = request.if_none_match.contains_weak(etag) if request.if_none_match else (
+        last_modified is not None
+        and request.if_modified_since is not None
+        and last_modified.replace(microsecond=0, tzinfo=timezone.utc) <= request.if_modified_since
+    )
+    response = app.response_class(status=304) if fresh else build()
+    response.set_etag(etag, weak=True)
+    if last_modified is not None:
+        response.last_modified = last_modified.replace(tzinfo=timezone.utc)
+    response.headers["Cache-Control"] = "no-cache"
+    return response
 
 
 @app.route("/api/categories", methods=["GET"])
 def list_categories():
     data = Category.query.order_by(Category.nama_kategori).all()
-    return jsonify([{"id_kategori": c.id_kategori, "nama_kategori": c.nama_kategori} for c in data])
+    payload = [{"id_kategori": c.id_kategori, "nama_kategori": c.nama_kategori} for c in data]
+    etag = hashlib.sha1(json.dumps(payload, sort_keys=True).encode()).hexdigest()[:16]
+    return conditional_json(f"kategori-{etag}", lambda: jsonify(payload))
 
 
 @app.route("/api/alats", methods=["GET", "POST"])
 def alats():
     if request.method == "GET":
-        items = Alat.query.order_by(Alat.id_alat.desc()).all()
-        return jsonify([alat_to_dict(i) for i in items])
+        return list_alats()
 
     payload = request.json or {}
     item = Alat(
@@ -207,7 +543,10 @@ def alats():
         gambar=payload.get("gambar"),
     )
     db.session.add(item)
+    db.session.flush()
+    record_catalog_change(item.id_alat)
     db.session.commit()
+    invalidate_catalog()
     return jsonify(alat_to_dict(item)), 201
 
 
@@ -216,110 +555,567 @@ def alats_detail(alat_id):
     item = Alat.query.get_or_404(alat_id)
     if request.method == "DELETE":
         db.session.delete(item)
+        record_catalog_change(alat_id, "delete")
         db.session.commit()
+        invalidate_catalog(alat_id)
         return "", 204
 
     payload = request.json or {}
     for field in ["id_kategori", "nama_alat", "deskripsi", "kebutuhan_konten", "harga_sewa", "stok", "rating_alat", "gambar"]:
         if field in payload:
             setattr(item, field, payload[field])
+    record_catalog_change(alat_id)
     db.session.commit()
+    invalidate_catalog(alat_id)
     return jsonify(alat_to_dict(item))
 
 
-@app.route("/api/recommend", methods=["POST"])
-def recommend():
-    payload = request.json or {}
-    jenis_konten = payload.get("jenis_konten", "")
-    deskripsi_konten = payload.get("deskripsi_konten", "")
-    budget = int(payload.get("budget", 0))
-    lokasi = payload.get("lokasi", "")
-
-    user_text = f"{jenis_konten} {deskripsi_konten}"
-    user_input = UserInput(
-        jenis_konten=jenis_konten,
-        deskripsi_konten=deskripsi_konten,
-        budget=budget,
-        lokasi=lokasi,
-    )
-    db.session.add(user_input)
-    db.session.commit()
+RECOMMEND_TOP_K = 10
+RECOMMEND_TOP_K_MAX = 1000
+RECOMMEND_BATCH_MAX = 200
+# Mode NDJSON batch: query di-ranking per potongan ini lalu langsung dikirim.
+RECOMMEND_STREAM_CHUNK = 16
+# "ids": id + skor saja; "summary": + komponen skor dan ringkasan alat; "full": seperti sebelumnya.
+DETAIL_LEVELS = ("ids", "summary", "full")
+SUMMARY_FIELDS = ("id_alat", "nama_alat", "harga_sewa", "stok", "rating_alat")
+NDJSON_MIMETYPE = "application/x-ndjson"
 
-    alat_list: List[Alat] = Alat.query.all()
-    if not alat_list:
-        return jsonify({"message": "No alat available"}), 400
+RESULTS = registry.counter("eq_recommend_results_total", "Alat yang dikembalikan sebagai rekomendasi.")
+CATALOG_SIZE = registry.gauge("eq_catalog_size", "Jumlah alat pada katalog yang terakhir di-scoring.")
 
-    alat_tokens_list = [preprocess_tokens(f"{a.kebutuhan_konten} {a.deskripsi}") for a in alat_list]
-    user_tokens = preprocess_tokens(user_text)
-    user_flags = detect_flags(user_tokens)
 
-    corpus = [" ".join(tokens) for tokens in alat_tokens_list]
-    corpus.append(" ".join(user_tokens))
+class CatalogRows:
+    """Stand-in for the full ``Alat`` list: the catalog generation and row count.
 
-    vectorizer = TfidfVectorizer(ngram_range=(1, 2), min_df=1)
-    tfidf = vectorizer.fit_transform(corpus)
-    user_vec = tfidf[-1]
-    alat_vecs = tfidf[:-1]
+    A request only reads these two values; the index is looked up by the
+    generation, ``Alat`` rows are fetched by id for the ranked results, and
+    the whole table is loaded only when a new generation has to be built.
+    """
 
-    sims = linear_kernel(user_vec, alat_vecs).flatten()
-    user_set = set(user_tokens)
+    def __init__(self, generation: str, count: int) -> None:
+        self.generation = generation
+        self.count = count
 
-    results = []
-    for idx, (alat, sim) in enumerate(zip(alat_list, sims)):
-        alat_tokens = alat_tokens_list[idx]
-        alat_set = set(alat_tokens)
-        overlap = 0.0 if not user_set else len(user_set & alat_set) / len(user_set)
+    def __len__(self) -> int:
+        return self.count
 
-        if overlap <= 0 and sim < 0.02:
-            continue
+    def load(self) -> List[Alat]:
+        return Alat.query.order_by(Alat.id_alat).all()
 
-        alat_flags = detect_flags(alat_tokens)
+    def fetch(self, index, positions) -> dict:
+        ids = {int(index.ids[position]): position for position in positions}
+        if not ids:
+            return {}
+        rows = Alat.query.options(joinedload(Alat.kategori)).filter(Alat.id_alat.in_(list(ids))).all()
+        return {ids[row.id_alat]: row for row in rows}
 
-        penalty = 0.0
-        if user_flags.get("outdoor") and not user_flags.get("lowlight") and alat_flags.get("lowlight"):
-            penalty = 0.15
 
-        budget_factor = 1.0 if budget <= 0 else max(0.25, min(1.0, (budget - alat.harga_sewa) / max(budget, 1)))
-        score = float(sim * 0.6 + overlap * 0.25 + alat.rating_alat * 0.05 + budget_factor * 0.1 - penalty)
+def load_catalog() -> CatalogRows:
+    with stage("load"):
+        rows = CatalogRows(*catalog_generation())
+    CATALOG_SIZE.set(len(rows))
+    return rows
 
-        if budget <= 0 or alat.harga_sewa <= budget * 1.2:
-            results.append((alat, score, sim, budget_factor, overlap, penalty, alat_flags))
 
-    results.sort(key=lambda x: x[1], reverse=True)
-    top_results = results[:10]
+def scoring_index(rows: CatalogRows):
+    """The index of ``rows.generation``: attached from the shared store or fitted in-process."""
+    return catalog_index.get(rows.generation, rows.load)
+
+
+def catalog_rows(index, rows: CatalogRows, positions) -> dict:
+    """``position -> Alat`` for the ranked ``positions``."""
+    with stage("load"):
+        return rows.fetch(index, positions)
+
+
+def parse_recommend_payload(payload: dict) -> dict:
+    """Query fields of one recommendation; ``ValueError`` carries the 400 message."""
+    try:
+        budget = int(payload.get("budget", 0))
+    except (TypeError, ValueError):
+        raise ValueError("budget harus berupa angka")
+    return {
+        "jenis_konten": payload.get("jenis_konten", ""),
+        "deskripsi_konten": payload.get("deskripsi_konten", ""),
+        "budget": budget,
+        "lokasi": payload.get("lokasi", ""),
+    }
+
+
+def parse_response_options(payload: dict) -> dict:
+    """``detail``, ``top_k`` and ``format`` from the query string or the JSON body.
+
+    ``format`` defaults to NDJSON when the client sends ``Accept: application/x-ndjson``.
+    """
+    def option(name, default):
+        value = request.args.get(name)
+        return payload.get(name, default) if value in (None, "") else value
+
+    detail = option("detail", "full")
+    if detail not in DETAIL_LEVELS:
+        raise ValueError(f"detail harus salah satu dari: {', '.join(DETAIL_LEVELS)}")
+    try:
+        top_k = int(option("top_k", RECOMMEND_TOP_K))
+    except (TypeError, ValueError):
+        raise ValueError("top_k harus berupa angka")
+    if not 1 <= top_k <= RECOMMEND_TOP_K_MAX:
+        raise ValueError(f"top_k harus antara 1 dan {RECOMMEND_TOP_K_MAX}")
+    accepts_ndjson = request.accept_mimetypes.best == NDJSON_MIMETYPE
+    output = option("format", "ndjson" if accepts_ndjson else "json")
+    if output not in ("json", "ndjson"):
+        raise ValueError("format harus json atau ndjson")
+    return {"detail": detail, "top_k": top_k, "ndjson": output == "ndjson"}
+
+
+def parse_recommend_filters(payload: dict) -> CandidateFilter:
+    """Optional pre-filters: ``in_stock`` (stok > 0) and ``id_kategori`` (one id or a list).
+
+    ``ValueError`` carries the 400 message.
+    """
+    kategori = payload.get("id_kategori")
+    if kategori is None or kategori == "":
+        kategori = []
+    elif not isinstance(kategori, list):
+        kategori = [kategori]
+    try:
+        categories = frozenset(int(k) for k in kategori)
+    except (TypeError, ValueError):
+        raise ValueError("id_kategori harus berupa angka atau list angka")
+    return CandidateFilter(in_stock=bool(payload.get("in_stock")), categories=categories)
+
+
+def query_tokens(query: dict) -> List[str]:
+    return preprocess_tokens(f"{query['jenis_konten']} {query['deskripsi_konten']}")
+
+
+def rank_queries(
+    index, alat_list, queries: List[dict], token_lists=None, filters=None, top_k: int = RECOMMEND_TOP_K
+):
+    if token_lists is None:
+        with stage("tokenize"):
+            token_lists = [query_tokens(query) for query in queries]
+    scoring_input = [
+        (user_tokens, detect_flags(user_tokens), query["budget"]) for query, user_tokens in zip(queries, token_lists)
+    ]
+    scored = index.score_many(scoring_input, top_k=top_k, filters=filters)
+    rows = catalog_rows(index, alat_list, {item.position for items in scored for item in items})
+    ranked = [
+        [
+            (
+                rows[item.position],
+                item.score,
+                item.sim,
+                item.budget_factor,
+                item.overlap,
+                item.penalty,
+                index.flags(item.position),
+            )
+            for item in items
+            # Baris yang terhapus setelah generasi index dibaca dilewati.
+            if item.position in rows
+        ]
+        for items in scored
+    ]
+    RESULTS.inc(sum(len(top_results) for top_results in ranked))
+    return ranked
 
-    for alat, score, sim, budget_factor, overlap, penalty, alat_flags in top_results:
-        alasan = (
-            f"similarity={sim:.2f}, overlap={overlap:.2f}, rating={alat.rating_alat}, "
-            f"budget_factor={budget_factor:.2f}, penalty={penalty:.2f}, flags={alat_flags}"
-        )
-        rec = Rekomendasi(
-            id_input=user_input.id_input,
-            id_alat=alat.id_alat,
-            skor_kecocokan=score,
-            alasan=alasan,
-        )
-        db.session.add(rec)
-    db.session.commit()
 
-    response = [
+def rekomendasi_rows(top_results) -> List[dict]:
+    """Audit rows for the first ``AUDIT_TOP_K`` results; ``alasan`` is formatted only when the row is written."""
+    return [
         {
-            "alat": alat_to_dict(alat),
-            "skor": score,
-            "sim": sim,
-            "budget_factor": budget_factor,
-            "overlap": overlap,
-            "penalty": penalty,
-            "alat_flags": alat_flags,
+            "id_alat": alat.id_alat,
+            "skor_kecocokan": score,
+            "penjelasan": (sim, overlap, alat.rating_alat, budget_factor, penalty, alat_flags),
         }
-        for alat, score, sim, budget_factor, overlap, penalty, alat_flags in top_results
+        for alat, score, sim, budget_factor, overlap, penalty, alat_flags in top_results[: app.config["AUDIT_TOP_K"]]
     ]
-    return jsonify(response)
+
+
+def format_alasan(sim, overlap, rating, budget_factor, penalty, alat_flags) -> str:
+    return (
+        f"similarity={sim:.2f}, overlap={overlap:.2f}, rating={rating}, "
+        f"budget_factor={budget_factor:.2f}, penalty={penalty:.2f}, flags={alat_flags}"
+    )
+
+
+def rekomendasi_model(row: dict, **columns) -> Rekomendasi:
+    return Rekomendasi(
+        id_alat=row["id_alat"],
+        skor_kecocokan=row["skor_kecocokan"],
+        alasan=format_alasan(*row["penjelasan"]),
+        **columns,
+    )
+
+
+def commit_user_input(query: dict) -> UserInput:
+    user_input = UserInput(**query)
+    with stage("commit"):
+        db.session.add(user_input)
+        db.session.commit()
+    return user_input
+
+
+def commit_rekomendasi(user_input: UserInput, rows: List[dict]) -> None:
+    with stage("commit"):
+        db.session.add_all(rekomendasi_model(row, id_input=user_input.id_input) for row in rows)
+        db.session.commit()
+
+
+def submit_audit(query: dict, rows: List[dict]) -> None:
+    audit_writer.submit({"user_input": dict(query, timestamp=datetime.utcnow()), "rekomendasi": rows})
+
+
+def write_audit_records(records: List[dict]) -> None:
+    """Persist ``{"user_input": {...}, "rekomendasi": [...]}`` records in one commit."""
+    user_inputs = [UserInput(**entry["user_input"]) for entry in records]
+    db.session.add_all(user_inputs)
+    db.session.flush()
+    for user_input, entry in zip(user_inputs, records):
+        db.session.add_all(
+            rekomendasi_model(row, id_input=user_input.id_input, timestamp=user_input.timestamp)
+            for row in entry["rekomendasi"]
+        )
+    db.session.commit()
+
+
+def _flush_audit_in_context(records: List[dict]) -> None:
+    with app.app_context(), stage("commit", path="audit"):
+        try:
+            write_audit_records(records)
+        except Exception:
+            db.session.rollback()
+            raise
+
+
+audit_writer = AuditWriter(
+    _flush_audit_in_context,
+    max_queue=app.config["AUDIT_QUEUE_MAX"],
+    flush_interval=app.config["AUDIT_FLUSH_INTERVAL"],
+    flush_size=app.config["AUDIT_FLUSH_SIZE"],
+)
+
+
+def audit_async() -> bool:
+    if app.config["AUDIT_MODE"] != "async":
+        return False
+    audit_writer.start()
+    return True
+
+
+atexit.register(audit_writer.stop)
+
+
+def audit_batch(queries: List[dict], ranked) -> None:
+    """Audit a ranked batch: queued in async mode, otherwise one bulk transaction."""
+    now = datetime.utcnow()
+    records = [
+        {"user_input": dict(query, timestamp=now), "rekomendasi": rekomendasi_rows(top_results)}
+        for query, top_results in zip(queries, ranked)
+    ]
+    if audit_async():
+        for entry in records:
+            audit_writer.submit(entry)
+    else:
+        with stage("commit"):
+            write_audit_records(records)
+
+
+def result_to_dict(result, detail: str = "full") -> dict:
+    alat, score, sim, budget_factor, overlap, penalty, alat_flags = result
+    if detail == "ids":
+        return {"id_alat": alat.id_alat, "skor": score}
+    item = {
+        "alat": alat_to_dict(alat, SUMMARY_FIELDS if detail == "summary" else ALAT_FIELDS),
+        "skor": score,
+        "sim": sim,
+        "budget_factor": budget_factor,
+        "overlap": overlap,
+        "penalty": penalty,
+    }
+    if detail == "full":
+        item["alat_flags"] = alat_flags
+    return item
+
+
+def results_to_dicts(top_results, detail: str = "full") -> List[dict]:
+    return [result_to_dict(result, detail) for result in top_results]
+
+
+def ndjson_response(lines):
+    """``lines`` (an iterable of JSON-able objects) as one JSON document per line, written as they are produced."""
+    def generate():
+        for line in lines:
+            yield app.json.dumps(line) + "\n"
+
+    return app.response_class(stream_with_context(generate()), mimetype=NDJSON_MIMETYPE)
+
+
+def budget_bucket(budget: int) -> int:
+    step = app.config["RESULT_CACHE_BUDGET_STEP"]
+    return budget if step <= 1 else budget // step * step
+
+
+def cached_recommendation(
+    query: dict, filters: CandidateFilter = NO_FILTER, detail: str = "full", top_k: int = RECOMMEND_TOP_K
+):
+    """``(response items, rekomendasi rows)`` for one query, or ``None`` if the catalog is empty.
+
+    Keyed by the normalized token sequence (order matters for the TF-IDF
+    bigrams), the budget bucket, ``detail``/``top_k`` and the catalog generation
+    read *before* the catalog is loaded, so a cached entry is never older
+    than its key.
+    """
+    with stage("tokenize"):
+        user_tokens = query_tokens(query)
+    key = recommendation_key(query, user_tokens, filters, detail, top_k)
+    cached = result_cache.get(key)
+    if cached is not None:
+        return cached
+
+    alat_list = load_catalog()
+    if not alat_list:
+        return None
+    result = compute_recommendation(alat_list, query, user_tokens, filters, detail, top_k)
+    result_cache.put(key, result)
+    return result
+
+
+def recommendation_key(query: dict, user_tokens: List[str], filters: CandidateFilter, detail: str, top_k: int):
+    return (tuple(user_tokens), budget_bucket(query["budget"]), filters, detail, top_k, catalog_generation()[0])
+
+
+def compute_recommendation(
+    alat_list, query: dict, user_tokens: List[str], filters: CandidateFilter, detail: str, top_k: int
+):
+    # Index di-fit sekali per versi katalog; per request hanya query yang di-transform.
+    index = scoring_index(alat_list)
+    top_results = rank_queries(index, alat_list, [query], [user_tokens], [filters], top_k=top_k)[0]
+    with stage("serialize"):
+        return results_to_dicts(top_results, detail), rekomendasi_rows(top_results)
+
+
+def prewarm_result_cache(limit: int) -> int:
+    """Fill ``result_cache`` with the ``limit`` most frequent queries in ``user_input``."""
+    frequent = (
+        db.session.query(UserInput.jenis_konten, UserInput.deskripsi_konten, UserInput.budget)
+        .group_by(UserInput.jenis_konten, UserInput.deskripsi_konten, UserInput.budget)
+        .order_by(db.func.count().desc())
+        .limit(limit)
+        .all()
+    )
+    for jenis_konten, deskripsi_konten, budget in frequent:
+        query = {"jenis_konten": jenis_konten, "deskripsi_konten": deskripsi_konten or "", "budget": budget or 0, "lokasi": ""}
+        if cached_recommendation(query) is None:
+            return 0
+    return len(frequent)
+
+
+def parse_recommend_request():
+    """``(query, filters, options)`` of a single recommendation request; ``ValueError`` carries the 400 message.
+
+    Shared by ``/api/recommend`` here and in ``asgi.py``; :func:`parse_batch_request`
+    validates each query of a batch with the same functions.
+    """
+    payload = request.json or {}
+    if not isinstance(payload, dict):
+        raise ValueError("Body harus berupa objek query")
+    options = parse_response_options(payload)
+    return parse_recommend_payload(payload), parse_recommend_filters(payload), options
+
+
+@app.route("/api/recommend", methods=["POST"])
+def recommend():
+    try:
+        query, filters, options = parse_recommend_request()
+    except ValueError as exc:
+        return jsonify({"message": str(exc)}), 400
+    write_behind = audit_async()
+
+    if not write_behind:
+        user_input = commit_user_input(query)
+
+    result = cached_recommendation(query, filters, options["detail"], options["top_k"])
+    if result is None:
+        if write_behind:
+            submit_audit(query, [])
+        return jsonify({"message": "No alat available"}), 400
+    items, rows = result
+
+    # Audit tetap ditulis juga saat hasil diambil dari cache.
+    if write_behind:
+        submit_audit(query, rows)
+    else:
+        commit_rekomendasi(user_input, rows)
+
+    if options["ndjson"]:
+        # Hasil satu query sudah lengkap (dan di-cache); NDJSON di sini hanya format, bukan streaming.
+        return ndjson_response(items)
+    return jsonify(items)
+
+
+def parse_batch_request():
+    """``(queries, filters, options)`` of a batch request; ``ValueError`` carries the 400 message."""
+    payload = request.json
+    body = payload if isinstance(payload, dict) else {}
+    if isinstance(payload, dict):
+        payload = payload.get("queries")
+    if not isinstance(payload, list) or not all(isinstance(item, dict) for item in payload):
+        raise ValueError("Body harus berupa list query atau {\"queries\": [...]}")
+    if len(payload) > RECOMMEND_BATCH_MAX:
+        raise ValueError(f"Maksimal {RECOMMEND_BATCH_MAX} query per batch")
+    options = parse_response_options(body)
+    queries = [parse_recommend_payload(item) for item in payload]
+    filters = [parse_recommend_filters(item) for item in payload]
+    return queries, filters, options
+
+
+@app.route("/api/recommend/batch", methods=["POST"])
+def recommend_batch():
+    """Rank a list of queries; with ``format=ndjson`` each result line is sent as soon as its chunk is ranked."""
+    try:
+        queries, filters, options = parse_batch_request()
+    except ValueError as exc:
+        return jsonify({"message": str(exc)}), 400
+
+    alat_list = load_catalog()
+    if not alat_list:
+        return jsonify({"message": "No alat available"}), 400
+
+    index = scoring_index(alat_list)
+
+    def rank_and_audit(start: int, stop: int):
+        ranked = rank_queries(index, alat_list, queries[start:stop], filters=filters[start:stop], top_k=options["top_k"])
+        # Semua user_input dan rekomendasi (per potongan saat streaming) ditulis dalam satu transaksi bulk.
+        audit_batch(queries[start:stop], ranked)
+        return ranked
+
+    if options["ndjson"]:
+        def lines():
+            for start in range(0, len(queries), RECOMMEND_STREAM_CHUNK):
+                ranked = rank_and_audit(start, start + RECOMMEND_STREAM_CHUNK)
+                for offset, top_results in enumerate(ranked):
+                    yield {"index": start + offset, "results": results_to_dicts(top_results, options["detail"])}
+
+        return ndjson_response(lines())
+
+    ranked = rank_and_audit(0, len(queries))
+    with stage("serialize"):
+        return jsonify([results_to_dicts(top_results, options["detail"]) for top_results in ranked])
+
+
+# Kunci stats() yang hanya naik diekspor sebagai counter eq_<sumber>_<kunci>_total, sisanya gauge.
+STAT_COUNTERS = {
+    "hits": "Lookup yang ditemukan di cache",
+    "misses": "Lookup yang tidak ada di cache",
+    "evictions": "Entri yang dibuang karena cache penuh",
+    "expired": "Entri yang dibuang karena TTL habis",
+    "submitted": "Record audit yang masuk antrean",
+    "dropped": "Record audit yang dibuang karena antrean penuh",
+    "written": "Record audit yang berhasil ditulis",
+    "failed": "Record audit yang gagal ditulis",
+    "flushes": "Batch audit yang berhasil ditulis",
+    "builds": "Index katalog yang dibangun oleh proses ini",
+    "attaches": "Generasi index bersama yang di-attach oleh proses ini",
+}
+STAT_GAUGES = {
+    "size": "Jumlah entri saat ini",
+    "queue_depth": "Record audit yang menunggu di antrean",
+    "hit_rate": "Rasio hit sejak proses start",
+}
+
+
+def _collect_stats() -> None:
+    """Copy the caches' and audit writer's own ``stats()`` into counters (running totals) and gauges."""
+    sources = {
+        "token_cache": catalog_index.token_cache.stats(),
+        "audit": audit_writer.stats(),
+        "catalog_index": {"builds": catalog_index.builds, "attaches": catalog_index.attaches},
+        "result_cache": result_cache.stats(),
+    }
+    if stem_cache:
+        sources["stem_cache"] = stem_cache.stats()
+    for prefix, stats in sources.items():
+        for key, value in stats.items():
+            if not isinstance(value, (int, float)):
+                continue
+            if key in STAT_COUNTERS:
+                registry.counter(f"eq_{prefix}_{key}_total", f"{STAT_COUNTERS[key]} ({prefix}).").set(value)
+            else:
+                registry.gauge(f"eq_{prefix}_{key}", f"{STAT_GAUGES.get(key, key)} ({prefix}).").set(value)
+
+
+registry.add_collector(_collect_stats)
+
+
+@app.before_request
+def _start_timing():
+    if app.config["TIMING_HEADER"] or request.headers.get("X-Timing") == "1":
+        g.timing = start_breakdown()
+
+
+@app.after_request
+def _add_timing_header(response):
+    token = g.pop("timing", None)
+    if token is not None:
+        breakdown = finish_breakdown(token)
+        if breakdown:
+            response.headers["Server-Timing"] = server_timing(breakdown)
+            response.headers["X-Timing"] = response.headers["Server-Timing"]
+    return response
+
+
+@app.route("/api/metrics", methods=["GET"])
+def metrics():
+    return app.response_class(registry.render(), mimetype="text/plain; version=0.0.4")
+
+
+ASSET_MAX_AGE = 365 * 24 * 3600
+static_assets = AssetBundle(app.static_folder, ["app.js", "styles.css"])
+_index_cache = {}
+
+
+def send_asset(asset, cache_control: str):
+    body, encoding = asset.negotiate(request.headers.get("Accept-Encoding", ""))
+    etag = f"{asset.etag}-{encoding}" if encoding else asset.etag
+    if etag in request.if_none_match:
+        response = app.response_class(status=304)
+    else:
+        response = app.response_class(body, mimetype=asset.mimetype)
+        if encoding:
+            response.headers["Content-Encoding"] = encoding
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = cache_control
+    response.vary.add("Accept-Encoding")
+    return response
+
+
+def index_asset():
+    """index.html with asset URLs rewritten to their fingerprinted ``/assets/`` names."""
+    assets = static_assets.assets()
+    path = os.path.join(app.static_folder, "index.html")
+    key = (os.stat(path).st_mtime_ns, tuple(a.fingerprinted for a in assets.values()))
+    if key not in _index_cache:
+        with open(path, "rb") as handle:
+            html = handle.read()
+        for asset in assets.values():
+            html = html.replace(f"/static/{asset.name}".encode(), f"/assets/{asset.fingerprinted}".encode())
+        _index_cache.clear()
+        _index_cache[key] = build_asset("index.html", html)
+    return _index_cache[key]
 
 
 @app.route("/")
 def index():
-    return send_from_directory(app.static_folder, "index.html")
+    return send_asset(index_asset(), "no-cache")
+
+
+@app.route("/assets/<path:filename>")
+def fingerprinted_asset(filename):
+    asset = static_assets.by_fingerprint(filename)
+    if asset is None:
+        abort(404)
+    return send_asset(asset, f"public, max-age={ASSET_MAX_AGE}, immutable")
 
 
 @app.cli.command("initdb")
@@ -330,8 +1126,120 @@ def initdb():
     print("Database initialized with seed data")
 
 
-if __name__ == "__main__":
+@app.cli.command("warm-stems")
+def warm_stems():
+    if not stem_cache:
+        print("Sastrawi tidak terpasang; stemming dilewati")
+        return
+    added = prewarm_stem_cache()
+    print(f"Stem cache: {added} token baru, {stem_cache.stats()['size']} total -> {app.config['STEM_CACHE_PATH']}")
+
+
+@app.cli.command("build-index")
+@click.option("--dir", "directory", default=None, help="Folder artifact (default: EQ_SHARED_INDEX_DIR atau ./index).")
+@click.option("--kits/--no-kits", default=False, help="Juga bangun artifact kit dari data/equipment_data.csv.")
+@click.option("--force", is_flag=True, help="Bangun ulang walaupun artifact untuk versi katalog ini sudah ada.")
+def build_index(directory, kits, force):
+    """Tokenize, stem and fit the whole catalog into an on-disk index artifact."""
+    global shared_index
+    directory = directory or app.config["SHARED_INDEX_DIR"] or os.path.join(BASE_DIR, "index")
+    shared_index = catalog_index.store = SharedIndexStore(directory, keep=app.config["SHARED_INDEX_KEEP"])
+    ensure_schema()
+    started = time.perf_counter()
+    stems = prewarm_stem_cache()
+    rows = load_catalog()
+    if force:
+        shared_index.discard(rows.generation)
+        catalog_index.invalidate()  # generasi yang sudah di-attach di proses ini juga dibangun ulang
+    scoring_index(rows)
+    problems = shared_index.verify(rows.generation)
+    if problems:
+        raise click.ClickException("Artifact tidak valid: " + "; ".join(problems))
+    path = shared_index.path(rows.generation)
+    size = sum(item.stat().st_size for item in path.iterdir())
+    print(
+        f"Index {rows.generation}: {len(rows)} alat, {stems} stem baru, {size / 1024:.0f} KiB "
+        f"dalam {time.perf_counter() - started:.2f} s -> {path}"
+        + ("" if catalog_index.builds else " (sudah ada)")
+    )
+    if kits:
+        from recommender.kit_catalog import build_artifact
+
+        started = time.perf_counter()
+        kit_dir = os.path.join(directory, "kits")
+        count = build_artifact(kit_dir)
+        print(f"Kit: {count} kit dalam {time.perf_counter() - started:.2f} s -> {kit_dir}")
+    configured = app.config["SHARED_INDEX_DIR"]
+    if not configured or os.path.abspath(directory) != os.path.abspath(configured):
+        print(f"Set EQ_SHARED_INDEX_DIR={directory} supaya server memuat artifact ini saat start.")
+
+
+def load_index_artifact() -> None:
+    """Attach the prebuilt index at startup; rebuild it when it is stale or corrupt."""
+    if shared_index is None:
+        return
+    started = time.perf_counter()
+    rows = load_catalog()
+    if not len(rows):
+        return
+    problems = shared_index.verify(rows.generation)
+    if problems:
+        published = shared_index.generations()
+        if shared_index.path(rows.generation).exists():
+            with shared_index.lock():
+                # Worker lain mungkin sudah membangunnya ulang selama kita menunggu lock.
+                if shared_index.verify(rows.generation):
+                    shared_index.discard(rows.generation)
+            print(f"Index {rows.generation} rusak ({'; '.join(problems)}); dibangun ulang")
+        elif published:
+            print(f"Index {published[0]} tidak cocok dengan katalog ({rows.generation}); dibangun ulang")
+        else:
+            print(f"Index {rows.generation} belum ada; dibangun sekarang")
+    scoring_index(rows)
+    action = "dibangun" if problems else "dimuat"
+    print(f"Index {rows.generation} {action} dalam {(time.perf_counter() - started) * 1000:.1f} ms")
+
+
+# Diimpor lazy oleh catalog_index/shared_index; warm_up memuatnya sebelum request pertama.
+HEAVY_MODULES = ("scipy.sparse", "sklearn.feature_extraction.text", "sklearn.preprocessing")
+
+
+def warm_up() -> None:
+    """Load what the first recommendation would otherwise pay for: scikit-learn, the stemmer and the index."""
+    for name in HEAVY_MODULES:
+        lazy_import(name)
+    if stemmer:
+        stemmer.load()
+    if shared_index is None:
+        alat_list = load_catalog()
+        if alat_list:
+            with timed("fit index katalog"):
+                scoring_index(alat_list)
+
+
+def startup() -> None:
+    """Schema, seed data and cache pre-warming done once before serving (``app.run`` or ASGI)."""
     with app.app_context():
-        db.create_all()
-        seed_data()
+        with timed("schema + seed"):
+            ensure_schema()
+            seed_data()
+        if app.config["WARM_UP"]:
+            warm_up()
+        if stem_cache:
+            with timed("prewarm stem cache"):
+                prewarm_stem_cache()
+        if shared_index is not None:
+            with timed("index artifact"):
+                load_index_artifact()
+        if app.config["RESULT_CACHE_PREWARM"]:
+            with timed("prewarm result cache"):
+                prewarm_result_cache(app.config["RESULT_CACHE_PREWARM"])
+    print(render_report())
+
+
+record("import app", time.perf_counter() - _IMPORT_STARTED)
+
+
+if __name__ == "__main__":
+    startup()
     app.run(debug=True, port=5000)
@@ -0,0 +1,428 @@
+"""ASGI entry point serving the same routes as ``app.py`` from an asyncio event loop.
+
+    uvicorn asgi:application --port 5000
+
+``POST /api/recommend`` dan ``POST /api/recommend/batch`` ditangani langsung di
+event loop: query SQLite dan audit di-``await`` lewat pool thread IO, sedangkan
+tokenisasi, fit index dan scoring dijalankan di pool thread CPU (dengan
+``EQ_SCORING_SHARDS`` scoring tetap diteruskan ke proses shard). Route lain
+diteruskan ke app Flask (WSGI) di pool IO.
+
+Backpressure: paling banyak ``EQ_ASGI_CONCURRENCY`` request rekomendasi jalan
+bersamaan dan ``EQ_ASGI_QUEUE`` menunggu; sisanya langsung dijawab ``503``.
+Request yang melewati ``EQ_ASGI_TIMEOUT`` detik dijawab ``504``.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import io
+import json
+import logging
+import sys
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Tuple
+
+from flask import jsonify
+
+import app as flask_app
+from app import app
+from utils.metrics import registry, stage
+
+logger = logging.getLogger(__name__)
+
+REJECTED = registry.counter("eq_asgi_rejected_total", "Request rekomendasi yang ditolak karena antrean penuh (503).")
+TIMEOUTS = registry.counter("eq_asgi_timeouts_total", "Request rekomendasi yang melewati EQ_ASGI_TIMEOUT (504).")
+
+cpu_pool = ThreadPoolExecutor(app.config["ASGI_CPU_WORKERS"], thread_name_prefix="eq-cpu")
+io_pool = ThreadPoolExecutor(app.config["ASGI_IO_WORKERS"], thread_name_prefix="eq-io")
+
+
+class Overloaded(Exception):
+    """No slot became free and the waiting queue is full."""
+
+
+class Limiter:
+    """At most ``concurrency`` requests run at once and at most ``queue`` wait for a slot."""
+
+    def __init__(self, concurrency: int, queue: int) -> None:
+        self.concurrency = max(1, concurrency)
+        self.queue = max(0, queue)
+        self.running = 0
+        self.waiting = 0
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+
+    async def acquire(self, timeout: float) -> None:
+        if not self._semaphore.locked():
+            # Slot bebas: acquire tidak menunggu, jadi tidak ada request lain yang menyelip.
+            await self._semaphore.acquire()
+            self.running += 1
+            return
+        if self.waiting >= self.queue:
+            raise Overloaded
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout)
+        except asyncio.TimeoutError:
+            raise Overloaded
+        finally:
+            self.waiting -= 1
+        self.running += 1
+
+    def release(self) -> None:
+        self.running -= 1
+        self._semaphore.release()
+
+
+limiter = Limiter(app.config["ASGI_CONCURRENCY"], app.config["ASGI_QUEUE"])
+
+
+def _collect_limiter() -> None:
+    registry.gauge("eq_asgi_in_flight", "Request rekomendasi yang sedang diproses.").set(limiter.running)
+    registry.gauge("eq_asgi_waiting", "Request rekomendasi yang menunggu slot.").set(limiter.waiting)
+
+
+registry.add_collector(_collect_limiter)
+
+
+class RequestScope:
+    """The Flask request context of one request, shared by the event loop and the pools.
+
+    The steps of a request run one after another, so its
+    :class:`contextvars.Context` is entered either on the loop (:meth:`run`)
+    or in a pool thread (:meth:`offload`), never both at once. Flask's
+    ``request``/``g``, the SQLAlchemy session and the ``stage`` breakdown
+    therefore behave as in a WSGI request.
+    """
+
+    def __init__(self, environ: dict, deadline: float) -> None:
+        self.context = contextvars.copy_context()
+        self.deadline = deadline
+        self._pending: Future | None = None
+        self._request_context = app.request_context(environ)
+        self.run(self._request_context.push)
+
+    def run(self, fn: Callable, *args):
+        return self.context.run(fn, *args)
+
+    async def offload(self, pool: ThreadPoolExecutor, fn: Callable, *args):
+        remaining = self.deadline - asyncio.get_running_loop().time()
+        if remaining <= 0:
+            raise asyncio.TimeoutError
+        self._pending = pool.submit(self.context.run, fn, *args)
+        return await asyncio.wait_for(asyncio.wrap_future(self._pending), remaining)
+
+    @property
+    def busy(self) -> bool:
+        """A pool thread is still running inside :attr:`context` (its request timed out)."""
+        return self._pending is not None and not self._pending.done()
+
+    def close(self) -> None:
+        if self.busy:
+            # Thread pool masih memakai context ini; pop setelah future-nya selesai.
+            loop = asyncio.get_running_loop()
+            self._pending.add_done_callback(lambda _: self._pop_later(loop))
+            return
+        self.run(self._request_context.pop)
+
+    def _pop_later(self, loop: asyncio.AbstractEventLoop) -> None:
+        # Dipanggil di thread pool setelah context.run selesai, jadi context sudah bebas.
+        if not loop.is_closed():
+            try:
+                loop.call_soon_threadsafe(self.run, self._request_context.pop)
+                return
+            except RuntimeError:  # loop ditutup di antara pengecekan dan penjadwalan
+                pass
+        self.run(self._request_context.pop)
+
+
+Handler = Callable[[RequestScope], Awaitable[Tuple[object, AsyncIterator | None]]]
+
+
+def _message(text: str, status: int = 400):
+    return jsonify({"message": text}), status
+
+
+def _timeout_response():
+    """``504`` built without the request scope, which a timed-out pool thread may still be using."""
+    body = json.dumps({"message": "Waktu pemrosesan habis"}, separators=(",", ":")) + "\n"
+    return app.response_class(body, status=504, mimetype="application/json")
+
+
+def _tokenize(query: dict) -> List[str]:
+    with stage("tokenize"):
+        return flask_app.query_tokens(query)
+
+
+async def _recommendation(scope: RequestScope, query: dict, filters, options: dict):
+    """:func:`app.cached_recommendation` split into awaited IO and offloaded CPU steps."""
+    detail, top_k = options["detail"], options["top_k"]
+    user_tokens = await scope.offload(cpu_pool, _tokenize, query)
+    key = await scope.offload(io_pool, flask_app.recommendation_key, query, user_tokens, filters, detail, top_k)
+    cached = flask_app.result_cache.get(key)
+    if cached is not None:
+        return cached
+    alat_list = await scope.offload(io_pool, flask_app.load_catalog)
+    if not alat_list:
+        return None
+    result = await scope.offload(
+        cpu_pool, flask_app.compute_recommendation, alat_list, query, user_tokens, filters, detail, top_k
+    )
+    flask_app.result_cache.put(key, result)
+    return result
+
+
+async def _lines(items: List[dict]) -> AsyncIterator[dict]:
+    for item in items:
+        yield item
+
+
+def _ndjson():
+    return app.response_class(mimetype=flask_app.NDJSON_MIMETYPE)
+
+
+async def recommend(scope: RequestScope):
+    try:
+        query, filters, options = scope.run(flask_app.parse_recommend_request)
+    except ValueError as exc:
+        return scope.run(_message, str(exc)), None
+    write_behind = scope.run(flask_app.audit_async)
+
+    if not write_behind:
+        user_input = await scope.offload(io_pool, flask_app.commit_user_input, query)
+
+    result = await _recommendation(scope, query, filters, options)
+    if result is None:
+        if write_behind:
+            flask_app.submit_audit(query, [])
+        return scope.run(_message, "No alat available"), None
+    items, rows = result
+
+    if write_behind:
+        flask_app.submit_audit(query, rows)
+    else:
+        await scope.offload(io_pool, flask_app.commit_rekomendasi, user_input, rows)
+
+    if options["ndjson"]:
+        return scope.run(_ndjson), _lines(items)
+    return await scope.offload(cpu_pool, jsonify, items), None
+
+
+def _rank_chunk(index, alat_list, queries: List[dict], filters, options: dict):
+    ranked = flask_app.rank_queries(index, alat_list, queries, filters=filters, top_k=options["top_k"])
+    with stage("serialize"):
+        return ranked, [flask_app.results_to_dicts(top_results, options["detail"]) for top_results in ranked]
+
+
+async def recommend_batch(scope: RequestScope):
+    try:
+        queries, filters, options = scope.run(flask_app.parse_batch_request)
+    except ValueError as exc:
+        return scope.run(_message, str(exc)), None
+
+    alat_list = await scope.offload(io_pool, flask_app.load_catalog)
+    if not alat_list:
+        return scope.run(_message, "No alat available"), None
+    index = await scope.offload(cpu_pool, flask_app.scoring_index, alat_list)
+
+    async def ranked_chunks(chunk: int):
+        for start in range(0, len(queries), chunk):
+            stop = start + chunk
+            ranked, results = await scope.offload(cpu_pool, _rank_chunk, index, alat_list, queries[start:stop], filters[start:stop], options)
+            await scope.offload(io_pool, flask_app.audit_batch, queries[start:stop], ranked)
+            yield start, results
+
+    if options["ndjson"]:
+        async def lines():
+            async for start, results in ranked_chunks(flask_app.RECOMMEND_STREAM_CHUNK):
+                for offset, items in enumerate(results):
+                    yield {"index": start + offset, "results": items}
+
+        return scope.run(_ndjson), lines()
+
+    results = [items async for _, chunk in ranked_chunks(max(1, len(queries))) for items in chunk]
+    return await scope.offload(cpu_pool, jsonify, results), None
+
+
+ROUTES: Dict[Tuple[str, str], Handler] = {
+    ("POST", "/api/recommend"): recommend,
+    ("POST", "/api/recommend/batch"): recommend_batch,
+}
+
+
+def _handle_exception(exc: Exception):
+    """Flask's own error handling: registered handlers / HTTP errors, otherwise a logged 500."""
+    try:
+        return app.make_response(app.handle_user_exception(exc))
+    except Exception as error:  # noqa: BLE001 - sama seperti Flask.full_dispatch_request
+        return app.handle_exception(error)
+
+
+async def _respond(scope: RequestScope, handler: Handler):
+    lines = None
+    try:
+        rv = scope.run(app.preprocess_request)
+        if rv is None:
+            rv, lines = await handler(scope)
+        response = scope.run(app.make_response, rv)
+    except asyncio.TimeoutError:
+        TIMEOUTS.inc()
+        if scope.busy:
+            # after_request (process_response) juga butuh context; dilewati selama thread belum selesai.
+            return _timeout_response(), None
+        lines = None
+        response = _timeout_response()
+    except Exception as exc:  # noqa: BLE001 - diteruskan ke error handler Flask
+        lines = None
+        response = scope.run(_handle_exception, exc)
+    return scope.run(app.process_response, response), lines
+
+
+async def _send_response(send, response, lines: AsyncIterator | None) -> None:
+    if lines is not None:
+        response.headers.pop("Content-Length", None)
+    headers = [(key.lower().encode("latin-1"), value.encode("latin-1")) for key, value in response.headers.items()]
+    await send({"type": "http.response.start", "status": response.status_code, "headers": headers})
+    if lines is None:
+        await send({"type": "http.response.body", "body": response.get_data()})
+        return
+    try:
+        async for line in lines:
+            body = (app.json.dumps(line) + "\n").encode("utf-8")
+            await send({"type": "http.response.body", "body": body, "more_body": True})
+    except asyncio.TimeoutError:
+        # Header sudah terkirim; stream dihentikan dan klien melihat baris yang kurang.
+        TIMEOUTS.inc()
+        logger.warning("Stream NDJSON dihentikan: melewati EQ_ASGI_TIMEOUT")
+    except Exception:
+        logger.exception("Stream NDJSON gagal")
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def _dispatch(handler: Handler, environ: dict, send) -> None:
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + app.config["ASGI_TIMEOUT"]
+    try:
+        await limiter.acquire(deadline - loop.time())
+    except Overloaded:
+        REJECTED.inc()
+        body = b'{"message": "Server sedang sibuk, coba lagi"}\n'
+        headers = [(b"content-type", b"application/json"), (b"retry-after", b"1")]
+        await send({"type": "http.response.start", "status": 503, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
+        return
+    scope = RequestScope(environ, deadline)
+    try:
+        response, lines = await _respond(scope, handler)
+        await _send_response(send, response, lines)
+    finally:
+        scope.close()
+        limiter.release()
+
+
+def _call_wsgi(environ: dict):
+    started: Dict[str, object] = {}
+
+    def start_response(status, headers, exc_info=None):
+        started["status"] = int(status.split(" ", 1)[0])
+        started["headers"] = headers
+
+    result = app(environ, start_response)
+    try:
+        body = b"".join(result)
+    finally:
+        if hasattr(result, "close"):
+            result.close()
+    return started["status"], started["headers"], body
+
+
+async def _wsgi(environ: dict, send) -> None:
+    """Route lain (CRUD, static, metrics) dijalankan oleh app Flask di pool IO."""
+    status, headers, body = await asyncio.get_running_loop().run_in_executor(io_pool, _call_wsgi, environ)
+    headers = [(key.lower().encode("latin-1"), value.encode("latin-1")) for key, value in headers]
+    await send({"type": "http.response.start", "status": status, "headers": headers})
+    await send({"type": "http.response.body", "body": body})
+
+
+def _environ(scope: dict, path: str, body: bytes) -> dict:
+    server = scope.get("server") or ("localhost", 80)
+    client = scope.get("client") or ("", 0)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", "").encode("utf-8").decode("latin-1"),
+        "PATH_INFO": path.encode("utf-8").decode("latin-1"),
+        "QUERY_STRING": scope.get("query_string", b"").decode("latin-1"),
+        "SERVER_NAME": server[0],
+        "SERVER_PORT": str(server[1]),
+        "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+        "REMOTE_ADDR": client[0],
+        "REMOTE_PORT": str(client[1]),
+        "CONTENT_LENGTH": str(len(body)),
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": io.BytesIO(body),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": False,
+        "wsgi.run_once": False,
+    }
+    for raw_name, raw_value in scope.get("headers", []):
+        name = raw_name.decode("latin-1").upper().replace("-", "_")
+        value = raw_value.decode("latin-1")
+        if name == "CONTENT_LENGTH":
+            continue
+        key = name if name == "CONTENT_TYPE" else f"HTTP_{name}"
+        environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+
+async def _read_body(receive) -> bytes:
+    chunks = []
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            break
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body"):
+            break
+    return b"".join(chunks)
+
+
+async def _lifespan(receive, send) -> None:
+    loop = asyncio.get_running_loop()
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            try:
+                await loop.run_in_executor(io_pool, flask_app.startup)
+            except Exception as exc:  # noqa: BLE001 - dilaporkan ke server ASGI
+                logger.exception("Startup gagal")
+                await send({"type": "lifespan.startup.failed", "message": str(exc)})
+                return
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await loop.run_in_executor(io_pool, flask_app.audit_writer.stop)
+            if flask_app.shard_pool is not None:
+                flask_app.shard_pool.shutdown()
+            cpu_pool.shutdown(wait=False)
+            io_pool.shutdown(wait=False)
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def application(scope: dict, receive, send) -> None:
+    if scope["type"] == "lifespan":
+        await _lifespan(receive, send)
+        return
+    if scope["type"] != "http":
+        return
+    path = scope["path"]
+    root_path = scope.get("root_path", "")
+    if root_path and path.startswith(root_path):
+        path = path[len(root_path):]
+    environ = _environ(scope, path, await _read_body(receive))
+    handler = ROUTES.get((scope["method"], path))
+    if handler is None:
+        await _wsgi(environ, send)
+    else:
+        await _dispatch(handler, environ, send)
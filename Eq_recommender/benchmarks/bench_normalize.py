@@ -0,0 +1,140 @@
+"""Micro-benchmark: shared ``nlp.normalize`` vs. the previous per-module tokenizers.
+
+Parser lama hanya mencocokkan kata tunggal; hasil grup :class:`nlp.normalize.PhraseMatcher`
+dicek terhadap pencocokan frasa naif (:func:`reference_hits`), waktunya tetap
+dibandingkan dengan parser lama.
+
+Jalankan dari folder ``Eq_recommender``::
+
+    python -m benchmarks.bench_normalize
+"""
+from __future__ import annotations
+
+import random
+import timeit
+from typing import Iterable, List, Set, Tuple
+
+import app
+from nlp import parser
+
+SAMPLE_WORDS = sorted(
+    set(app.STOPWORDS)
+    | {v for variants in app.CANON.values() for v in variants}
+    | {v for variants in parser.CANON.values() for v in variants}
+    | {"kamera", "mirrorless", "gimbal", "lampu", "drone", "jalan-jalan", "siang,", "malam.", "vlog/travel", "4k!"}
+)
+
+
+# --- implementasi lama (sebelum nlp.normalize), disalin apa adanya ---
+def legacy_tokenize(text: str, stopwords) -> List[str]:
+    raw = text.lower()
+    tokens: List[str] = []
+    for token in raw.replace("/", " ").replace(",", " ").replace(".", " ").replace("-", " ").split():
+        clean = "".join(ch for ch in token if ch.isalnum())
+        if clean:
+            tokens.append(clean)
+    return [t for t in tokens if t not in stopwords]
+
+
+def legacy_app_normalize(text: str) -> List[str]:
+    normalized: List[str] = []
+    for tok in legacy_tokenize(text, app.STOPWORDS):
+        placed = False
+        for canon, variants in app.CANON.items():
+            if tok in variants:
+                normalized.append(canon)
+                placed = True
+                break
+        if not placed:
+            normalized.append(tok)
+    return normalized
+
+
+def _contains_any(tokens: Iterable[str], keywords: Iterable[str]) -> bool:
+    return bool(set(tokens) & set(keywords))
+
+
+def _canonical_hits(tokens: Iterable[str], mapping: dict) -> List[str]:
+    return [canon for canon, variants in mapping.items() if _contains_any(tokens, variants)]
+
+
+def legacy_parse_preferences(text: str):
+    tokens = legacy_tokenize(text, parser.STOPWORDS)
+    pref = parser.Preference()
+    pref.environment.extend(_canonical_hits(tokens, {
+        k: v for k, v in parser.CANON.items() if k in {"outdoor", "indoor", "hybrid"}
+    }))
+    pref.focus.extend(_canonical_hits(tokens, {
+        k: v for k, v in parser.CANON.items() if k not in {"outdoor", "indoor", "hybrid"}
+    }))
+    for label, words in parser.BUDGET_KEYWORDS.items():
+        if _contains_any(tokens, words):
+            pref.budget = label
+    for label, words in parser.MOBILITY_KEYWORDS.items():
+        if _contains_any(tokens, words):
+            pref.mobility = label
+    for label, words in parser.EXPERTISE_KEYWORDS.items():
+        if _contains_any(tokens, words):
+            pref.expertise = label
+    pref.audio_priority = _contains_any(tokens, parser.AUDIO_FLAGS)
+    pref.stabilization_priority = _contains_any(tokens, parser.STAB_FLAGS)
+    if _contains_any(tokens, parser.DAYLIGHT_TOKENS):
+        pref.lighting = "daylight"
+    elif _contains_any(tokens, parser.LOWLIGHT_TOKENS):
+        pref.lighting = "lowlight"
+    pref.environment = parser.normalize_tags(pref.environment)
+    pref.focus = parser.normalize_tags(pref.focus)
+    return pref
+
+
+def reference_hits(tokens: List[str]) -> Set[Tuple[str, str]]:
+    """Naive matching: a keyword hits when its tokens occur consecutively in ``tokens``."""
+    text = f" {' '.join(tokens)} "
+    hits = set()
+    for family, labels in parser.KEYWORD_GROUPS.items():
+        for label, keywords in labels.items():
+            for keyword in keywords:
+                words = parser._tokenize(keyword)
+                if words and f" {' '.join(words)} " in text:
+                    hits.add((family, label))
+    return hits
+
+
+def make_queries(count: int, seed: int = 7, max_words: int = 40) -> List[str]:
+    rng = random.Random(seed)
+    return [" ".join(rng.choices(SAMPLE_WORDS, k=rng.randint(3, max_words))) for _ in range(count)]
+
+
+def _bench(label: str, fn, queries: List[str], repeat: int) -> float:
+    best = min(timeit.repeat(lambda: [fn(q) for q in queries], number=1, repeat=repeat))
+    per_query_us = best / len(queries) * 1e6
+    print(f"{label:<40} {per_query_us:8.2f} us/query")
+    return best
+
+
+def main(count: int = 2000, repeat: int = 5) -> None:
+    queries = make_queries(count)
+
+    for q in queries:
+        assert app.normalized_tokens(q) == legacy_app_normalize(q), q
+        tokens = parser._tokenize(q)
+        assert parser.KEYWORD_MATCHER.hits(tokens) == reference_hits(tokens), q
+    print(f"{count} query acak: output lama dan baru identik\n")
+
+    old = _bench("app: legacy tokenize + CANON scan", legacy_app_normalize, queries, repeat)
+    new = _bench("app: nlp.normalize", app.normalized_tokens, queries, repeat)
+    print(f"{'speedup':<40} {old / new:8.2f}x\n")
+
+    old = _bench("parser: legacy parse_preferences", legacy_parse_preferences, queries, repeat)
+    new = _bench("parser: PhraseMatcher", parser.parse_preferences, queries, repeat)
+    print(f"{'speedup':<40} {old / new:8.2f}x\n")
+
+    # Deskripsi bebas yang panjang: waktu harus tetap linear terhadap jumlah token.
+    long_queries = make_queries(max(1, count // 20), seed=11, max_words=2000)
+    old = _bench("parser: legacy, ~1000 kata", legacy_parse_preferences, long_queries, repeat)
+    new = _bench("parser: PhraseMatcher, ~1000 kata", parser.parse_preferences, long_queries, repeat)
+    print(f"{'speedup':<40} {old / new:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""Compare two ``benchmarks.run`` JSON reports stage by stage.
+
+    python -m benchmarks.compare benchmarks/results/base.json benchmarks/results/head.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+
+METRICS = ("p50_ms", "p95_ms", "p99_ms", "throughput_per_s", "peak_rss_mb")
+
+
+def _index(report: dict) -> dict:
+    return {(row["stage"], row["size"]): row for row in report["results"]}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Bandingkan dua hasil benchmark.")
+    parser.add_argument("base", type=Path)
+    parser.add_argument("head", type=Path)
+    args = parser.parse_args()
+
+    base = json.loads(args.base.read_text(encoding="utf-8"))
+    head = json.loads(args.head.read_text(encoding="utf-8"))
+    print(f"base={base['meta']['commit']} head={head['meta']['commit']}")
+
+    base_rows, head_rows = _index(base), _index(head)
+    for key in sorted(base_rows.keys() & head_rows.keys(), key=lambda k: (k[1], k[0])):
+        stage, size = key
+        parts = []
+        for metric in METRICS:
+            old, new = base_rows[key][metric], head_rows[key][metric]
+            change = (new - old) / old * 100 if old else 0.0
+            parts.append(f"{metric}={new:.3f} ({change:+.1f}%)")
+        print(f"{size:>8} {stage:<42} " + " ".join(parts))
+
+
+if __name__ == "__main__":
+    main()
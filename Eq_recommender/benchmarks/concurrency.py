@@ -0,0 +1,134 @@
+"""Concurrent read/write benchmark comparing SQLite storage profiles.
+
+    python -m benchmarks.concurrency --profiles default,production --threads 8 --requests 100
+
+Setiap profile dijalankan di proses terpisah (konfigurasi dibaca saat ``app``
+diimpor) dengan database sementara sendiri. Thread mencampur
+``POST /api/recommend`` (menulis ``user_input``/``rekomendasi``) dan
+``GET /api/alats``; cache hasil dimatikan supaya yang diukur adalah storage.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from benchmarks.run import WORK_DIR, git_commit, summarize
+
+
+def worker(size: str, threads: int, requests: int, read_ratio: float, seed: int) -> Dict:
+    import app as flask_app
+    import import_equipment
+    from benchmarks import synthetic
+
+    with flask_app.app.app_context():
+        flask_app.db.drop_all()
+        flask_app.db.create_all()
+        csv_path = synthetic.write_csv(WORK_DIR / f"alat_{size}.csv", synthetic.alat_rows(synthetic.parse_size(size), seed))
+        import_equipment.import_data(csv_path, chunk_size=5000)
+
+    payloads = synthetic.recommend_payloads(threads * requests, seed)
+    # Fit index sekali di depan agar semua thread mengukur kondisi hangat.
+    flask_app.app.test_client().post("/api/recommend", json=payloads[0])
+
+    samples: Dict[str, List[float]] = {"recommend": [], "list_alats": []}
+    errors: List[str] = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(threads)
+
+    def run(thread_id: int) -> None:
+        client = flask_app.app.test_client()
+        rng = random.Random(seed + thread_id)
+        local = {"recommend": [], "list_alats": []}
+        barrier.wait()
+        for i in range(requests):
+            if rng.random() < read_ratio:
+                kind = "list_alats"
+                call = lambda: client.get("/api/alats?limit=50")
+            else:
+                kind = "recommend"
+                call = lambda: client.post("/api/recommend", json=payloads[thread_id * requests + i])
+            started = time.perf_counter()
+            try:
+                response = call()
+                if response.status_code >= 500:
+                    errors.append(f"{kind}: HTTP {response.status_code}")
+            except Exception as exc:  # noqa: BLE001 - error dihitung, benchmark jalan terus
+                errors.append(f"{kind}: {exc}")
+            local[kind].append(time.perf_counter() - started)
+        with lock:
+            for kind, values in local.items():
+                samples[kind].extend(values)
+
+    started = time.perf_counter()
+    pool = [threading.Thread(target=run, args=(t,)) for t in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    wall = time.perf_counter() - started
+
+    size_rows = synthetic.parse_size(size)
+    results = [summarize(kind, size_rows, values) for kind, values in samples.items() if values]
+    return {
+        "profile": flask_app.app.config["STORAGE_PROFILE"],
+        "wall_seconds": wall,
+        "requests_per_s": threads * requests / wall,
+        "errors": len(errors),
+        "error_samples": sorted(set(errors))[:5],
+        "results": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Bandingkan storage profile SQLite di bawah beban konkuren.")
+    parser.add_argument("--profiles", default="default,production")
+    parser.add_argument("--size", default="1k", help="ukuran katalog sintetis (1k, 10k, ...)")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=100, help="request per thread")
+    parser.add_argument("--read-ratio", type=float, default=0.3, help="porsi GET /api/alats")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", type=Path, default=None)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(worker(args.size, args.threads, args.requests, args.read_ratio, args.seed)))
+        return
+
+    WORK_DIR.mkdir(parents=True, exist_ok=True)
+    runs = []
+    for profile in [p.strip() for p in args.profiles.split(",") if p.strip()]:
+        env = dict(
+            os.environ,
+            EQ_STORAGE_PROFILE=profile,
+            EQ_DATABASE_URI=f"sqlite:///{WORK_DIR / f'concurrency_{profile}.db'}",
+            EQ_RESULT_CACHE_SIZE="0",
+        )
+        command = [
+            sys.executable, "-m", "benchmarks.concurrency", "--worker",
+            "--size", args.size, "--threads", str(args.threads), "--requests", str(args.requests),
+            "--read-ratio", str(args.read_ratio), "--seed", str(args.seed),
+        ]
+        output = subprocess.run(command, env=env, check=True, capture_output=True, text=True).stdout
+        report = json.loads(output.strip().splitlines()[-1])
+        runs.append(report)
+        print(f"== {profile}: {report['requests_per_s']:.1f} req/s, {report['errors']} error")
+        for row in report["results"]:
+            print(f"  {row['stage']:<12} p50={row['p50_ms']:.2f}ms p95={row['p95_ms']:.2f}ms p99={row['p99_ms']:.2f}ms")
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        meta = {"commit": git_commit(), "threads": args.threads, "requests": args.requests, "size": args.size, "seed": args.seed}
+        args.output.write_text(json.dumps({"meta": meta, "runs": runs}, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""Reproducible benchmark runner; writes JSON results that can be compared across commits.
+
+Jalankan dari folder ``Eq_recommender``::
+
+    python -m benchmarks.run --sizes 1k,10k --queries 200 --output benchmarks/results/head.json
+    python -m benchmarks.compare benchmarks/results/base.json benchmarks/results/head.json
+
+Database sementara dipakai lewat ``EQ_DATABASE_URI``, jadi ``app.db`` tidak tersentuh.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List
+
+WORK_DIR = Path(tempfile.gettempdir()) / "eq_bench"
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+
+def peak_rss_mb() -> float:
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux melaporkan KiB, macOS byte.
+    return usage / (1024 * 1024) if sys.platform == "darwin" else usage / 1024
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    rank = (len(ordered) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize(stage: str, size: int, samples: List[float], **extra) -> Dict:
+    total = sum(samples)
+    return {
+        "stage": stage,
+        "size": size,
+        "n": len(samples),
+        "p50_ms": percentile(samples, 50) * 1000,
+        "p95_ms": percentile(samples, 95) * 1000,
+        "p99_ms": percentile(samples, 99) * 1000,
+        "mean_ms": statistics.fmean(samples) * 1000 if samples else 0.0,
+        "throughput_per_s": len(samples) / total if total else 0.0,
+        "peak_rss_mb": peak_rss_mb(),
+        **extra,
+    }
+
+
+def timed(fn: Callable, inputs: Iterable) -> List[float]:
+    samples = []
+    for item in inputs:
+        started = time.perf_counter()
+        fn(item)
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def hit_rate(cache, before: Dict[str, float]) -> float:
+    """Result-cache hit rate since the ``before`` snapshot of ``cache.stats()``."""
+    after = cache.stats()
+    hits = after["hits"] - before["hits"]
+    lookups = hits + after["misses"] - before["misses"]
+    return hits / lookups if lookups else 0.0
+
+
+def run(sizes: List[str], query_count: int, seed: int, cache: bool = False) -> Dict:
+    WORK_DIR.mkdir(parents=True, exist_ok=True)
+    db_path = WORK_DIR / "bench.db"
+    os.environ["EQ_DATABASE_URI"] = f"sqlite:///{db_path}"
+    if not cache:
+        # Query sintetis hanya menghasilkan sedikit preferensi berbeda; dengan cache yang diukur hanyalah cache hit.
+        os.environ["EQ_RESULT_CACHE_SIZE"] = "0"
+
+    # Impor setelah EQ_DATABASE_URI diset supaya app memakai database benchmark.
+    import app as flask_app
+    import import_equipment
+    from benchmarks import synthetic
+    from nlp.parser import parse_preferences
+    from recommender import engine
+    from recommender.kit_catalog import KitCatalog
+
+    queries = synthetic.query_corpus(query_count, seed)
+    payloads = synthetic.recommend_payloads(query_count, seed)
+    results = []
+
+    for label in sizes:
+        size = synthetic.parse_size(label)
+        print(f"== {label} ({size} baris)")
+
+        alat_csv = synthetic.write_csv(WORK_DIR / f"alat_{label}.csv", synthetic.alat_rows(size, seed))
+        kit_csv = synthetic.write_csv(WORK_DIR / f"kits_{label}.csv", synthetic.kit_rows(size, seed))
+
+        with flask_app.app.app_context():
+            flask_app.db.drop_all()
+            flask_app.db.create_all()
+            started = time.perf_counter()
+            stats = import_equipment.import_data(alat_csv, chunk_size=5000)
+            elapsed = time.perf_counter() - started
+            results.append(summarize("import_equipment.import_data", size, [elapsed], rows_per_s=size / elapsed, **(stats or {})))
+
+            texts = [f"{row['kebutuhan_konten']} {row['deskripsi']}" for row in synthetic.alat_rows(min(size, 5000), seed)]
+            results.append(summarize("app.preprocess_tokens", size, timed(flask_app.preprocess_tokens, texts)))
+
+        flask_app.invalidate_catalog()
+        flask_app.catalog_index.token_cache.invalidate()
+        client = flask_app.app.test_client()
+        started = time.perf_counter()
+        client.post("/api/recommend", json=payloads[0])
+        cold = time.perf_counter() - started
+        before = flask_app.result_cache.stats()
+        samples = timed(lambda payload: client.post("/api/recommend", json=payload), payloads)
+        results.append(
+            summarize("app.recommend", size, samples, cold_ms=cold * 1000, cache_hit_rate=hit_rate(flask_app.result_cache, before))
+        )
+
+        engine.catalog = KitCatalog(kit_csv)
+        started = time.perf_counter()
+        engine.catalog.snapshot()
+        cold = time.perf_counter() - started
+        before = engine.result_cache.stats()
+        samples = timed(lambda text: engine.recommend_from_text(f"{text} travel outdoor"), queries)
+        results.append(
+            summarize(
+                "recommender.engine.recommend_from_text",
+                size,
+                samples,
+                cold_ms=cold * 1000,
+                cache_hit_rate=hit_rate(engine.result_cache, before),
+            )
+        )
+
+        results.append(summarize("nlp.parser.parse_preferences", size, timed(parse_preferences, queries)))
+
+        for row in results[-5:]:
+            hits = f" cache_hit={row['cache_hit_rate']:.0%}" if "cache_hit_rate" in row else ""
+            print(f"  {row['stage']:<42} p50={row['p50_ms']:.3f}ms p95={row['p95_ms']:.3f}ms "
+                  f"p99={row['p99_ms']:.3f}ms rss={row['peak_rss_mb']:.0f}MB{hits}")
+
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": seed,
+            "queries": query_count,
+            "sizes": sizes,
+            "result_cache": cache,
+        },
+        "results": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1k,10k", help="daftar ukuran katalog: 1k,10k,100k,1m atau angka")
+    parser.add_argument("--queries", type=int, default=200, help="jumlah query per tahap")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", type=Path, default=None, help="file JSON hasil (default: results/<commit>.json)")
+    parser.add_argument("--cache", action="store_true", help="biarkan cache hasil app/engine aktif (hit rate ikut dilaporkan)")
+    args = parser.parse_args()
+
+    report = run([s.strip() for s in args.sizes.split(",") if s.strip()], args.queries, args.seed, cache=args.cache)
+    output = args.output or RESULTS_DIR / f"{report['meta']['commit']}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"Hasil ditulis ke {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""Load test comparing the threaded ``app.run`` server with the ASGI mode (``asgi.py``).
+
+    python -m benchmarks.serving --modes wsgi,asgi --size 10k --clients 32 --requests 50
+
+Katalog sintetis diimpor sekali ke database sementara, lalu tiap mode
+dijalankan sebagai proses server terpisah di port lokal: ``wsgi`` memakai
+``app.run(threaded=True)`` (seperti ``python app.py`` tanpa debug/reloader),
+``asgi`` memakai ``uvicorn asgi:application`` (``pip install uvicorn``).
+``--clients`` thread mengirim ``POST /api/recommend`` lewat koneksi
+keep-alive; cache hasil dimatikan supaya yang diukur adalah scoring.
+Status ``503``/``504`` dari backpressure mode ASGI ikut dihitung.
+"""
+from __future__ import annotations
+
+import argparse
+import http.client
+import importlib.util
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List
+
+from benchmarks.run import WORK_DIR, git_commit, summarize
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def server_command(mode: str, port: int) -> List[str]:
+    if mode == "wsgi":
+        return [sys.executable, "-m", "benchmarks.serving", "--serve", "--port", str(port)]
+    return [
+        sys.executable, "-m", "uvicorn", "asgi:application",
+        "--port", str(port), "--log-level", "warning", "--no-access-log",
+    ]
+
+
+def wait_ready(port: int, process: subprocess.Popen, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f"Server berhenti dengan kode {process.returncode}")
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=2)
+            connection.request("GET", "/api/categories")
+            if connection.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise SystemExit("Server tidak siap dalam batas waktu")
+
+
+def load(port: int, payloads: List[dict], clients: int) -> Dict:
+    samples: List[float] = []
+    statuses: Counter = Counter()
+    lock = threading.Lock()
+    chunks = [payloads[i::clients] for i in range(clients)]
+    barrier = threading.Barrier(clients)
+
+    def run(chunk: List[dict]) -> None:
+        connection = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+        local: List[float] = []
+        local_statuses: Counter = Counter()
+        barrier.wait()
+        for payload in chunk:
+            body = json.dumps(payload)
+            started = time.perf_counter()
+            try:
+                connection.request("POST", "/api/recommend", body, {"Content-Type": "application/json"})
+                response = connection.getresponse()
+                response.read()
+                local_statuses[response.status] += 1
+            except (OSError, http.client.HTTPException) as exc:
+                local_statuses[type(exc).__name__] += 1
+                connection.close()
+                connection = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+            local.append(time.perf_counter() - started)
+        connection.close()
+        with lock:
+            samples.extend(local)
+            statuses.update(local_statuses)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=run, args=(chunk,)) for chunk in chunks]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+    ok = statuses.get(200, 0)
+    return {
+        "wall_seconds": wall,
+        "requests_per_s": len(payloads) / wall,
+        "ok_per_s": ok / wall,
+        "statuses": {str(key): value for key, value in statuses.items()},
+        "samples": samples,
+    }
+
+
+def serve(port: int) -> None:
+    import app as flask_app
+
+    flask_app.startup()
+    flask_app.app.run(port=port, threaded=True, debug=False)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Bandingkan throughput app.run (WSGI) dan mode ASGI.")
+    parser.add_argument("--modes", default="wsgi,asgi")
+    parser.add_argument("--size", default="10k", help="ukuran katalog sintetis (1k, 10k, ...)")
+    parser.add_argument("--clients", type=int, default=32, help="koneksi bersamaan")
+    parser.add_argument("--requests", type=int, default=50, help="request per klien")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", type=Path, default=None)
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, default=5000, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.port)
+        return
+
+    modes = [m.strip() for m in args.modes.split(",") if m.strip()]
+    unknown = set(modes) - {"wsgi", "asgi"}
+    if unknown:
+        raise SystemExit(f"Mode tidak dikenal: {', '.join(sorted(unknown))}")
+    if "asgi" in modes and importlib.util.find_spec("uvicorn") is None:
+        raise SystemExit("Mode asgi butuh uvicorn: pip install uvicorn")
+
+    WORK_DIR.mkdir(parents=True, exist_ok=True)
+    env = dict(os.environ, EQ_DATABASE_URI=f"sqlite:///{WORK_DIR / 'serving.db'}", EQ_RESULT_CACHE_SIZE="0")
+    os.environ.update(env)
+    import app as flask_app
+    import import_equipment
+    from benchmarks import synthetic
+
+    size = synthetic.parse_size(args.size)
+    with flask_app.app.app_context():
+        flask_app.db.drop_all()
+        flask_app.db.create_all()
+        csv_path = synthetic.write_csv(WORK_DIR / f"alat_{args.size}.csv", synthetic.alat_rows(size, args.seed))
+        import_equipment.import_data(csv_path, chunk_size=5000)
+    payloads = synthetic.recommend_payloads(args.clients * args.requests, args.seed)
+
+    runs = []
+    for mode in modes:
+        port = free_port()
+        process = subprocess.Popen(server_command(mode, port), cwd=BASE_DIR, env=env)
+        try:
+            wait_ready(port, process)
+            # Satu request pemanasan supaya fit index tidak masuk hitungan.
+            load(port, payloads[:1], 1)
+            run = load(port, payloads, args.clients)
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+        row = summarize("recommend", size, run.pop("samples"), mode=mode, clients=args.clients, **run)
+        runs.append(row)
+        print(
+            f"== {mode:<5} {row['requests_per_s']:8.1f} req/s ({row['ok_per_s']:.1f} ok/s)  "
+            f"p50={row['p50_ms']:.1f}ms p95={row['p95_ms']:.1f}ms p99={row['p99_ms']:.1f}ms  status={row['statuses']}"
+        )
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        meta = {"commit": git_commit(), "size": args.size, "clients": args.clients, "requests": args.requests, "seed": args.seed}
+        args.output.write_text(json.dumps({"meta": meta, "runs": runs}, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
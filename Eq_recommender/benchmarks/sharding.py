@@ -0,0 +1,108 @@
+"""Throughput of sharded scoring from 1 to N processes.
+
+    python -m benchmarks.sharding --size 200k --shards 1,2,4 --clients 8
+
+Katalog ``alat`` sintetis di-index sekali di proses ini, lalu tiap jumlah
+shard diuji dengan ``--clients`` thread yang mengirim query bersamaan
+(seperti thread server). ``1`` berarti scoring biasa tanpa proses shard.
+Hasil sharded diperiksa sama persis dengan hasil tanpa shard.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from benchmarks.run import WORK_DIR, git_commit, summarize
+
+
+def _throughput(score: Callable[[object], object], inputs: List, clients: int) -> Dict:
+    samples: List[float] = []
+    lock = threading.Lock()
+    chunks = [inputs[i::clients] for i in range(clients)]
+
+    def run(chunk: List) -> None:
+        local = []
+        for item in chunk:
+            started = time.perf_counter()
+            score(item)
+            local.append(time.perf_counter() - started)
+        with lock:
+            samples.extend(local)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=run, args=(chunk,)) for chunk in chunks]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+    return {"wall_seconds": wall, "queries_per_s": len(inputs) / wall, "samples": samples}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Skalabilitas scoring sharded.")
+    parser.add_argument("--size", default="200k")
+    parser.add_argument("--shards", default=f"1,2,{os.cpu_count() or 4}")
+    parser.add_argument("--clients", type=int, default=8, help="thread yang mengirim query bersamaan")
+    parser.add_argument("--queries", type=int, default=400)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", type=Path, default=None)
+    args = parser.parse_args()
+
+    WORK_DIR.mkdir(parents=True, exist_ok=True)
+    os.environ.setdefault("EQ_DATABASE_URI", f"sqlite:///{WORK_DIR / 'sharding.db'}")
+    import app as flask_app
+    from benchmarks import synthetic
+    from recommender.catalog_index import AlatFeatures, CatalogIndex, ShardedIndex
+    from recommender.sharding import ShardPool
+
+    size = synthetic.parse_size(args.size)
+    print(f"Membangun index {size} alat ...")
+    rows = list(synthetic.alat_rows(size, args.seed))
+    features = []
+    for row in rows:
+        tokens = flask_app.preprocess_tokens(f"{row['kebutuhan_konten']} {row['deskripsi']}")
+        features.append(AlatFeatures(tokens=tokens, token_set=frozenset(tokens), flags=flask_app.detect_flags(tokens)))
+    index = CatalogIndex.build(
+        list(range(1, size + 1)), features, [row["harga_sewa"] for row in rows], [row["rating_alat"] for row in rows]
+    )
+    inputs = []
+    for payload in synthetic.recommend_payloads(args.queries, args.seed):
+        tokens = flask_app.query_tokens(payload)
+        inputs.append((tokens, flask_app.detect_flags(tokens), payload["budget"]))
+
+    expected = [[(item.position, item.score) for item in index.score(*query)] for query in inputs[:50]]
+    results = []
+    for shards in [int(value) for value in args.shards.split(",") if value.strip()]:
+        pool = None
+        scorer = index
+        if shards > 1:
+            pool = ShardPool(shards)
+            scorer = ShardedIndex(index, pool, version=1)
+        got = [[(item.position, item.score) for item in scorer.score_many([query])[0]] for query in inputs[:50]]
+        if got != expected:
+            raise SystemExit(f"Hasil {shards} shard berbeda dari scoring tanpa shard")
+
+        run = _throughput(lambda query: scorer.score_many([query]), inputs, args.clients)
+        row = summarize("sharded_score", size, run.pop("samples"), shards=shards, clients=args.clients, **run)
+        results.append(row)
+        print(f"  shards={shards:<3} {row['queries_per_s']:8.1f} query/s  p50={row['p50_ms']:.2f}ms p95={row['p95_ms']:.2f}ms")
+        if pool is not None:
+            pool.shutdown()
+
+    base = results[0]["queries_per_s"]
+    for row in results:
+        row["speedup"] = row["queries_per_s"] / base
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        meta = {"commit": git_commit(), "size": size, "clients": args.clients, "queries": args.queries, "cpus": os.cpu_count()}
+        args.output.write_text(json.dumps({"meta": meta, "results": results}, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""Per-worker memory with and without the shared (memory-mapped) catalog index.
+
+    python -m benchmarks.shared_index --sizes 1k,10k,50k --workers 4 --requests 50
+
+Untuk tiap ukuran katalog, ``--workers`` proses dijalankan bersamaan
+terhadap database sementara yang sama (seperti worker server), masing-masing
+mengirim ``--requests`` ``POST /api/recommend``. Mode ``private`` = tiap
+proses memuat katalog dan membangun index sendiri; ``shared`` =
+``EQ_SHARED_INDEX_DIR``. Yang dilaporkan per worker: memori privat (RSS
+dikurangi halaman file yang dibagi), RSS puncak dan durasi request pertama.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from benchmarks.run import WORK_DIR, git_commit, peak_rss_mb
+
+
+def memory_mb() -> Dict[str, float]:
+    """Resident and private (resident minus shared file pages) memory of this process, in MiB."""
+    page = resource.getpagesize() / (1024 * 1024)
+    try:
+        with open("/proc/self/statm", encoding="ascii") as handle:
+            _, resident, shared = (int(value) for value in handle.read().split()[:3])
+    except OSError:
+        return {"rss_mb": peak_rss_mb(), "private_mb": peak_rss_mb()}
+    return {"rss_mb": resident * page, "private_mb": (resident - shared) * page}
+
+
+def worker(requests: int, seed: int) -> Dict:
+    import app as flask_app
+    from benchmarks import synthetic
+
+    client = flask_app.app.test_client()
+    payloads = synthetic.recommend_payloads(requests, seed + os.getpid())
+    started = time.perf_counter()
+    client.post("/api/recommend", json=payloads[0])
+    first = time.perf_counter() - started
+    for payload in payloads[1:]:
+        client.post("/api/recommend", json=payload)
+    return {
+        "first_request_ms": first * 1000,
+        "peak_rss_mb": peak_rss_mb(),
+        "builds": flask_app.catalog_index.builds,
+        **memory_mb(),
+    }
+
+
+def prepare(size: str, seed: int, env: Dict[str, str]) -> None:
+    command = [sys.executable, "-m", "benchmarks.shared_index", "--prepare", "--sizes", size, "--seed", str(seed)]
+    subprocess.run(command, env=env, check=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Memori per worker: index privat vs index bersama (mmap).")
+    parser.add_argument("--sizes", default="1k,10k,50k")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=50, help="request per worker")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", type=Path, default=None)
+    parser.add_argument("--prepare", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(worker(args.requests, args.seed)))
+        return
+    if args.prepare:
+        import app as flask_app
+        import import_equipment
+        from benchmarks import synthetic
+
+        with flask_app.app.app_context():
+            flask_app.db.drop_all()
+            flask_app.db.create_all()
+            rows = synthetic.alat_rows(synthetic.parse_size(args.sizes), args.seed)
+            import_equipment.import_data(synthetic.write_csv(WORK_DIR / f"alat_{args.sizes}.csv", rows), chunk_size=5000)
+        return
+
+    WORK_DIR.mkdir(parents=True, exist_ok=True)
+    results: List[Dict] = []
+    for size in [s.strip() for s in args.sizes.split(",") if s.strip()]:
+        env = dict(os.environ, EQ_DATABASE_URI=f"sqlite:///{WORK_DIR / 'shared_index.db'}", EQ_RESULT_CACHE_SIZE="0")
+        prepare(size, args.seed, env)
+        for mode in ("private", "shared"):
+            mode_env = dict(env)
+            if mode == "shared":
+                index_dir = WORK_DIR / "shared_index"
+                shutil.rmtree(index_dir, ignore_errors=True)
+                mode_env["EQ_SHARED_INDEX_DIR"] = str(index_dir)
+            command = [sys.executable, "-m", "benchmarks.shared_index", "--worker", "--requests", str(args.requests), "--seed", str(args.seed)]
+            processes = [
+                subprocess.Popen(command, env=mode_env, stdout=subprocess.PIPE, text=True) for _ in range(args.workers)
+            ]
+            reports = [json.loads(process.communicate()[0].strip().splitlines()[-1]) for process in processes]
+            row = {
+                "size": size,
+                "mode": mode,
+                "workers": args.workers,
+                "builds": sum(report["builds"] for report in reports),
+                "private_mb": max(report["private_mb"] for report in reports),
+                "rss_mb": max(report["rss_mb"] for report in reports),
+                "peak_rss_mb": max(report["peak_rss_mb"] for report in reports),
+                "first_request_ms": max(report["first_request_ms"] for report in reports),
+                "reports": reports,
+            }
+            results.append(row)
+            print(
+                f"{size:>6} {mode:<8} private={row['private_mb']:7.1f}MiB rss={row['rss_mb']:7.1f}MiB "
+                f"peak={row['peak_rss_mb']:7.1f}MiB first={row['first_request_ms']:8.1f}ms builds={row['builds']}"
+            )
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        meta = {"commit": git_commit(), "workers": args.workers, "requests": args.requests, "seed": args.seed}
+        args.output.write_text(json.dumps({"meta": meta, "results": results}, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Cold-start time of the app's entry points, broken down by imported package.
+
+    python -m benchmarks.startup --repeat 5 --top 12
+
+Tiap target dijalankan sebagai proses baru dengan ``python -X importtime``:
+``import app`` (dasar semua perintah ``flask ...``), ``import
+import_equipment`` (job impor) dan ``startup`` (``app.startup()`` dengan
+warm-up, seperti server sebelum request pertama). Yang dilaporkan: waktu
+wall terbaik dari ``--repeat`` run dan waktu impor *self* per package teratas
+dari run terakhir. Target ``startup`` juga mencetak laporan langkah
+inisialisasi dari :mod:`utils.startup`.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from benchmarks.run import WORK_DIR, git_commit
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+TARGETS = {
+    "import app": "import app",
+    "import import_equipment": "import import_equipment",
+    "startup": "import app; app.startup()",
+}
+
+
+def import_breakdown(stderr: str) -> Counter:
+    """Self import time in seconds per top-level package, parsed from ``-X importtime`` output."""
+    packages: Counter = Counter()
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        fields = line[len("import time:") :].split("|")
+        try:
+            self_us = int(fields[0])
+        except ValueError:
+            continue  # baris header
+        packages[fields[2].strip().split(".")[0]] += self_us / 1e6
+    return packages
+
+
+def run_target(code: str, env: Dict[str, str]) -> Tuple[float, Counter, str]:
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code], cwd=BASE_DIR, env=env, capture_output=True, text=True
+    )
+    wall = time.perf_counter() - started
+    if completed.returncode:
+        raise SystemExit(f"{code!r} gagal:\n{completed.stderr[-2000:]}")
+    return wall, import_breakdown(completed.stderr), completed.stdout
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Waktu cold start per entry point dan per package.")
+    parser.add_argument("--targets", default=",".join(TARGETS))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=12, help="package teratas yang ditampilkan")
+    parser.add_argument("--output", type=Path, default=None)
+    args = parser.parse_args()
+
+    WORK_DIR.mkdir(parents=True, exist_ok=True)
+    env = dict(os.environ, EQ_DATABASE_URI=f"sqlite:///{WORK_DIR / 'startup.db'}")
+    results: List[Dict] = []
+    for name in [t.strip() for t in args.targets.split(",") if t.strip()]:
+        if name not in TARGETS:
+            raise SystemExit(f"Target tidak dikenal: {name}")
+        walls = []
+        for _ in range(max(1, args.repeat)):
+            wall, packages, stdout = run_target(TARGETS[name], env)
+            walls.append(wall)
+        top = packages.most_common(args.top)
+        results.append({"target": name, "best_s": min(walls), "walls_s": walls, "imports_s": dict(top)})
+        print(f"== {name:<24} best={min(walls) * 1000:8.1f}ms  imports={sum(packages.values()) * 1000:8.1f}ms")
+        for package, seconds in top:
+            print(f"   {package:<24} {seconds * 1000:8.1f}ms")
+        if stdout.strip():
+            print(stdout.rstrip())
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        meta = {"commit": git_commit(), "repeat": args.repeat}
+        args.output.write_text(json.dumps({"meta": meta, "results": results}, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""Seeded generator for synthetic ``alat`` rows, kit CSVs and an Indonesian query corpus."""
+from __future__ import annotations
+
+import csv
+import random
+from pathlib import Path
+from typing import Dict, Iterator, List
+
+import app
+from nlp import parser
+
+SIZES = {"1k": 1_000, "10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+
+KATEGORI = {
+    "Kamera": ["Sony", "Canon", "Nikon", "Fujifilm", "Panasonic", "GoPro", "DJI"],
+    "Audio": ["Rode", "Shure", "Sennheiser", "Saramonic", "Boya", "Zoom"],
+    "Pencahayaan": ["Godox", "Aputure", "Nanlite", "Ulanzi", "Neewer"],
+    "Stabilisasi": ["DJI", "Zhiyun", "Feiyu", "Joby", "Manfrotto"],
+    "Lensa": ["Sigma", "Tamron", "Samyang", "Viltrox", "Sony"],
+    "Drone": ["DJI", "Autel", "Parrot"],
+    "Aksesoris": ["SmallRig", "Ulanzi", "Peak Design", "SanDisk"],
+}
+
+ALAT_TEMPLATES = [
+    "{kat} {a} untuk konten {b} dan {c}",
+    "Cocok dipakai {a} saat {b}, hasil {c}",
+    "{kat} ringan buat {a} {b} di {c}",
+    "Paket {kat} {a} dengan fitur {b} / {c}",
+]
+
+QUERY_TEMPLATES = [
+    "saya ingin membuat konten {focus} di {env} yang {budget}",
+    "butuh alat {mobility} untuk {focus} {lighting}, saya {expertise}",
+    "{focus} {env} {lighting} dengan {flag}",
+    "pengen bikin {focus} dan {focus2} pas {lighting}, budget {budget}",
+    "{expertise} mau rekam {focus} di {env}, perlu {flag} {mobility}",
+]
+
+
+def _words(groups: Dict[str, set]) -> List[str]:
+    return sorted({word for words in groups.values() for word in words})
+
+
+VOCAB = {
+    "focus": _words({k: v for k, v in parser.CANON.items() if k not in parser.ENVIRONMENT_LABELS}) + _words(app.CANON),
+    "env": _words({k: v for k, v in parser.CANON.items() if k in parser.ENVIRONMENT_LABELS}),
+    "budget": _words(parser.BUDGET_KEYWORDS),
+    "mobility": _words(parser.MOBILITY_KEYWORDS),
+    "expertise": _words(parser.EXPERTISE_KEYWORDS),
+    "flag": sorted(parser.AUDIO_FLAGS | parser.STAB_FLAGS),
+    "lighting": sorted(parser.DAYLIGHT_TOKENS | parser.LOWLIGHT_TOKENS),
+    "filler": sorted(app.STOPWORDS),
+}
+
+
+def parse_size(label: str) -> int:
+    label = label.strip().lower()
+    if label in SIZES:
+        return SIZES[label]
+    suffix = {"k": 1_000, "m": 1_000_000}.get(label[-1:])
+    return int(float(label[:-1]) * suffix) if suffix else int(label)
+
+
+def _phrase(rng: random.Random, count: int) -> str:
+    words = [rng.choice(VOCAB["focus"] + VOCAB["env"] + VOCAB["lighting"]) for _ in range(count)]
+    if rng.random() < 0.5:
+        words.insert(rng.randrange(len(words) + 1), rng.choice(VOCAB["filler"]))
+    return " ".join(words)
+
+
+def alat_rows(count: int, seed: int = 42) -> Iterator[dict]:
+    rng = random.Random(seed)
+    kategori_names = list(KATEGORI)
+    for i in range(count):
+        kategori = rng.choice(kategori_names)
+        brand = rng.choice(KATEGORI[kategori])
+        template = rng.choice(ALAT_TEMPLATES)
+        yield {
+            "nama_alat": f"{brand} {kategori[:3].upper()}-{i:07d}",
+            "kategori": kategori,
+            "deskripsi": template.format(
+                kat=kategori.lower(), a=_phrase(rng, 2), b=_phrase(rng, 1), c=_phrase(rng, 2)
+            ),
+            "kebutuhan_konten": _phrase(rng, rng.randint(3, 6)),
+            "harga_sewa": rng.randrange(50, 1500, 10),
+            "stok": rng.randint(0, 20),
+            "rating_alat": round(rng.uniform(3.5, 5.0), 1),
+            "gambar": "",
+        }
+
+
+def kit_rows(count: int, seed: int = 42) -> Iterator[dict]:
+    rng = random.Random(seed)
+    bands = ["low", "medium", "high"]
+    environments = ["indoor", "outdoor", "hybrid"]
+    focus = [k for k in parser.CANON if k not in parser.ENVIRONMENT_LABELS] + ["daily vlog", "talking head", "sports"]
+    for i in range(count):
+        yield {
+            "name": f"Kit {i:07d}",
+            "category": rng.choice(["camera", "audio", "action", "lighting"]),
+            "price_band": rng.choice(bands),
+            "portability": rng.choice(bands),
+            "environment": ";".join(rng.sample(environments, rng.randint(1, 3))),
+            "audio_quality": rng.choice(bands),
+            "stabilization": rng.choice(bands),
+            "experience": rng.choice(["beginner", "intermediate", "pro"]),
+            "best_for": ";".join(rng.sample(focus, rng.randint(1, 4))),
+            "description": _phrase(rng, 6),
+            "components": "|".join(f"Item {rng.randint(1, 500)}" for _ in range(rng.randint(2, 5))),
+        }
+
+
+def write_csv(path: Path, rows: Iterator[dict]) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", newline="", encoding="utf-8") as handle:
+        writer = None
+        for row in rows:
+            if writer is None:
+                writer = csv.DictWriter(handle, fieldnames=list(row))
+                writer.writeheader()
+            writer.writerow(row)
+    return path
+
+
+def query_corpus(count: int, seed: int = 7) -> List[str]:
+    rng = random.Random(seed)
+    queries = []
+    for _ in range(count):
+        template = rng.choice(QUERY_TEMPLATES)
+        values = {key: rng.choice(words) for key, words in VOCAB.items()}
+        values["focus2"] = rng.choice(VOCAB["focus"])
+        queries.append(template.format(**values))
+    return queries
+
+
+def recommend_payloads(count: int, seed: int = 7) -> List[dict]:
+    rng = random.Random(seed)
+    return [
+        {
+            "jenis_konten": text.split(",")[0],
+            "deskripsi_konten": text,
+            "budget": rng.choice([0, 100, 250, 500, 1000]),
+            "lokasi": rng.choice(["Yogyakarta", "Jakarta", "Bandung", ""]),
+        }
+        for text in query_corpus(count, seed)
+    ]
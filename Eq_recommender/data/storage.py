@@ -0,0 +1,59 @@
+"""SQLite storage profiles: connection pragmas and connection-pool settings."""
+from __future__ import annotations
+
+from typing import Dict
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# "default" membiarkan SQLite apa adanya (rollback journal, synchronous=FULL).
+# "production": WAL supaya pembaca tidak diblok penulis, fsync hanya saat checkpoint.
+PROFILES: Dict[str, Dict[str, object]] = {
+    "default": {},
+    "production": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": 256 * 1024 * 1024,
+        "cache_size": -64 * 1024,  # negatif = KiB, jadi 64 MiB per koneksi
+        "busy_timeout": 5000,
+        "temp_store": "MEMORY",
+    },
+}
+
+
+def pragmas_for(profile: str, **overrides: object) -> Dict[str, object]:
+    if profile not in PROFILES:
+        raise ValueError(f"Storage profile tidak dikenal: {profile!r} (pilihan: {', '.join(PROFILES)})")
+    pragmas = dict(PROFILES[profile])
+    if pragmas:
+        pragmas.update({key: value for key, value in overrides.items() if value is not None})
+    return pragmas
+
+
+def engine_options(profile: str, database_uri: str, pool_size: int = 10, max_overflow: int = 20) -> dict:
+    """``SQLALCHEMY_ENGINE_OPTIONS`` for ``profile``; only file-backed SQLite is tuned."""
+    if profile == "default" or not database_uri.startswith("sqlite:///") or ":memory:" in database_uri:
+        return {}
+    return {
+        # Satu koneksi per thread server; overflow untuk lonjakan singkat.
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": 30,
+        # Tunggu lock penulis lain di level driver, bukan langsung "database is locked".
+        "connect_args": {"timeout": 30, "check_same_thread": False},
+    }
+
+
+def apply_pragmas(engine: Engine, pragmas: Dict[str, object]) -> None:
+    """Run ``PRAGMA key=value`` on every new DBAPI connection of a SQLite ``engine``."""
+    if not pragmas or engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for key, value in pragmas.items():
+                cursor.execute(f"PRAGMA {key}={value}")
+        finally:
+            cursor.close()
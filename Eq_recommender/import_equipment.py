@@ -1,86 +1,178 @@
 # Eq_recommender/import_equipment.py
+import argparse
 import csv
+import time
 from pathlib import Path
 
+from sqlalchemy import insert, update
+
 # import app & db + models langsung dari app.py
-from app import app, db, Category, Alat
+from app import app, db, Category, Alat, CatalogChange, ensure_schema, invalidate_catalog
 
 CSV_PATH = Path(__file__).parent / "data" / "equipment_data2.csv"
+CHUNK_SIZE = 500
+
+
+def _to_int(value):
+    try:
+        return int(float(value or 0))
+    except Exception:
+        return 0
+
+
+def _to_float(value):
+    try:
+        return float(value or 0.0)
+    except Exception:
+        return 0.0
+
+
+def load_category_map():
+    return {c.nama_kategori: c.id_kategori for c in Category.query.all()}
 
-def get_or_create_category(name: str):
+
+def load_existing_names():
+    # kunci case-insensitive, sama seperti cek duplikat lower(nama_alat) sebelumnya
+    return {nama.lower(): id_alat for id_alat, nama in db.session.query(Alat.id_alat, Alat.nama_alat)}
+
+
+def get_or_create_category(name: str, category_map: dict) -> int:
     name = (name or "Umum").strip()
-    cat = Category.query.filter_by(nama_kategori=name).first()
-    if not cat:
+    if name not in category_map:
         cat = Category(nama_kategori=name)
         db.session.add(cat)
-        db.session.commit()
-    return cat
+        db.session.flush()
+        category_map[name] = cat.id_kategori
+    return category_map[name]
+
+
+def _flush_chunk(inserts, updates, existing):
+    """Write one chunk in its own transaction; ``True`` if it changed any row."""
+    changed = [row["id_alat"] for row in updates]
+    if inserts:
+        result = db.session.execute(
+            insert(Alat).returning(Alat.id_alat, Alat.nama_alat, sort_by_parameter_order=True),
+            inserts,
+        )
+        for id_alat, nama in result:
+            existing[nama.lower()] = id_alat
+            changed.append(id_alat)
+    if updates:
+        db.session.execute(update(Alat), updates)
+    if changed:
+        # setiap baris baru/terupdate menaikkan versi katalog (/api/alats/changes)
+        db.session.execute(insert(CatalogChange), [{"id_alat": i, "operasi": "upsert"} for i in changed])
+    db.session.commit()
+    return bool(changed)
+
 
-def import_data():
-    if not CSV_PATH.exists():
-        print("CSV file not found:", CSV_PATH)
-        return
+def import_data(csv_path=CSV_PATH, upsert=False, chunk_size=CHUNK_SIZE, verbose=False):
+    """Stream ``csv_path`` into ``alat`` in chunks of bulk inserts.
 
-    with open(CSV_PATH, newline='', encoding='utf-8') as f:
+    Kategori dan nama alat yang sudah ada dimuat sekali di awal. Dengan
+    ``upsert=True`` baris yang namanya sudah ada memperbarui harga, stok dan
+    rating; tanpa itu baris tersebut dilewati.
+    """
+    csv_path = Path(csv_path)
+    if not csv_path.exists():
+        print("CSV file not found:", csv_path)
+        return None
+
+    started = time.perf_counter()
+    ensure_schema()
+    category_map = load_category_map()
+    existing = load_existing_names()
+    stats = {"rows": 0, "added": 0, "updated": 0, "skipped": 0}
+
+    with open(csv_path, newline='', encoding='utf-8') as f:
         reader = csv.DictReader(f)
-        added = 0
-        skipped = 0
-
-        for row in reader:
-            nama = (row.get("nama_alat") or "").strip()
-            if not nama:
-                print("SKIP row tanpa nama_alat")
-                skipped += 1
-                continue
-
-            # category column in CSV may be "kategori"
-            kategori_name = row.get("kategori") or row.get("category") or "Umum"
-            kategori_obj = get_or_create_category(kategori_name.strip())
-
-            # cek duplikat berdasarkan nama alat (case-insensitive)
-            exist = Alat.query.filter(db.func.lower(Alat.nama_alat) == nama.lower()).first()
-            if exist:
-                print(f"SKIP (sudah ada): {nama}")
-                skipped += 1
-                continue
-
-            # safe parse numeric fields
-            try:
-                harga = int(float(row.get("harga_sewa") or 0))
-            except Exception:
-                harga = 0
-            try:
-                stok = int(float(row.get("stok") or 0))
-            except Exception:
-                stok = 0
-            try:
-                rating = float(row.get("rating_alat") or 0.0)
-            except Exception:
-                rating = 0.0
-
-            alat = Alat(
-                id_kategori=kategori_obj.id_kategori,
-                nama_alat=nama,
-                deskripsi=row.get("deskripsi", "").strip(),
-                kebutuhan_konten=row.get("kebutuhan_konten", "").strip(),
-                harga_sewa=harga,
-                stok=stok,
-                rating_alat=rating,
-                gambar=row.get("gambar", "").strip() or None,
-            )
-            db.session.add(alat)
-            added += 1
+        inserts = []
+        updates = []
+        pending = {}
+        committed = False
 
         try:
-            db.session.commit()
+            for row in reader:
+                stats["rows"] += 1
+                nama = (row.get("nama_alat") or "").strip()
+                if not nama:
+                    if verbose:
+                        print("SKIP row tanpa nama_alat")
+                    stats["skipped"] += 1
+                    continue
+
+                key = nama.lower()
+                values = {
+                    "harga_sewa": _to_int(row.get("harga_sewa")),
+                    "stok": _to_int(row.get("stok")),
+                    "rating_alat": _to_float(row.get("rating_alat")),
+                }
+
+                if key in existing or key in pending:
+                    if not upsert:
+                        if verbose:
+                            print(f"SKIP (sudah ada): {nama}")
+                        stats["skipped"] += 1
+                    elif key in pending:
+                        pending[key].update(values)
+                        stats["updated"] += 1
+                    else:
+                        updates.append({"id_alat": existing[key], **values})
+                        stats["updated"] += 1
+                else:
+                    # category column in CSV may be "kategori"
+                    kategori_name = row.get("kategori") or row.get("category") or "Umum"
+                    record = {
+                        "id_kategori": get_or_create_category(kategori_name, category_map),
+                        "nama_alat": nama,
+                        "deskripsi": (row.get("deskripsi") or "").strip(),
+                        "kebutuhan_konten": (row.get("kebutuhan_konten") or "").strip(),
+                        "gambar": (row.get("gambar") or "").strip() or None,
+                        **values,
+                    }
+                    inserts.append(record)
+                    pending[key] = record
+                    stats["added"] += 1
+
+                if len(inserts) + len(updates) >= chunk_size:
+                    committed = _flush_chunk(inserts, updates, existing) or committed
+                    inserts, updates, pending = [], [], {}
+                    print(f"... {stats['rows']} baris diproses")
+
+            committed = _flush_chunk(inserts, updates, existing) or committed
         except Exception as e:
             print("ERROR saat commit:", e)
             db.session.rollback()
-            return
+            return None
+        finally:
+            # Chunk yang sudah di-commit tetap tersimpan walaupun chunk berikutnya gagal.
+            # Index dan cache hasil dibuang seluruhnya; saat index dibangun ulang, TokenCache
+            # hanya men-tokenize ulang baris yang teksnya berubah.
+            if committed:
+                invalidate_catalog()
 
-        print(f"IMPORT SELESAI — Added={added}, Skipped={skipped}")
+    elapsed = time.perf_counter() - started
+    stats["seconds"] = elapsed
+    rate = stats["rows"] / elapsed if elapsed > 0 else 0.0
+    print(
+        f"IMPORT SELESAI — Added={stats['added']}, Updated={stats['updated']}, Skipped={stats['skipped']} "
+        f"({stats['rows']} baris dalam {elapsed:.2f}s, {rate:.0f} baris/s)"
+    )
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import data alat dari CSV ke database.")
+    parser.add_argument("csv", nargs="?", default=str(CSV_PATH), help="path CSV (default: data/equipment_data2.csv)")
+    parser.add_argument("--upsert", action="store_true", help="update harga/stok/rating untuk nama yang sudah ada")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="jumlah baris per commit")
+    parser.add_argument("--verbose", action="store_true", help="cetak setiap baris yang dilewati")
+    args = parser.parse_args()
 
-if __name__ == "__main__":
     # run inside flask app context so SQLAlchemy works
     with app.app_context():
-        import_data()
+        import_data(args.csv, upsert=args.upsert, chunk_size=args.chunk_size, verbose=args.verbose)
+
+
+if __name__ == "__main__":
+    main()
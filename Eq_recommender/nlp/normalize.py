@@ -0,0 +1,102 @@
+"""Shared text normalization used by ``app.py`` and :mod:`nlp.parser`.
+
+Both pipelines tokenize the same way: lowercase, treat ``/ , . -`` as
+separators, split on whitespace and keep only alphanumeric characters of
+each chunk. Synonym tables are compiled once into inverted
+``variant -> canonical`` lookups so every token is mapped with a single
+dict access instead of scanning every group; the parser's keyword groups,
+which also contain multi-word phrases, are compiled into a
+:class:`PhraseMatcher`.
+"""
+from __future__ import annotations
+
+import re
+from collections import deque
+from typing import AbstractSet, Dict, Iterable, List, Mapping, Set, Tuple
+
+_SEPARATORS = str.maketrans({"/": " ", ",": " ", ".": " ", "-": " "})
+# Anything that is neither alphanumeric nor whitespace is dropped in place,
+# e.g. "jalan2!" -> "jalan2" and "talk'show" -> "talkshow".
+_NON_ALNUM = re.compile(r"[^\w\s]|_")
+
+
+def tokenize(text: str, stopwords: AbstractSet[str] = frozenset()) -> List[str]:
+    if not text:
+        return []
+    cleaned = _NON_ALNUM.sub("", text.lower().translate(_SEPARATORS))
+    return [token for token in cleaned.split() if token not in stopwords]
+
+
+def canonical_lookup(canon: Mapping[str, Iterable[str]]) -> Dict[str, str]:
+    """Invert ``{canonical: variants}``; a variant listed twice keeps its first group."""
+    lookup: Dict[str, str] = {}
+    for label, variants in canon.items():
+        for variant in variants:
+            lookup.setdefault(variant, label)
+    return lookup
+
+
+def canonicalize(tokens: Iterable[str], lookup: Mapping[str, str]) -> List[str]:
+    return [lookup.get(token, token) for token in tokens]
+
+
+class PhraseMatcher:
+    """Aho-Corasick automaton over token sequences for ``{family: {label: keywords}}`` groups.
+
+    Keywords are tokenized like queries, so a multi-word keyword such as
+    ``"talking head"`` matches the same consecutive tokens, and a keyword
+    may belong to several labels. :meth:`hits` reports every
+    ``(family, label)`` in one left-to-right scan of the query, single words
+    and phrases alike, without backtracking on long descriptions.
+    """
+
+    __slots__ = ("_goto", "_fail", "_out")
+
+    def __init__(self, groups: Mapping[str, Mapping[str, Iterable[str]]], stopwords: AbstractSet[str] = frozenset()) -> None:
+        goto: List[Dict[str, int]] = [{}]
+        out: List[Set[Tuple[str, str]]] = [set()]
+        for family, labels in groups.items():
+            for label, keywords in labels.items():
+                for keyword in keywords:
+                    state = 0
+                    tokens = tokenize(keyword, stopwords)
+                    for token in tokens:
+                        following = goto[state].get(token)
+                        if following is None:
+                            following = len(goto)
+                            goto[state][token] = following
+                            goto.append({})
+                            out.append(set())
+                        state = following
+                    if tokens:
+                        out[state].add((family, label))
+
+        # Failure link = state of the longest proper suffix that is also a keyword prefix (BFS order).
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, following in goto[state].items():
+                queue.append(following)
+                fallback = fail[state]
+                while fallback and token not in goto[fallback]:
+                    fallback = fail[fallback]
+                fail[following] = goto[fallback].get(token, 0)
+                out[following] |= out[fail[following]]
+
+        self._goto = goto
+        self._fail = fail
+        self._out = [tuple(hits) for hits in out]
+
+    def hits(self, tokens: Iterable[str]) -> Set[Tuple[str, str]]:
+        """Every ``(family, label)`` whose keyword occurs in ``tokens``."""
+        goto, fail, out = self._goto, self._fail, self._out
+        found: Set[Tuple[str, str]] = set()
+        state = 0
+        for token in tokens:
+            while state and token not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(token, 0)
+            if out[state]:
+                found.update(out[state])
+        return found
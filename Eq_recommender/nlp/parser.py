@@ -1,8 +1,9 @@
 """Lightweight keyword-based NLP parser producing structured preferences."""
 from __future__ import annotations
 
-from typing import Iterable, List
+from typing import List, Set, Tuple
 
+from nlp.normalize import PhraseMatcher, tokenize
 from utils.models import Preference, normalize_tags
 
 # ============================================================
@@ -55,7 +56,16 @@ CANON = {
         "tutorial","review","unboxing","howto","demo"
     },
     "lowlight": {
-        "lowlight","malam","gelap","noise","noisy","night"
+        "lowlight","malam","gelap","noise","noisy","night",
+        "low light","minim cahaya","kurang cahaya"
+    },
+
+    # Frasa multi-kata, sama dengan tag best_for di data/equipment_data.csv
+    "talking head": {
+        "talking head","talkinghead","ngomong depan kamera"
+    },
+    "daily vlog": {
+        "daily vlog","dailyvlog","vlog harian","vlog sehari hari"
     },
 }
 
@@ -64,7 +74,7 @@ CANON = {
 # ============================================================
 BUDGET_KEYWORDS = {
     "low": {"murah", "hemat", "budget", "entry"},
-    "high": {"mahal", "premium", "pro"},
+    "high": {"mahal", "premium", "pro", "high end", "kelas atas"},
 }
 
 MOBILITY_KEYWORDS = {
@@ -79,78 +89,69 @@ EXPERTISE_KEYWORDS = {
 }
 
 AUDIO_FLAGS = {"audio","mic","suara","podcast","voice"}
-STAB_FLAGS = {"stabil","gimbal","steady","aksi","action","stabilizer"}
+STAB_FLAGS = {"stabil","gimbal","steady","aksi","action","stabilizer","anti goyang"}
 
-DAYLIGHT_TOKENS = {"siang","terang","cerah","matahari"}
-LOWLIGHT_TOKENS = {"malam","gelap","lowlight","night"}
+DAYLIGHT_TOKENS = {"siang","terang","cerah","matahari","cahaya alami"}
+LOWLIGHT_TOKENS = {"malam","gelap","lowlight","night","low light","minim cahaya","kurang cahaya"}
 
 
 # ============================================================
-# TOKENIZER
+# COMPILED LOOKUP (satu kali saat import)
 # ============================================================
-def _tokenize(text: str) -> List[str]:
-    raw = text.lower()
-    tokens: List[str] = []
-    for token in raw.replace("/", " ").replace(",", " ").replace(".", " ").replace("-", " ").split():
-        clean = "".join(ch for ch in token if ch.isalnum())
-        if clean:
-            tokens.append(clean)
-    return [t for t in tokens if t not in STOPWORDS]
+ENVIRONMENT_LABELS = {"outdoor", "indoor", "hybrid"}
+
+KEYWORD_GROUPS = {
+    "environment": {k: v for k, v in CANON.items() if k in ENVIRONMENT_LABELS},
+    "focus": {k: v for k, v in CANON.items() if k not in ENVIRONMENT_LABELS},
+    "budget": BUDGET_KEYWORDS,
+    "mobility": MOBILITY_KEYWORDS,
+    "expertise": EXPERTISE_KEYWORDS,
+    "flag": {"audio": AUDIO_FLAGS, "stabilization": STAB_FLAGS},
+    "lighting": {"daylight": DAYLIGHT_TOKENS, "lowlight": LOWLIGHT_TOKENS},
+}
 
+# Satu automaton untuk semua grup: kata tunggal dan frasa dicocokkan dalam satu scan query.
+KEYWORD_MATCHER = PhraseMatcher(KEYWORD_GROUPS, STOPWORDS)
 
-def _contains_any(tokens: Iterable[str], keywords: Iterable[str]) -> bool:
-    return bool(set(tokens) & set(keywords))
+
+# ============================================================
+# TOKENIZER
+# ============================================================
+def _tokenize(text: str) -> List[str]:
+    return tokenize(text, STOPWORDS)
 
 
-def _canonical_hits(tokens: Iterable[str], mapping: dict) -> List[str]:
-    hits = []
-    for canon, variants in mapping.items():
-        if _contains_any(tokens, variants):
-            hits.append(canon)
-    return hits
+def _labels(hits: Set[Tuple[str, str]], family: str) -> List[str]:
+    return [label for label in KEYWORD_GROUPS[family] if (family, label) in hits]
 
 
 # ============================================================
 # MAIN PARSER
 # ============================================================
 def parse_preferences(text: str) -> Preference:
-    tokens = _tokenize(text)
+    hits = KEYWORD_MATCHER.hits(_tokenize(text))
     pref = Preference()
 
     # Pisahkan environment dan content type
-    env_hits = _canonical_hits(tokens, {
-        k: v for k, v in CANON.items() if k in {"outdoor", "indoor", "hybrid"}
-    })
-    focus_hits = _canonical_hits(tokens, {
-        k: v for k, v in CANON.items() if k not in {"outdoor", "indoor", "hybrid"}
-    })
-
-    pref.environment.extend(env_hits)
-    pref.focus.extend(focus_hits)
-
-    # Budget
-    for label, words in BUDGET_KEYWORDS.items():
-        if _contains_any(tokens, words):
-            pref.budget = label
-
-    # Mobility
-    for label, words in MOBILITY_KEYWORDS.items():
-        if _contains_any(tokens, words):
-            pref.mobility = label
-
-    # Expertise
-    for label, words in EXPERTISE_KEYWORDS.items():
-        if _contains_any(tokens, words):
-            pref.expertise = label
+    pref.environment.extend(_labels(hits, "environment"))
+    pref.focus.extend(_labels(hits, "focus"))
+
+    # Budget / Mobility / Expertise: label terakhir yang cocok menang
+    for label in _labels(hits, "budget"):
+        pref.budget = label
+    for label in _labels(hits, "mobility"):
+        pref.mobility = label
+    for label in _labels(hits, "expertise"):
+        pref.expertise = label
 
     # Audio & Stabilization flags
-    pref.audio_priority = _contains_any(tokens, AUDIO_FLAGS)
-    pref.stabilization_priority = _contains_any(tokens, STAB_FLAGS)
+    pref.audio_priority = ("flag", "audio") in hits
+    pref.stabilization_priority = ("flag", "stabilization") in hits
 
     # Lighting inference
-    if _contains_any(tokens, DAYLIGHT_TOKENS):
+    if ("lighting", "daylight") in hits:
         pref.lighting = "daylight"
-    elif _contains_any(tokens, LOWLIGHT_TOKENS):
+    elif ("lighting", "lowlight") in hits:
         pref.lighting = "lowlight"
 
     pref.environment = normalize_tags(pref.environment)
@@ -0,0 +1,112 @@
+"""Memoized token stemming with bounded LRU eviction and on-disk persistence."""
+from __future__ import annotations
+
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable
+
+
+class LazyStemmer:
+    """Stemmer built by ``factory`` on the first :meth:`stem` call instead of at import.
+
+    Sastrawi loads its whole root-word dictionary when the stemmer is
+    created; processes that never stem (CLI, import jobs) skip that cost.
+    """
+
+    def __init__(self, factory: Callable[[], Any]) -> None:
+        self._factory = factory
+        self._stemmer: Any = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._stemmer is not None
+
+    def load(self) -> Any:
+        if self._stemmer is None:
+            with self._lock:
+                if self._stemmer is None:
+                    self._stemmer = self._factory()
+        return self._stemmer
+
+    def stem(self, token: str) -> str:
+        return self.load().stem(token)
+
+
+class StemCache:
+    """Token → stem cache in front of a slow stemmer (e.g. Sastrawi)."""
+
+    def __init__(self, stem_fn: Callable[[str], str], maxsize: int = 50000) -> None:
+        self._stem_fn = stem_fn
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def stem(self, token: str) -> str:
+        with self._lock:
+            stemmed = self._entries.get(token)
+            if stemmed is not None:
+                self._entries.move_to_end(token)
+                self.hits += 1
+                return stemmed
+        self.misses += 1
+        stemmed = self._stem_fn(token)
+        self._put(token, stemmed)
+        return stemmed
+
+    def prewarm(self, tokens: Iterable[str]) -> int:
+        """Stem every unseen token up front; returns how many were added."""
+        added = 0
+        for token in tokens:
+            if token in self._entries:
+                continue
+            self._put(token, self._stem_fn(token))
+            added += 1
+        return added
+
+    def save(self, path: Path | str) -> None:
+        target = Path(path)
+        with self._lock:
+            data = dict(self._entries)
+        tmp = target.with_suffix(target.suffix + ".tmp")
+        with tmp.open("w", encoding="utf-8") as handle:
+            json.dump(data, handle, ensure_ascii=False)
+        os.replace(tmp, target)
+
+    def load(self, path: Path | str) -> int:
+        """Merge a dictionary written by :meth:`save`; missing or broken files are ignored."""
+        target = Path(path)
+        if not target.exists():
+            return 0
+        try:
+            with target.open(encoding="utf-8") as handle:
+                data: Dict[str, str] = json.load(handle)
+        except (OSError, ValueError):
+            return 0
+        for token, stemmed in data.items():
+            self._put(token, stemmed)
+        return len(data)
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def _put(self, token: str, stemmed: str) -> None:
+        with self._lock:
+            self._entries[token] = stemmed
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
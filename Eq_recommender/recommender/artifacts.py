@@ -0,0 +1,69 @@
+"""Checksummed manifests for on-disk index artifacts.
+
+Setiap artifact adalah satu folder berisi file data dan ``meta.json`` yang
+mencatat versi format, kunci versi katalog dan sha256 tiap file.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Dict, List
+
+MANIFEST = "meta.json"
+
+
+def sha256_file(path: Path, chunk_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def write_manifest(directory: Path, meta: Dict) -> Dict:
+    """Write ``meta`` plus the checksum of every other file in ``directory``."""
+    files = {path.name: sha256_file(path) for path in sorted(directory.iterdir()) if path.name != MANIFEST}
+    manifest = dict(meta, files=files)
+    (directory / MANIFEST).write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    return manifest
+
+
+def read_manifest(directory: Path) -> Dict | None:
+    try:
+        return json.loads((directory / MANIFEST).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def verify(directory: Path, **expected) -> List[str]:
+    """Problems found in the artifact at ``directory``; an empty list means it is intact.
+
+    ``expected`` manifest values (format, catalog version, ...) are compared
+    first, then every listed file is re-hashed.
+    """
+    manifest = read_manifest(directory)
+    if manifest is None:
+        return [f"{directory / MANIFEST} tidak ada atau rusak"]
+    problems = [
+        f"{key}={manifest.get(key)!r}, seharusnya {value!r}" for key, value in expected.items() if manifest.get(key) != value
+    ]
+    for name, digest in manifest.get("files", {}).items():
+        path = directory / name
+        if not path.exists():
+            problems.append(f"{name} hilang")
+        elif sha256_file(path) != digest:
+            problems.append(f"checksum {name} tidak cocok")
+    return problems
+
+
+def replace_directory(staging: Path, target: Path) -> None:
+    """Move a fully written ``staging`` folder to ``target``, replacing what was there."""
+    previous = target.with_name(f".{target.name}.old")
+    shutil.rmtree(previous, ignore_errors=True)
+    if target.exists():
+        os.rename(target, previous)
+    os.rename(staging, target)
+    shutil.rmtree(previous, ignore_errors=True)
@@ -0,0 +1,502 @@
+"""Long-lived TF-IDF index over the ``alat`` catalog used by the Flask API."""
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass, replace
+from typing import TYPE_CHECKING, Any, Callable, Dict, FrozenSet, List, Sequence, Set, Tuple
+
+import numpy as np
+
+from recommender.sharding import ShardPool, merge_top_k, split_ranges
+from utils.metrics import registry, stage
+from utils.scoring import top_k_positions
+from utils.startup import lazy_import
+
+if TYPE_CHECKING:
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+# Dipakai juga oleh MappedCatalogIndex (shared_index.py) untuk men-transform query tanpa vectorizer.
+VECTORIZER_PARAMS = {"ngram_range": (1, 2), "min_df": 1}
+
+FILTERED = registry.counter("eq_recommend_filtered_total", "Alat yang gugur oleh filter overlap/similarity/budget.")
+
+
+@dataclass(slots=True)
+class AlatFeatures:
+    """Preprocessed tokens and flags derived from one ``Alat`` text."""
+
+    tokens: List[str]
+    token_set: FrozenSet[str]
+    flags: Dict[str, bool]
+
+
+class TokenCache:
+    """Per-``Alat`` cache of :class:`AlatFeatures`, keyed by ``id_alat``.
+
+    Each entry remembers the ``(kebutuhan_konten, deskripsi)`` pair it was
+    computed from, so a row is only re-tokenized when that text changes.
+    """
+
+    def __init__(
+        self,
+        tokenize: Callable[[str], List[str]],
+        detect_flags: Callable[[List[str]], Dict[str, bool]],
+    ) -> None:
+        self._tokenize = tokenize
+        self._detect_flags = detect_flags
+        self._entries: Dict[int, Tuple[Tuple[Any, Any], AlatFeatures]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, row: Any) -> AlatFeatures:
+        source = (row.kebutuhan_konten, row.deskripsi)
+        entry = self._entries.get(row.id_alat)
+        if entry is not None and entry[0] == source:
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        tokens = self._tokenize(f"{row.kebutuhan_konten} {row.deskripsi}")
+        features = AlatFeatures(tokens=tokens, token_set=frozenset(tokens), flags=self._detect_flags(tokens))
+        with self._lock:
+            self._entries[row.id_alat] = (source, features)
+        return features
+
+    def invalidate(self, alat_id: int | None = None) -> None:
+        with self._lock:
+            if alat_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(alat_id, None)
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
+
+
+def _unique_counts(values: np.ndarray, size: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Sorted distinct ``values`` (row positions below ``size``) and how often each occurs."""
+    if len(values) * 8 >= size:
+        # Banyak hit: bincount atas seluruh katalog lebih murah daripada sort.
+        counts = np.bincount(values, minlength=size)
+        rows = np.flatnonzero(counts)
+        return rows, counts[rows]
+    if not len(values):
+        return values.astype(np.int64), np.empty(0, dtype=np.int64)
+    values = np.sort(values)
+    starts = np.flatnonzero(np.r_[True, values[1:] != values[:-1]])
+    return values[starts], np.diff(np.r_[starts, len(values)])
+
+
+@dataclass(slots=True)
+class ScoredItem:
+    """One ranked row of :meth:`CatalogIndex.score`; ``position`` indexes ``ids``."""
+
+    position: int
+    score: float
+    sim: float
+    budget_factor: float
+    overlap: float
+    penalty: float
+
+
+@dataclass(frozen=True, slots=True)
+class CandidateFilter:
+    """Optional pre-filters applied to candidates before they are scored."""
+
+    in_stock: bool = False
+    categories: FrozenSet[int] = frozenset()
+
+
+NO_FILTER = CandidateFilter()
+
+
+@dataclass(slots=True)
+class CatalogIndex:
+    """Fitted vocabulary, IDF weights and document matrix for one catalog snapshot.
+
+    The TF-IDF matrix is stored in CSC form, i.e. as an inverted index
+    from term/bigram to the rows containing it, next to a binary token
+    matrix (normalized token -> rows) and the columns needed by the
+    scoring formula (price, rating, stock, category, lowlight flag). A
+    query only touches rows that share at least one term or token with it;
+    every other row would have ``sim == 0`` and ``overlap == 0`` and be
+    dropped anyway.
+    """
+
+    ids: List[int]
+    features: List[AlatFeatures]
+    vectorizer: TfidfVectorizer | None
+    term_postings: Any
+    prices: np.ndarray
+    ratings: np.ndarray
+    stocks: np.ndarray
+    categories: np.ndarray
+    lowlight: np.ndarray
+    token_vocab: Dict[str, int]
+    token_matrix: Any
+
+    @classmethod
+    def build(
+        cls,
+        ids: Sequence[int],
+        features: Sequence[AlatFeatures],
+        prices: Sequence[int],
+        ratings: Sequence[float],
+        stocks: Sequence[int] = (),
+        categories: Sequence[int] = (),
+    ) -> "CatalogIndex":
+        # scikit-learn/scipy baru diimpor di build pertama, bukan saat app.py diimpor.
+        sparse = lazy_import("scipy.sparse")
+        vectorizer = lazy_import("sklearn.feature_extraction.text").TfidfVectorizer(**VECTORIZER_PARAMS)
+        try:
+            matrix = vectorizer.fit_transform([" ".join(item.tokens) for item in features])
+        except ValueError:
+            # Catalog tanpa satu pun token: semua similarity dianggap 0.
+            vectorizer, matrix = None, None
+
+        token_vocab: Dict[str, int] = {}
+        rows: List[int] = []
+        cols: List[int] = []
+        for row, item in enumerate(features):
+            for token in item.token_set:
+                rows.append(row)
+                cols.append(token_vocab.setdefault(token, len(token_vocab)))
+        token_matrix = sparse.csc_matrix(
+            (np.ones(len(rows), dtype=np.int32), (rows, cols)),
+            shape=(len(features), len(token_vocab)),
+        )
+        count = len(features)
+        return cls(
+            ids=list(ids),
+            features=list(features),
+            vectorizer=vectorizer,
+            term_postings=matrix.tocsc() if matrix is not None else None,
+            prices=np.asarray(prices, dtype=np.int64),
+            ratings=np.asarray(ratings, dtype=np.float64),
+            stocks=np.asarray(stocks, dtype=np.int64) if len(stocks) else np.ones(count, dtype=np.int64),
+            categories=np.asarray(categories, dtype=np.int64) if len(categories) else np.zeros(count, dtype=np.int64),
+            lowlight=np.fromiter((item.flags.get("lowlight", False) for item in features), dtype=bool, count=count),
+            token_vocab=token_vocab,
+            token_matrix=token_matrix,
+        )
+
+    def candidates(self, term_scores: Any, query_set: Set[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Sorted rows sharing a term or a token with the query, with their similarity and token overlap count.
+
+        ``term_scores`` is the sparse ``(1, n)`` product of the query vector
+        with the inverted index; its non-zero columns are the rows that share
+        a term or bigram with the query.
+        """
+        count = len(self.ids)
+        columns = self.token_columns(query_set)
+        token_hits = (
+            np.concatenate([self.token_matrix.indices[self.token_matrix.indptr[c] : self.token_matrix.indptr[c + 1]] for c in columns])
+            if columns
+            else np.empty(0, dtype=np.int64)
+        )
+        token_rows, token_counts = _unique_counts(token_hits, count)
+        if term_scores is None:
+            term_rows, term_sims = np.empty(0, dtype=np.int64), np.empty(0)
+        else:
+            term_rows, term_sims = term_scores.indices, term_scores.data
+        positions = _unique_counts(np.concatenate([term_rows, token_rows]), count)[0]
+        sims = np.zeros(len(positions))
+        sims[np.searchsorted(positions, term_rows)] = term_sims
+        counts = np.zeros(len(positions), dtype=np.int64)
+        counts[np.searchsorted(positions, token_rows)] = token_counts
+        return positions, sims, counts
+
+    def token_columns(self, query_set: Set[str]) -> List[int]:
+        return [self.token_vocab[token] for token in query_set if token in self.token_vocab]
+
+    def flags(self, position: int) -> Dict[str, bool]:
+        return self.features[position].flags
+
+    def score(
+        self,
+        query_tokens: List[str],
+        query_flags: Dict[str, bool],
+        budget: int,
+        top_k: int = 10,
+        filters: CandidateFilter = NO_FILTER,
+    ) -> List[ScoredItem]:
+        """Score one query against its candidate rows and return the ``top_k`` best.
+
+        Same formula as the original per-row loop in ``app.recommend``:
+        ``0.6*sim + 0.25*overlap + 0.05*rating + 0.1*budget_factor - penalty``,
+        evaluated in the same operation order. ``sim`` differs from that loop:
+        the IDF is fitted on the catalog alone, whereas the loop refitted the
+        vectorizer with the query as an extra document, so similarities (and
+        occasionally the ranking) changed when the index was introduced.
+        """
+        return self.score_many([(query_tokens, query_flags, budget)], top_k=top_k, filters=[filters])[0]
+
+    def score_many(
+        self,
+        queries: Sequence[Tuple[List[str], Dict[str, bool], int]],
+        top_k: int = 10,
+        filters: Sequence[CandidateFilter] | None = None,
+    ) -> List[List[ScoredItem]]:
+        """Score ``(tokens, flags, budget)`` queries, results in input order.
+
+        ``filters`` (one per query) and the budget ceiling are applied to the
+        candidate rows before any similarity is computed.
+        """
+        if not queries:
+            return []
+        ranked, filtered = self.rank_many(queries, top_k, filters, self.query_vectors(queries))
+        FILTERED.inc(filtered)
+        return ranked
+
+    def query_vectors(self, queries: Sequence[Tuple[List[str], Dict[str, bool], int]]) -> Any:
+        if self.vectorizer is None:
+            return None
+        return self.vectorizer.transform([" ".join(tokens) for tokens, _, _ in queries])
+
+    def rank_many(
+        self,
+        queries: Sequence[Tuple[List[str], Dict[str, bool], int]],
+        top_k: int,
+        filters: Sequence[CandidateFilter] | None,
+        query_vecs: Any,
+    ) -> Tuple[List[List[ScoredItem]], int]:
+        """Ranked items per query plus the number of rows filtered out, given query vectors.
+
+        Also runs inside shard workers, which hold a row partition but no vectorizer.
+        """
+        ranked: List[List[ScoredItem]] = []
+        filtered = 0
+        for q, (tokens, flags, budget) in enumerate(queries):
+            term_scores = None
+            if query_vecs is not None:
+                with stage("similarity"):
+                    # Per kolom sama persis dengan linear_kernel(query, matrix), tapi hanya
+                    # menyentuh posting list term query: kerja ~ jumlah baris yang cocok.
+                    term_scores = query_vecs[q] @ self.term_postings.T
+            with stage("candidates"):
+                positions, sims, counts = self.candidates(term_scores, set(tokens))
+                keep = self._prefilter(positions, budget, filters[q] if filters else NO_FILTER)
+                positions, sims, counts = positions[keep], sims[keep], counts[keep]
+            with stage("scoring"):
+                items, passed = self._rank(positions, counts, sims, tokens, flags, budget, top_k)
+            ranked.append(items)
+            filtered += len(self.ids) - passed
+        return ranked, filtered
+
+    def _prefilter(self, positions: np.ndarray, budget: int, filters: CandidateFilter) -> np.ndarray:
+        keep = np.ones(len(positions), dtype=bool)
+        if budget > 0:
+            keep &= self.prices[positions] <= budget * 1.2
+        if filters.in_stock:
+            keep &= self.stocks[positions] > 0
+        if filters.categories:
+            keep &= np.isin(self.categories[positions], list(filters.categories))
+        return keep
+
+    def _rank(
+        self,
+        positions: np.ndarray,
+        counts: np.ndarray,
+        sims: np.ndarray,
+        tokens: List[str],
+        flags: Dict[str, bool],
+        budget: int,
+        top_k: int,
+    ) -> Tuple[List[ScoredItem], int]:
+        size = len(set(tokens))
+        overlap = counts / size if size else np.zeros(len(positions))
+        prices = self.prices[positions]
+        if budget <= 0:
+            budget_factor = np.ones(len(positions))
+        else:
+            budget_factor = np.clip((budget - prices) / max(budget, 1), 0.25, 1.0)
+        penalized = bool(flags.get("outdoor")) and not flags.get("lowlight")
+        penalty = np.where(penalized & self.lowlight[positions], 0.15, 0.0)
+
+        scores = sims * 0.6 + overlap * 0.25 + self.ratings[positions] * 0.05 + budget_factor * 0.1 - penalty
+
+        mask = (overlap > 0) | (sims >= 0.02)
+        local = np.flatnonzero(mask)
+        items = [
+            ScoredItem(
+                position=int(positions[i]),
+                score=float(scores[i]),
+                sim=sims[i],
+                budget_factor=float(budget_factor[i]),
+                overlap=float(overlap[i]),
+                penalty=float(penalty[i]),
+            )
+            for i in top_k_positions(local, scores[local], top_k)
+        ]
+        return items, len(local)
+
+    def partition(self, shards: int) -> List[Tuple[int, "CatalogIndex"]]:
+        """Split rows into ``(offset, part)`` pairs sharing this index's vocabulary and IDF.
+
+        Parts carry no vectorizer or features; they are scored with query
+        vectors computed once by the caller (see :meth:`rank_many`).
+        """
+        parts = []
+        for start, stop in split_ranges(len(self.ids), shards):
+            part = replace(
+                self,
+                ids=self.ids[start:stop],
+                features=[],
+                vectorizer=None,
+                term_postings=self.term_postings[start:stop] if self.term_postings is not None else None,
+                prices=self.prices[start:stop],
+                ratings=self.ratings[start:stop],
+                stocks=self.stocks[start:stop],
+                categories=self.categories[start:stop],
+                lowlight=self.lowlight[start:stop],
+                token_matrix=self.token_matrix[start:stop],
+            )
+            parts.append((start, part))
+        return parts
+
+
+class ShardedIndex:
+    """:class:`CatalogIndex` scoring spread over the row partitions held by a :class:`ShardPool`.
+
+    Query vectors are computed once here, every shard returns its local
+    top-k and the results are merged, giving the same ranking as the
+    unsharded index.
+    """
+
+    def __init__(self, index: CatalogIndex, pool: ShardPool, version: Any) -> None:
+        self.index = index
+        self.pool = pool
+        self.version = version
+        parts = index.partition(pool.shards)
+        self.offsets = [offset for offset, _ in parts]
+        pool.ensure("alat", version, lambda: [part for _, part in parts])
+
+    @property
+    def ids(self) -> List[int]:
+        return self.index.ids
+
+    @property
+    def features(self) -> List[AlatFeatures]:
+        return self.index.features
+
+    def flags(self, position: int) -> Dict[str, bool]:
+        return self.index.flags(position)
+
+    def score_many(
+        self,
+        queries: Sequence[Tuple[List[str], Dict[str, bool], int]],
+        top_k: int = 10,
+        filters: Sequence[CandidateFilter] | None = None,
+    ) -> List[List[ScoredItem]]:
+        if not queries:
+            return []
+        query_vecs = self.index.query_vectors(queries)
+        with stage("shards"):
+            results = self.pool.map("alat", self.version, "rank_many", queries, top_k, filters, query_vecs)
+        ranked: List[List[ScoredItem]] = []
+        for q in range(len(queries)):
+            shard_items = []
+            for offset, (shard_ranked, _) in zip(self.offsets, results):
+                for item in shard_ranked[q]:
+                    item.position += offset
+                shard_items.append(shard_ranked[q])
+            ranked.append(merge_top_k(shard_items, top_k, lambda item: item.score, lambda item: item.position))
+        FILTERED.inc(sum(filtered for _, filtered in results))
+        return ranked
+
+
+class CatalogIndexHolder:
+    """Keeps the index of the current catalog generation and rebuilds it when the generation changes.
+
+    A request only passes the generation key (see ``app.catalog_generation``);
+    the ``Alat`` rows are loaded and tokenized only when that key differs from
+    the one the current index was built for, and unchanged rows reuse their
+    cached tokens. With a ``store`` (see ``recommender/shared_index.py``) the
+    index of each generation is built once, published as memory-mapped files
+    and attached by every worker process.
+    """
+
+    def __init__(
+        self,
+        token_cache: TokenCache,
+        shard_pool: ShardPool | None = None,
+        shard_min_rows: int = 50000,
+        store: Any = None,
+    ) -> None:
+        self.token_cache = token_cache
+        self.shard_pool = shard_pool
+        self.shard_min_rows = shard_min_rows
+        self.store = store
+        self._lock = threading.Lock()
+        self._scorer: CatalogIndex | ShardedIndex | None = None
+        self._generation: str | None = None
+        self.builds = 0
+        self.attaches = 0
+
+    def get(self, generation: str, load_rows: Callable[[], Sequence[Any]]) -> CatalogIndex | ShardedIndex:
+        """The index of ``generation``; ``load_rows`` is only called when it has to be built.
+
+        With a store only the first worker to need a generation builds and
+        publishes it, so the others never hold the ``Alat`` rows, token lists
+        or a private TF-IDF matrix.
+        """
+        with self._lock:
+            if self._scorer is not None and self._generation == generation:
+                return self._scorer
+            if self.store is None:
+                index = self._build(load_rows())
+                self.builds += 1
+            else:
+                index = self._attach(generation, load_rows)
+            self._generation = generation
+            self._scorer = self._with_shards(index, generation)
+            return self._scorer
+
+    def _attach(self, generation: str, load_rows: Callable[[], Sequence[Any]]) -> CatalogIndex:
+        with stage("attach"):
+            index = self.store.attach(generation)
+        if index is None:
+            with self.store.lock():
+                # Worker lain mungkin sudah selesai membangun selama kita menunggu lock.
+                index = self.store.attach(generation)
+                if index is None:
+                    self._publish(generation, load_rows())
+                    index = self.store.attach(generation)
+        self.attaches += 1
+        return index
+
+    def _build(self, rows: Sequence[Any]) -> CatalogIndex:
+        with stage("tokenize"):
+            features = [self.token_cache.get(row) for row in rows]
+        with stage("fit"):
+            return CatalogIndex.build(
+                [row.id_alat for row in rows],
+                features,
+                [row.harga_sewa for row in rows],
+                [row.rating_alat for row in rows],
+                [row.stok for row in rows],
+                [row.id_kategori for row in rows],
+            )
+
+    def _publish(self, generation: str, rows: Sequence[Any]) -> None:
+        index = self._build(rows)
+        with stage("publish"):
+            self.store.publish(generation, index)
+            self.store.retire(generation)
+        self.builds += 1
+        # Token per alat tidak disimpan: worker yang kebetulan membangun tetap kecil.
+        self.token_cache.invalidate()
+
+    def _with_shards(self, index: CatalogIndex, version: Any) -> CatalogIndex | ShardedIndex:
+        # Katalog besar: partisi dikirim ke proses shard sekali per build.
+        if self.shard_pool is not None and self.shard_pool.shards > 1 and len(index.ids) >= self.shard_min_rows:
+            return ShardedIndex(index, self.shard_pool, version)
+        return index
+
+    def invalidate(self, alat_id: int | None = None) -> None:
+        """Drop the fitted index; ``alat_id`` also evicts that row's cached tokens."""
+        if alat_id is not None:
+            self.token_cache.invalidate(alat_id)
+        with self._lock:
+            self._scorer = None
+            self._generation = None
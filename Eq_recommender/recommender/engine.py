@@ -1,30 +1,103 @@
 """High-level orchestration for generating equipment recommendations."""
 from __future__ import annotations
 
-from functools import lru_cache
-from typing import List
+import atexit
+import os
+from typing import List, Tuple
 
-from data.loader import load_equipment
 from nlp.parser import parse_preferences
+from recommender.kit_catalog import CatalogSnapshot, KitCatalog
+from recommender.sharding import ShardPool, merge_top_k, split_ranges
+from utils.metrics import registry, stage
+from utils.result_cache import ResultCache
 from utils.models import EquipmentKit, Preference
-from utils.scoring import score_kit
+
+# Katalog dipantau (mtime/size + hash) dan dimuat ulang di background saat CSV berubah.
+# Dengan EQ_SHARED_INDEX_DIR, kit hasil parse disimpan di <dir>/kits dan dipakai ulang selama hash CSV sama.
+KIT_ARTIFACT_DIR = os.path.join(os.environ["EQ_SHARED_INDEX_DIR"], "kits") if os.environ.get("EQ_SHARED_INDEX_DIR") else None
+catalog = KitCatalog(artifact_dir=KIT_ARTIFACT_DIR)
+
+# Hasil per (preferensi, top_k, versi katalog); reload katalog otomatis membuat key lama tak terpakai.
+result_cache = ResultCache(
+    maxsize=int(os.environ.get("EQ_RESULT_CACHE_SIZE", 1024)),
+    ttl=float(os.environ.get("EQ_RESULT_CACHE_TTL", 300)),
+)
+
+
+# EQ_SCORING_SHARDS > 1: katalog dengan >= EQ_SHARD_MIN_ROWS kit di-scoring paralel di proses shard.
+SCORING_SHARDS = int(os.environ.get("EQ_SCORING_SHARDS", 1))
+SHARD_MIN_ROWS = int(os.environ.get("EQ_SHARD_MIN_ROWS", 50000))
+shard_pool = ShardPool(SCORING_SHARDS) if SCORING_SHARDS > 1 else None
+if shard_pool is not None:
+    atexit.register(shard_pool.shutdown)
+
+
+def _collect_stats() -> None:
+    for key, value in result_cache.stats().items():
+        registry.gauge(f"eq_engine_result_cache_{key}").set(value)
+
+
+registry.add_collector(_collect_stats)
 
 
-@lru_cache(maxsize=1)
 def _load_kits() -> List[EquipmentKit]:
-    rows = load_equipment()
-    return [EquipmentKit.from_row(row) for row in rows]
+    return catalog.snapshot().kits
+
+
+def catalog_info() -> dict:
+    """Version, content hash and last reload time of the kit catalog in use."""
+    return catalog.info()
+
+
+def preference_key(preference: Preference) -> Tuple:
+    # score_kit hanya memakai irisan himpunan environment/focus, jadi urutan & duplikat tidak berpengaruh.
+    return (
+        tuple(sorted(set(preference.environment))),
+        preference.budget,
+        preference.mobility,
+        preference.expertise,
+        tuple(sorted(set(preference.focus))),
+        preference.audio_priority,
+        preference.stabilization_priority,
+        preference.lighting,
+    )
+
+
+def _score(snapshot: CatalogSnapshot, preference: Preference, top_k: int) -> List[dict]:
+    matrix = snapshot.matrix
+    if shard_pool is None or len(matrix) < SHARD_MIN_ROWS:
+        # Setara dengan score_kit per kit + sorted(), tapi satu pass vektor + partial top-k.
+        return matrix.recommend(preference, top_k=top_k)
+    # Digest konten sebagai versi: unik lintas instance KitCatalog.
+    shard_pool.ensure("kits", snapshot.digest, lambda: [part for _, part in matrix.partition(shard_pool.shards)])
+    results = shard_pool.map("kits", snapshot.digest, "top_k", preference, top_k)
+    offsets = [start for start, _ in split_ranges(len(matrix), shard_pool.shards)]
+    merged = merge_top_k(
+        [[(pos + offset, score) for pos, score in items] for offset, items in zip(offsets, results)],
+        top_k,
+        score=lambda item: item[1],
+        position=lambda item: item[0],
+    )
+    return [{"name": snapshot.kits[pos].name, "score": score, "kit": snapshot.kits[pos]} for pos, score in merged]
 
 
 def recommend(preference: Preference, top_k: int = 3) -> List[dict]:
-    kits = _load_kits()
-    scored = [score_kit(kit, preference) for kit in kits]
-    ranked = sorted(scored, key=lambda item: item["score"], reverse=True)
-    return ranked[:top_k]
+    with stage("catalog", path="engine"):
+        snapshot = catalog.snapshot()
+    registry.gauge("eq_engine_catalog_size", "Jumlah kit di katalog engine.").set(len(snapshot.kits))
+    key = (preference_key(preference), top_k, snapshot.version)
+    results = result_cache.get(key)
+    if results is None:
+        with stage("scoring", path="engine"):
+            results = _score(snapshot, preference, top_k)
+        result_cache.put(key, results)
+    registry.counter("eq_engine_results_total", "Kit yang dikembalikan engine.recommend.").inc(len(results))
+    return [dict(item) for item in results]
 
 
 def recommend_from_text(user_text: str, top_k: int = 3) -> List[dict]:
-    preference = parse_preferences(user_text)
+    with stage("parse", path="engine"):
+        preference = parse_preferences(user_text)
     if not preference.has_signals():
         raise ValueError("Deskripsi belum mencantumkan kebutuhan yang bisa dipahami. Tambahkan konteks seperti lingkungan, fokus, atau prioritas.")
     if not preference.environment:
@@ -0,0 +1,219 @@
+"""Hot-reloadable kit catalog for :mod:`recommender.engine`.
+
+The CSV source is checked by mtime and size; when those change its content
+hash decides whether the kits really changed. A new :class:`CatalogSnapshot`
+is built in a background thread and swapped in with a single assignment,
+so callers that already hold a snapshot keep scoring against it.
+
+With an ``artifact_dir`` (``flask build-index --kits`` or the first build)
+the parsed kits and :class:`KitMatrix` columns are stored there together
+with the CSV hash; a later build with the same hash loads them instead of
+parsing the CSV, and a different hash rebuilds and rewrites the artifact.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from dataclasses import asdict, dataclass, fields
+from datetime import datetime
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
+
+from data.loader import DATA_FILE, load_equipment
+from recommender import artifacts
+from recommender.kit_matrix import KitMatrix
+from utils.models import EquipmentKit
+
+logger = logging.getLogger(__name__)
+
+ARTIFACT_FORMAT = 1
+
+
+@dataclass(frozen=True, slots=True)
+class CatalogSnapshot:
+    version: int
+    digest: str
+    kits: List[EquipmentKit]
+    matrix: KitMatrix
+    loaded_at: datetime
+    source: Tuple[int, int]
+
+
+def _stat(path: Path) -> Tuple[int, int]:
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+
+def _digest(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def save_artifact(directory: Path, digest: str, kits: List[EquipmentKit], matrix: KitMatrix) -> Path:
+    """Write ``kits`` and ``matrix`` (built from a CSV with hash ``digest``) to ``directory``."""
+    directory = Path(directory)
+    directory.parent.mkdir(parents=True, exist_ok=True)
+    columns = {field.name: getattr(matrix, field.name) for field in fields(KitMatrix) if field.name != "kits"}
+    staging = Path(tempfile.mkdtemp(prefix=f".{directory.name}-", dir=directory.parent))
+    try:
+        np.savez(staging / "matrix.npz", **{name: value for name, value in columns.items() if isinstance(value, np.ndarray)})
+        vocab = {name: value for name, value in columns.items() if isinstance(value, dict)}
+        (staging / "vocab.json").write_text(json.dumps(vocab, ensure_ascii=False), encoding="utf-8")
+        (staging / "kits.json").write_text(json.dumps([asdict(kit) for kit in kits], ensure_ascii=False), encoding="utf-8")
+        artifacts.write_manifest(
+            staging, {"format": ARTIFACT_FORMAT, "digest": digest, "kits": len(kits), "created": datetime.now().isoformat()}
+        )
+        artifacts.replace_directory(staging, directory)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+    return directory
+
+
+def build_artifact(directory: Path, path: Path | None = None) -> int:
+    """Parse the kit CSV at ``path`` and write its artifact to ``directory``; returns the kit count."""
+    path = Path(path or DATA_FILE)
+    kits = [EquipmentKit.from_row(row) for row in load_equipment(path)]
+    save_artifact(directory, _digest(path), kits, KitMatrix.build(kits))
+    return len(kits)
+
+
+def load_artifact(directory: Path, digest: str) -> Tuple[List[EquipmentKit], KitMatrix] | None:
+    """Kits and matrix stored for CSV hash ``digest``; ``None`` if missing, stale or corrupt."""
+    directory = Path(directory)
+    if not directory.exists():
+        return None
+    problems = artifacts.verify(directory, format=ARTIFACT_FORMAT, digest=digest)
+    if problems:
+        logger.info("Artifact kit %s tidak dipakai: %s", directory, "; ".join(problems))
+        return None
+    kits = [EquipmentKit(**row) for row in json.loads((directory / "kits.json").read_text(encoding="utf-8"))]
+    vocab = json.loads((directory / "vocab.json").read_text(encoding="utf-8"))
+    with np.load(directory / "matrix.npz") as arrays:
+        columns = {name: arrays[name] for name in arrays.files}
+    return kits, KitMatrix(kits=kits, **vocab, **columns)
+
+
+class KitCatalog:
+    """Holds the current :class:`CatalogSnapshot` and reloads it when the CSV changes."""
+
+    def __init__(self, path: Path | None = None, check_interval: float = 1.0, artifact_dir: Path | None = None) -> None:
+        self.path = Path(path or DATA_FILE)
+        self.artifact_dir = Path(artifact_dir) if artifact_dir else None
+        self.check_interval = check_interval
+        self._snapshot: CatalogSnapshot | None = None
+        self._lock = threading.Lock()
+        self._reloading = threading.Event()
+        self._reload_lock = threading.Lock()
+        self._last_check = 0.0
+        # (mtime, size) sumber yang terakhir gagal dimuat; tidak dicoba lagi sampai file berubah.
+        self._failed_source: Tuple[int, int] | None = None
+        self.reload_errors = 0
+
+    def snapshot(self) -> CatalogSnapshot:
+        """Current snapshot; triggers a background reload if the source changed."""
+        current = self._snapshot
+        if current is None:
+            with self._lock:
+                if self._snapshot is None:
+                    self._snapshot = self._build(version=1)
+                return self._snapshot
+        self._maybe_reload(current)
+        return current
+
+    def reload(self, wait: bool = True) -> CatalogSnapshot:
+        """Force a reload check now, optionally waiting for it to finish.
+
+        With ``wait`` a reload already running in the background is waited for first.
+        """
+        current = self._snapshot or self.snapshot()
+        self._last_check = 0.0
+        if wait:
+            self._reload(current)
+        else:
+            self._maybe_reload(current)
+        return self._snapshot
+
+    def info(self) -> dict:
+        current = self.snapshot()
+        return {
+            "version": current.version,
+            "digest": current.digest,
+            "loaded_at": current.loaded_at.isoformat(timespec="seconds"),
+            "kits": len(current.kits),
+            "path": str(self.path),
+            "artifact": str(self.artifact_dir) if self.artifact_dir else None,
+            "reload_errors": self.reload_errors,
+        }
+
+    def _maybe_reload(self, current: CatalogSnapshot) -> None:
+        now = time.monotonic()
+        if now - self._last_check < self.check_interval or self._reloading.is_set():
+            return
+        self._last_check = now
+        try:
+            if _stat(self.path) in (current.source, self._failed_source):
+                return
+        except OSError:
+            return
+        self._reloading.set()
+        threading.Thread(target=self._reload, args=(current,), name="kit-catalog-reload", daemon=True).start()
+
+    def _reload(self, current: CatalogSnapshot) -> None:
+        # Reload paksa dan reload background tidak pernah berjalan bersamaan: yang kedua
+        # menunggu, lalu melihat snapshot hasil yang pertama (versi tidak terpakai dua kali).
+        with self._reload_lock:
+            self._reloading.set()
+            source = None
+            try:
+                source = _stat(self.path)
+                digest = _digest(self.path)
+                with self._lock:
+                    latest = self._snapshot or current
+                    if digest == latest.digest:
+                        # Hanya mtime yang berubah (mis. `touch`); tidak perlu rebuild.
+                        self._snapshot = CatalogSnapshot(
+                            latest.version, latest.digest, latest.kits, latest.matrix, latest.loaded_at, source
+                        )
+                        self._failed_source = None
+                        return
+                fresh = self._build(version=latest.version + 1)
+                with self._lock:
+                    self._snapshot = fresh
+                    self._failed_source = None
+                logger.info("Katalog kit dimuat ulang: versi %d (%d kit)", fresh.version, len(fresh.kits))
+            except Exception:
+                self.reload_errors += 1
+                self._failed_source = source
+                logger.exception("Gagal memuat ulang katalog kit dari %s; versi lama tetap dipakai", self.path)
+            finally:
+                self._reloading.clear()
+
+    def _build(self, version: int) -> CatalogSnapshot:
+        source = _stat(self.path)
+        digest = _digest(self.path)
+        loaded = load_artifact(self.artifact_dir, digest) if self.artifact_dir else None
+        if loaded is not None:
+            kits, matrix = loaded
+        else:
+            kits = [EquipmentKit.from_row(row) for row in load_equipment(self.path)]
+            matrix = KitMatrix.build(kits)
+            if self.artifact_dir:
+                try:
+                    save_artifact(self.artifact_dir, digest, kits, matrix)
+                except OSError:
+                    logger.warning("Gagal menulis artifact kit ke %s", self.artifact_dir, exc_info=True)
+        return CatalogSnapshot(
+            version=version,
+            digest=digest,
+            kits=kits,
+            matrix=matrix,
+            loaded_at=datetime.now(),
+            source=source,
+        )
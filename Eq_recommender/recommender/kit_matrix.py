@@ -0,0 +1,153 @@
+"""Columnar, precompiled form of the kit catalog for vectorized scoring."""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+from recommender.sharding import split_ranges
+from utils.models import EquipmentKit, Preference
+from utils.scoring import top_k_positions
+
+BAND_ORDER = {"low": 1, "medium": 2, "high": 3}
+MOBILITY_VALUE = {"high": 1.0, "medium": 0.5, "low": 0.0}
+QUALITY_VALUE = {"high": 1.0, "medium": 0.5}
+
+# popcount untuk setiap nilai byte, dipakai menghitung irisan bitset.
+_POPCOUNT8 = np.array([bin(value).count("1") for value in range(256)], dtype=np.int64)
+
+
+def _bitsets(values: Sequence[Iterable[str]], vocab: Dict[str, int]) -> np.ndarray:
+    bits = np.zeros((len(values), max(1, len(vocab))), dtype=bool)
+    for row, tags in enumerate(values):
+        for tag in tags:
+            bits[row, vocab[tag]] = True
+    return np.packbits(bits, axis=1)
+
+
+def _vocab(values: Sequence[Iterable[str]]) -> Dict[str, int]:
+    vocab: Dict[str, int] = {}
+    for tags in values:
+        for tag in tags:
+            vocab.setdefault(tag, len(vocab))
+    return vocab
+
+
+@dataclass(slots=True)
+class KitMatrix:
+    """Kit attributes encoded as integer, float and packed bitset columns.
+
+    :meth:`scores` reproduces :func:`utils.scoring.score_kit` term by term,
+    in the same order, so the float results are identical.
+    """
+
+    kits: List[EquipmentKit]
+    environment_vocab: Dict[str, int]
+    environment_bits: np.ndarray
+    best_for_vocab: Dict[str, int]
+    best_for_bits: np.ndarray
+    has_outdoor: np.ndarray
+    has_indoor: np.ndarray
+    band: np.ndarray
+    mobility: np.ndarray
+    audio: np.ndarray
+    stabilization: np.ndarray
+    experience_vocab: Dict[str, int]
+    experience: np.ndarray
+
+    @classmethod
+    def build(cls, kits: Sequence[EquipmentKit]) -> "KitMatrix":
+        kits = list(kits)
+        environments = [set(kit.environment) for kit in kits]
+        best_for = [set(kit.best_for) for kit in kits]
+        environment_vocab = _vocab(environments)
+        best_for_vocab = _vocab(best_for)
+        experience_vocab = _vocab([[kit.experience] for kit in kits])
+        return cls(
+            kits=kits,
+            environment_vocab=environment_vocab,
+            environment_bits=_bitsets(environments, environment_vocab),
+            best_for_vocab=best_for_vocab,
+            best_for_bits=_bitsets(best_for, best_for_vocab),
+            has_outdoor=np.array(["outdoor" in env for env in environments], dtype=bool),
+            has_indoor=np.array(["indoor" in env for env in environments], dtype=bool),
+            band=np.array([BAND_ORDER.get(kit.price_band, 2) for kit in kits], dtype=np.int64),
+            mobility=np.array([MOBILITY_VALUE.get(kit.portability, 0.5) for kit in kits]),
+            audio=np.array([QUALITY_VALUE.get(kit.audio_quality, 0.0) for kit in kits]),
+            stabilization=np.array([QUALITY_VALUE.get(kit.stabilization, 0.0) for kit in kits]),
+            experience_vocab=experience_vocab,
+            experience=np.array([experience_vocab[kit.experience] for kit in kits], dtype=np.int64),
+        )
+
+    def __len__(self) -> int:
+        return len(self.kits)
+
+    def _overlap(self, bits: np.ndarray, vocab: Dict[str, int], tags: Iterable[str]) -> np.ndarray:
+        query = _bitsets([[tag for tag in set(tags) if tag in vocab]], vocab)[0]
+        return _POPCOUNT8[bits & query].sum(axis=1)
+
+    def scores(self, pref: Preference) -> np.ndarray:
+        score = np.zeros(len(self.kits))
+
+        if pref.environment:
+            overlap = self._overlap(self.environment_bits, self.environment_vocab, pref.environment)
+            score += overlap * 1.5
+            if pref.lighting == "daylight":
+                score -= np.where(self.has_outdoor, 0.0, 0.5)
+            if pref.lighting == "lowlight":
+                score -= np.where(self.has_indoor, 0.0, 0.3)
+
+        if pref.focus:
+            focus_overlap = self._overlap(self.best_for_bits, self.best_for_vocab, pref.focus)
+            score += focus_overlap * 2.0
+
+        wanted_band = BAND_ORDER.get(pref.budget, 2)
+        score += np.maximum(0.5, 1.0 - np.abs(wanted_band - self.band) * 0.25)
+
+        score += self.mobility * (1.0 if pref.mobility == "high" else 0.6)
+
+        score += np.where(self.experience == self.experience_vocab.get(pref.expertise, -1), 1.0, 0.5)
+
+        if pref.audio_priority:
+            score += self.audio
+
+        if pref.stabilization_priority:
+            score += self.stabilization
+
+        return score
+
+    def top_k(self, pref: Preference, top_k: int = 3) -> List[Tuple[int, float]]:
+        """``(position, score)`` of the ``top_k`` best kits, best first."""
+        scores = self.scores(pref)
+        positions = top_k_positions(np.arange(len(self.kits)), scores, top_k)
+        return [(int(pos), float(scores[pos])) for pos in positions]
+
+    def recommend(self, pref: Preference, top_k: int = 3) -> List[dict]:
+        return [
+            {"name": self.kits[pos].name, "score": score, "kit": self.kits[pos]}
+            for pos, score in self.top_k(pref, top_k)
+        ]
+
+    def partition(self, shards: int) -> List[Tuple[int, "KitMatrix"]]:
+        """Split rows into ``(offset, part)`` pairs that keep the shared vocabularies."""
+        parts = []
+        for start, stop in split_ranges(len(self.kits), shards):
+            rows = slice(start, stop)
+            part = KitMatrix(
+                kits=self.kits[rows],
+                environment_vocab=self.environment_vocab,
+                environment_bits=self.environment_bits[rows],
+                best_for_vocab=self.best_for_vocab,
+                best_for_bits=self.best_for_bits[rows],
+                has_outdoor=self.has_outdoor[rows],
+                has_indoor=self.has_indoor[rows],
+                band=self.band[rows],
+                mobility=self.mobility[rows],
+                audio=self.audio[rows],
+                stabilization=self.stabilization[rows],
+                experience_vocab=self.experience_vocab,
+                experience=self.experience[rows],
+            )
+            parts.append((start, part))
+        return parts
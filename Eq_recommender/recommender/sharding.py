@@ -0,0 +1,100 @@
+"""Process pool that keeps catalog partitions resident and scatters scoring calls to them."""
+from __future__ import annotations
+
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Sequence, Tuple, TypeVar
+
+T = TypeVar("T")
+
+# Di proses worker: nama katalog -> {versi: partisi}. Versi sebelumnya tetap disimpan
+# supaya request yang sedang berjalan saat katalog berganti masih bisa selesai.
+_PARTS: Dict[str, Dict[Any, Any]] = {}
+_KEEP_VERSIONS = 2
+
+
+def _load_part(name: str, version: Any, part: Any) -> None:
+    versions = _PARTS.setdefault(name, {})
+    versions[version] = part
+    while len(versions) > _KEEP_VERSIONS:
+        versions.pop(next(iter(versions)))
+
+
+def _call_part(name: str, version: Any, method: str, args: tuple) -> Any:
+    part = _PARTS.get(name, {}).get(version)
+    if part is None:
+        raise RuntimeError(f"Shard {name!r} tidak memegang versi {version!r}")
+    return getattr(part, method)(*args)
+
+
+class ShardPool:
+    """One single-process executor per shard, so each partition stays in one worker.
+
+    :meth:`ensure` ships the partitions of a catalog version once;
+    :meth:`map` then calls a method on every partition in parallel and
+    returns the results in shard order. Workers start with ``spawn`` so a
+    threaded web server is never forked; as with any ``spawn`` pool, the
+    entry script must keep its startup code under ``if __name__ == "__main__"``.
+    """
+
+    def __init__(self, shards: int) -> None:
+        self.shards = max(1, shards)
+        self._executors: List[ProcessPoolExecutor] = []
+        self._versions: Dict[str, Any] = {}
+        self._counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _pool(self) -> List[ProcessPoolExecutor]:
+        if not self._executors:
+            context = multiprocessing.get_context("spawn")
+            self._executors = [ProcessPoolExecutor(max_workers=1, mp_context=context) for _ in range(self.shards)]
+        return self._executors
+
+    def ensure(self, name: str, version: Any, build_parts: Callable[[], Sequence[Any]]) -> None:
+        """Load ``build_parts()`` into the workers unless ``version`` is already loaded."""
+        with self._lock:
+            if self._versions.get(name) == version:
+                return
+            parts = build_parts()
+            futures = [executor.submit(_load_part, name, version, part) for executor, part in zip(self._pool(), parts)]
+            for future in futures:
+                future.result()
+            self._versions[name] = version
+            self._counts[name] = len(futures)
+
+    def map(self, name: str, version: Any, method: str, *args: Any) -> List[Any]:
+        executors = self._pool()[: self._counts[name]]
+        futures = [executor.submit(_call_part, name, version, method, args) for executor in executors]
+        return [future.result() for future in futures]
+
+    def shutdown(self) -> None:
+        with self._lock:
+            for executor in self._executors:
+                executor.shutdown(wait=False, cancel_futures=True)
+            self._executors = []
+            self._versions.clear()
+            self._counts.clear()
+
+
+def split_ranges(count: int, shards: int) -> List[Tuple[int, int]]:
+    """``shards`` contiguous ``(start, stop)`` row ranges covering ``count`` rows."""
+    shards = max(1, min(shards, count)) if count else 1
+    bounds = [count * i // shards for i in range(shards + 1)]
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def merge_top_k(
+    shard_results: Sequence[Sequence[T]],
+    top_k: int,
+    score: Callable[[T], float],
+    position: Callable[[T], int],
+) -> List[T]:
+    """Merge per-shard top-k lists (global positions) into the global top-k.
+
+    Ties are ordered by position, matching the stable sort used when the
+    whole catalog is ranked in one process.
+    """
+    merged = [item for items in shard_results for item in items]
+    merged.sort(key=lambda item: (-score(item), position(item)))
+    return merged[: max(top_k, 0)]
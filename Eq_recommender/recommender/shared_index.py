@@ -0,0 +1,306 @@
+"""Catalog index generations published as memory-mapped files and shared by worker processes.
+
+Satu generasi = satu folder ``gen-<kunci>`` berisi array ``.npy`` (matriks
+sparse sebagai data/indices/indptr, vocabulary sebagai blob UTF-8 + offset)
+dan ``meta.json`` (versi format, kunci generasi, parameter vectorizer dan
+sha256 tiap file, lihat :mod:`recommender.artifacts`). Folder ditulis ke nama sementara lalu di-rename, jadi
+worker tidak pernah melihat generasi setengah jadi. Worker membuka array
+dengan ``mmap_mode="r"``: halaman file dibagi oleh page cache OS, bukan
+disalin ke heap tiap proses.
+"""
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Sequence, Set
+
+import numpy as np
+
+from recommender import artifacts
+from recommender.catalog_index import VECTORIZER_PARAMS, CatalogIndex
+from utils.startup import lazy_import
+
+try:
+    import fcntl
+except ImportError:  # Windows: tanpa lock, worker bisa membangun bersamaan (hasilnya sama).
+    fcntl = None
+
+FORMAT_VERSION = 1
+
+# Bentuk JSON dari VECTORIZER_PARAMS (tuple jadi list) untuk dibandingkan dengan meta.json.
+_VECTORIZER_META = json.loads(json.dumps(VECTORIZER_PARAMS))
+
+
+@lru_cache(maxsize=1)
+def analyzer() -> Callable[[str], List[str]]:
+    """Analyzer of the index vectorizer; needs no fit, but its config must match :meth:`CatalogIndex.build`."""
+    return lazy_import("sklearn.feature_extraction.text").TfidfVectorizer(**VECTORIZER_PARAMS).build_analyzer()
+
+
+class StringTable:
+    """Sorted strings stored as one UTF-8 blob plus offsets; lookup by binary search.
+
+    UTF-8 byte order equals code point order, so the table can be searched
+    with the same ordering ``sorted()`` (and sklearn's vocabulary) uses.
+    """
+
+    __slots__ = ("blob", "offsets")
+
+    def __init__(self, blob: np.ndarray, offsets: np.ndarray) -> None:
+        self.blob = blob
+        self.offsets = offsets
+
+    @classmethod
+    def build(cls, strings: Sequence[str]) -> "StringTable":
+        encoded = [value.encode("utf-8") for value in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(value) for value in encoded], out=offsets[1:])
+        return cls(np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def _bytes(self, i: int) -> bytes:
+        return self.blob[self.offsets[i] : self.offsets[i + 1]].tobytes()
+
+    def __getitem__(self, i: int) -> str:
+        return self._bytes(i).decode("utf-8")
+
+    def find(self, value: str) -> int:
+        """Position of ``value``, or ``-1``."""
+        target = value.encode("utf-8")
+        low, high = 0, len(self)
+        while low < high:
+            mid = (low + high) // 2
+            if self._bytes(mid) < target:
+                low = mid + 1
+            else:
+                high = mid
+        return low if low < len(self) and self._bytes(low) == target else -1
+
+
+@dataclass(slots=True)
+class MappedCatalogIndex(CatalogIndex):
+    """:class:`CatalogIndex` whose arrays are memory-mapped from a published generation.
+
+    Queries are vectorized against the mapped vocabulary and IDF with the
+    same steps as ``TfidfVectorizer.transform``, so scores are identical to
+    the in-process index.
+    """
+
+    terms: StringTable | None
+    idf: np.ndarray | None
+    token_terms: StringTable
+    flag_names: List[str]
+    flag_values: np.ndarray
+
+    def query_vectors(self, queries):
+        if self.terms is None:
+            return None
+        sparse = lazy_import("scipy.sparse")
+        analyze = analyzer()
+        indices: List[int] = []
+        values: List[int] = []
+        indptr = [0]
+        for tokens, _, _ in queries:
+            counts: Dict[int, int] = {}
+            for term in analyze(" ".join(tokens)):
+                column = self.terms.find(term)
+                if column >= 0:
+                    counts[column] = counts.get(column, 0) + 1
+            indices.extend(counts)
+            values.extend(counts.values())
+            indptr.append(len(indices))
+        vectors = sparse.csr_matrix(
+            (np.asarray(values, dtype=np.float64), np.asarray(indices, dtype=np.int32), np.asarray(indptr, dtype=np.int32)),
+            shape=(len(queries), len(self.terms)),
+        )
+        vectors.sort_indices()
+        vectors.data *= self.idf[vectors.indices]
+        return lazy_import("sklearn.preprocessing").normalize(vectors, norm="l2", copy=False)
+
+    def token_columns(self, query_set: Set[str]) -> List[int]:
+        columns = (self.token_terms.find(token) for token in query_set)
+        return [column for column in columns if column >= 0]
+
+    def flags(self, position: int) -> Dict[str, bool]:
+        return dict(zip(self.flag_names, self.flag_values[position].tolist()))
+
+
+def _arrays(index: CatalogIndex) -> tuple:
+    """``(arrays, meta)`` describing ``index`` in the published layout."""
+    count = len(index.ids)
+    flag_names = list(index.features[0].flags) if index.features else ["lowlight"]
+    flag_values = np.array(
+        [[bool(item.flags.get(name, False)) for name in flag_names] for item in index.features], dtype=bool
+    ).reshape(count, len(flag_names))
+    # Kolom token diurutkan supaya bisa dicari dengan binary search.
+    tokens = sorted(index.token_vocab)
+    token_matrix = index.token_matrix[:, [index.token_vocab[token] for token in tokens]].tocsc()
+    token_table = StringTable.build(tokens)
+    arrays = {
+        "ids": np.asarray(index.ids, dtype=np.int64),
+        "prices": index.prices,
+        "ratings": index.ratings,
+        "stocks": index.stocks,
+        "categories": index.categories,
+        "flags": flag_values,
+        "token_data": token_matrix.data,
+        "token_indices": token_matrix.indices,
+        "token_indptr": token_matrix.indptr,
+        "tokens_blob": token_table.blob,
+        "tokens_offsets": token_table.offsets,
+    }
+    meta = {"rows": count, "flags": flag_names, "tokens": len(tokens), "terms": None}
+    if index.vectorizer is not None:
+        # Kolom TF-IDF sklearn sudah terurut menurut term.
+        terms = StringTable.build(index.vectorizer.get_feature_names_out().tolist())
+        postings = index.term_postings
+        arrays.update(
+            term_data=postings.data,
+            term_indices=postings.indices,
+            term_indptr=postings.indptr,
+            terms_blob=terms.blob,
+            terms_offsets=terms.offsets,
+            idf=index.vectorizer.idf_,
+        )
+        meta["terms"] = len(terms)
+    return arrays, meta
+
+
+def _load(path: Path, meta: dict) -> MappedCatalogIndex:
+    sparse = lazy_import("scipy.sparse")
+
+    def array(name: str) -> np.ndarray:
+        return np.load(path / f"{name}.npy", mmap_mode="r")
+
+    count = meta["rows"]
+    flag_names = meta["flags"]
+    flag_values = array("flags")
+    term_postings = terms = idf = None
+    if meta["terms"] is not None:
+        term_postings = sparse.csc_matrix(
+            (array("term_data"), array("term_indices"), array("term_indptr")), shape=(count, meta["terms"]), copy=False
+        )
+        terms = StringTable(array("terms_blob"), array("terms_offsets"))
+        idf = array("idf")
+    lowlight = (
+        flag_values[:, flag_names.index("lowlight")] if "lowlight" in flag_names else np.zeros(count, dtype=bool)
+    )
+    return MappedCatalogIndex(
+        ids=array("ids"),
+        features=[],
+        vectorizer=None,
+        term_postings=term_postings,
+        prices=array("prices"),
+        ratings=array("ratings"),
+        stocks=array("stocks"),
+        categories=array("categories"),
+        lowlight=lowlight,
+        token_vocab={},
+        token_matrix=sparse.csc_matrix(
+            (array("token_data"), array("token_indices"), array("token_indptr")), shape=(count, meta["tokens"]), copy=False
+        ),
+        terms=terms,
+        idf=idf,
+        token_terms=StringTable(array("tokens_blob"), array("tokens_offsets")),
+        flag_names=flag_names,
+        flag_values=flag_values,
+    )
+
+
+class SharedIndexStore:
+    """Directory of published index generations, keyed by a catalog generation string."""
+
+    def __init__(self, directory: str | os.PathLike, keep: int = 2) -> None:
+        self.directory = Path(directory)
+        self.keep = max(1, keep)
+
+    def path(self, generation: str) -> Path:
+        return self.directory / f"gen-{generation}"
+
+    def _expected(self, generation: str) -> Dict:
+        return {"format": FORMAT_VERSION, "generation": generation, "vectorizer": _VECTORIZER_META}
+
+    def attach(self, generation: str) -> MappedCatalogIndex | None:
+        """Map ``generation`` if it has been published, else ``None``.
+
+        Only the manifest is checked here; :meth:`verify` also re-hashes the files.
+        """
+        path = self.path(generation)
+        meta = artifacts.read_manifest(path)
+        if meta is None or any(meta.get(key) != value for key, value in self._expected(generation).items()):
+            return None
+        return _load(path, meta)
+
+    def verify(self, generation: str) -> List[str]:
+        """Problems with the published ``generation`` (missing, other format, bad checksum); empty if usable."""
+        path = self.path(generation)
+        if not path.exists():
+            return [f"{path} belum dibangun"]
+        return artifacts.verify(path, **self._expected(generation))
+
+    def discard(self, generation: str) -> None:
+        shutil.rmtree(self.path(generation), ignore_errors=True)
+
+    def generations(self) -> List[str]:
+        """Published generation keys, newest first."""
+        paths = sorted(self.directory.glob("gen-*"), key=lambda path: path.stat().st_mtime, reverse=True)
+        return [path.name[len("gen-") :] for path in paths]
+
+    def publish(self, generation: str, index: CatalogIndex) -> Path:
+        """Write ``index`` as ``generation``; a generation that already exists is left untouched."""
+        target = self.path(generation)
+        if target.exists():
+            return target
+        self.directory.mkdir(parents=True, exist_ok=True)
+        arrays, meta = _arrays(index)
+        meta.update(self._expected(generation), created=datetime.now(timezone.utc).isoformat())
+        staging = Path(tempfile.mkdtemp(prefix=f".gen-{generation}-", dir=self.directory))
+        try:
+            for name, values in arrays.items():
+                np.save(staging / f"{name}.npy", np.ascontiguousarray(values))
+            artifacts.write_manifest(staging, meta)
+            os.rename(staging, target)
+        except OSError:
+            shutil.rmtree(staging, ignore_errors=True)
+            if not target.exists():
+                raise
+        return target
+
+    def retire(self, current: str) -> List[Path]:
+        """Delete all but the newest ``keep`` generations (``current`` is always kept).
+
+        Workers that still map an old generation keep reading it: on POSIX
+        the files live until the last mapping is closed.
+        """
+        generations = sorted(
+            (path for path in self.directory.glob("gen-*") if path != self.path(current)),
+            key=lambda path: path.stat().st_mtime,
+            reverse=True,
+        )
+        removed = []
+        for path in generations[self.keep - 1 :]:
+            shutil.rmtree(path, ignore_errors=True)
+            removed.append(path)
+        return removed
+
+    @contextmanager
+    def lock(self) -> Iterator[None]:
+        """Cross-process lock so only one worker builds a missing generation."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self.directory / ".lock", "a+") as handle:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(handle, fcntl.LOCK_UN)
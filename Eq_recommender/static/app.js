@@ -13,6 +13,7 @@ const alatList = document.getElementById('alat-list');
 const formAlat = document.getElementById('form-alat');
 const resetFormBtn = document.getElementById('reset-form');
 const rekomList = document.getElementById('rekom-results');
+const loadMoreBtn = document.getElementById('load-more');
 
 async function fetchCategories() {
   const res = await fetch('/api/categories');
@@ -20,13 +21,51 @@ async function fetchCategories() {
   kategoriSelect.innerHTML = data.map(c => `<option value="${c.id_kategori}">${c.nama_kategori}</option>`).join('');
 }
 
-async function fetchAlats() {
-  const res = await fetch('/api/alats');
-  const data = await res.json();
-  alatList.innerHTML = data.map(renderAlatCard).join('');
+const ALAT_PAGE_SIZE = 50;
+const SYNC_INTERVAL_MS = 30000;
+const alatItems = new Map();
+let alatCursor = null;
+let catalogVersion = 0;
+
+function renderAlats() {
+  const items = [...alatItems.values()].sort((a, b) => b.id_alat - a.id_alat);
+  alatList.innerHTML = items.map(renderAlatCard).join('');
+  loadMoreBtn.hidden = !alatCursor;
   attachCardEvents();
 }
 
+async function fetchAlats(append = false) {
+  const params = new URLSearchParams({ limit: ALAT_PAGE_SIZE });
+  if (append && alatCursor) params.set('cursor', alatCursor);
+  const res = await fetch(`/api/alats?${params}`);
+  const data = await res.json();
+  if (!append) {
+    alatItems.clear();
+    catalogVersion = data.version;
+  }
+  data.items.forEach(item => alatItems.set(item.id_alat, item));
+  alatCursor = data.next_cursor;
+  renderAlats();
+}
+
+// Ambil hanya perubahan sejak versi terakhir, bukan seluruh katalog.
+async function syncAlats() {
+  const res = await fetch(`/api/alats/changes?since=${catalogVersion}`);
+  if (!res.ok) return;
+  const data = await res.json();
+  // log perubahan di server dimulai ulang (mis. initdb): delta tidak bisa dipakai, muat ulang semua
+  if (data.reset) return fetchAlats();
+  data.deleted.forEach(id => alatItems.delete(id));
+  data.upserted.forEach(item => {
+    // baris di luar halaman yang sudah dimuat akan ikut saat "Muat lebih banyak"
+    if (alatItems.has(item.id_alat) || !alatCursor || item.id_alat > alatCursor) {
+      alatItems.set(item.id_alat, item);
+    }
+  });
+  catalogVersion = data.version;
+  if (data.deleted.length || data.upserted.length) renderAlats();
+}
+
 function renderAlatCard(item) {
   const payload = encodeURIComponent(JSON.stringify(item));
   const imgSrc = item.gambar && item.gambar.trim() !== ""
@@ -72,7 +111,7 @@ function attachCardEvents() {
       const id = btn.closest('.card-item').dataset.id;
       if (!confirm('Hapus alat ini?')) return;
       await fetch(`/api/alats/${id}`, { method: 'DELETE' });
-      fetchAlats();
+      syncAlats();
     };
   });
 }
@@ -94,10 +133,11 @@ formAlat.addEventListener('submit', async (e) => {
   const url = id ? `/api/alats/${id}` : '/api/alats';
   await fetch(url, { method, headers: { 'Content-Type': 'application/json' }, body: JSON.stringify(payload) });
   formAlat.reset();
-  fetchAlats();
+  syncAlats();
 });
 
 resetFormBtn.addEventListener('click', () => formAlat.reset());
+loadMoreBtn.addEventListener('click', () => fetchAlats(true));
 
 const formRekom = document.getElementById('form-rekom');
 formRekom.addEventListener('submit', async (e) => {
@@ -142,4 +182,5 @@ formRekom.addEventListener('submit', async (e) => {
   document.getElementById('rekom').classList.add('active');
 });
 
-fetchCategories().then(fetchAlats);
+fetchCategories().then(() => fetchAlats());
+setInterval(syncAlats, SYNC_INTERVAL_MS);
@@ -0,0 +1,41 @@
+"""Shared fixtures: the Flask app against a throwaway SQLite database (``app.db`` is never touched)."""
+from __future__ import annotations
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+_WORK_DIR = Path(tempfile.mkdtemp(prefix="eq_tests_"))
+# Harus diset sebelum app diimpor.
+os.environ["EQ_DATABASE_URI"] = f"sqlite:///{_WORK_DIR / 'test.db'}"
+os.environ["EQ_STEM_CACHE_PATH"] = str(_WORK_DIR / "stem_cache.json")
+os.environ.setdefault("EQ_SHARED_INDEX_DIR", "")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import app as flask_app  # noqa: E402
+from recommender.shared_index import SharedIndexStore  # noqa: E402
+
+
+@pytest.fixture()
+def client():
+    with flask_app.app.app_context():
+        flask_app.db.drop_all()
+        flask_app.db.create_all()
+        flask_app.seed_data()
+    flask_app.invalidate_catalog()
+    return flask_app.app.test_client()
+
+
+@pytest.fixture()
+def shared(client, tmp_path, monkeypatch):
+    """Switch the app to shared-index mode (``EQ_SHARED_INDEX_DIR``) backed by ``tmp_path``."""
+    store = SharedIndexStore(tmp_path / "index")
+    monkeypatch.setattr(flask_app, "shared_index", store)
+    monkeypatch.setattr(flask_app.catalog_index, "store", store)
+    monkeypatch.setitem(flask_app.app.config, "SHARED_INDEX_DIR", str(tmp_path / "index"))
+    flask_app.invalidate_catalog()
+    yield store
+    flask_app.invalidate_catalog()
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import pytest
+
+
+@pytest.mark.parametrize("limit", ["0", "-1", "501"])
+def test_list_alats_rejects_out_of_range_limit(client, limit):
+    response = client.get(f"/api/alats?limit={limit}")
+    assert response.status_code == 400
+    assert "limit" in response.get_json()["message"]
+
+
+@pytest.mark.parametrize(("limit", "count"), [(None, 5), ("1", 1), ("500", 5)])
+def test_list_alats_limit(client, limit, count):
+    response = client.get("/api/alats" if limit is None else f"/api/alats?limit={limit}")
+    assert response.status_code == 200
+    assert len(response.get_json()["items"]) == count
+
+
+def test_changes_since_future_version_asks_for_full_reload(client):
+    latest = client.get("/api/alats").get_json()["version"]
+    response = client.get(f"/api/alats/changes?since={latest + 10}")
+    assert response.get_json() == {"version": latest, "reset": True, "upserted": [], "deleted": []}
+
+
+def test_changes_returns_delta(client):
+    created = client.post(
+        "/api/alats", json={"id_kategori": 1, "nama_alat": "Kamera Baru", "harga_sewa": 100, "stok": 1}
+    )
+    assert created.status_code in (200, 201)
+    data = client.get("/api/alats/changes?since=0").get_json()
+    assert data["reset"] is False
+    assert "Kamera Baru" in {item["nama_alat"] for item in data["upserted"]}
+
+
+def test_etag_from_previous_database_is_not_fresh(client):
+    import app as flask_app
+
+    first = client.get("/api/alats")
+    etag = first.headers["ETag"]
+    assert client.get("/api/alats", headers={"If-None-Match": etag}).status_code == 304
+
+    with flask_app.app.app_context():
+        # Seperti `flask initdb` + seed ulang dengan isi lain: log perubahan kosong lagi.
+        flask_app.db.drop_all()
+        flask_app.db.create_all()
+        flask_app.seed_data()
+        flask_app.db.session.delete(flask_app.db.session.get(flask_app.Alat, 1))
+        flask_app.db.session.commit()
+    response = client.get("/api/alats", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert 1 not in {item["id_alat"] for item in response.get_json()["items"]}
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+from dataclasses import fields
+
+import numpy as np
+import pytest
+
+import app as flask_app
+from data.loader import DATA_FILE, load_equipment
+from recommender.kit_catalog import _digest, load_artifact
+from recommender.kit_matrix import KitMatrix
+from utils.models import EquipmentKit
+
+QUERY = {"jenis_konten": "podcast studio", "deskripsi_konten": "interview malam", "budget": 0}
+
+
+def _generation() -> str:
+    with flask_app.app.app_context():
+        return flask_app.catalog_generation()[0]
+
+
+def _load_at_startup() -> None:
+    flask_app.invalidate_catalog()  # seperti worker baru: belum ada index yang di-attach
+    with flask_app.app.app_context():
+        flask_app.load_index_artifact()
+
+
+@pytest.mark.parametrize(
+    ("name", "damage"),
+    [("ids.npy", lambda data: data[:-8] + b"\xff" * 8), ("meta.json", lambda data: b"{")],
+)
+def test_corrupt_artifact_is_rebuilt_at_startup(client, shared, name, damage):
+    expected = client.post("/api/recommend", json=QUERY).get_json()
+    _load_at_startup()
+    generation = _generation()
+    assert shared.verify(generation) == []
+
+    path = shared.path(generation) / name
+    path.write_bytes(damage(path.read_bytes()))
+    assert shared.verify(generation)
+
+    _load_at_startup()
+    assert shared.verify(generation) == []
+    flask_app.result_cache.clear()
+    assert client.post("/api/recommend", json=QUERY).get_json() == expected
+
+
+def test_build_index_force_rewrites_artifact(client, shared, tmp_path):
+    runner = flask_app.app.test_cli_runner()
+    assert runner.invoke(args=["build-index", "--dir", str(tmp_path / "index")]).exit_code == 0
+    path = shared.path(_generation()) / "prices.npy"
+    path.write_bytes(b"rusak")
+    result = runner.invoke(args=["build-index", "--dir", str(tmp_path / "index"), "--force"])
+    assert result.exit_code == 0, result.output
+    assert shared.verify(_generation()) == []
+
+
+def test_build_index_kits_writes_loadable_artifact(client, shared, tmp_path):
+    directory = tmp_path / "index"
+    result = flask_app.app.test_cli_runner().invoke(args=["build-index", "--dir", str(directory), "--kits"])
+    assert result.exit_code == 0, result.output
+
+    loaded = load_artifact(directory / "kits", _digest(DATA_FILE))
+    assert loaded is not None
+    kits, matrix = loaded
+    expected_kits = [EquipmentKit.from_row(row) for row in load_equipment(DATA_FILE)]
+    assert kits == expected_kits
+    expected = KitMatrix.build(expected_kits)
+    for field in fields(KitMatrix):
+        if field.name == "kits":
+            continue
+        value, want = getattr(matrix, field.name), getattr(expected, field.name)
+        if isinstance(want, np.ndarray):
+            np.testing.assert_array_equal(value, want)
+        else:
+            assert value == want
+
+    (directory / "kits" / "kits.json").write_text("[]", encoding="utf-8")
+    assert load_artifact(directory / "kits", _digest(DATA_FILE)) is None
@@ -0,0 +1,18 @@
+from __future__ import annotations
+
+import threading
+
+from utils.audit import AuditWriter
+
+
+def test_counters_are_exact_under_concurrent_submit():
+    writer = AuditWriter(lambda batch: None, max_queue=5000)
+    threads = [threading.Thread(target=lambda: [writer.submit(i) for i in range(1000)]) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stats = writer.stats()
+    assert (stats["submitted"], stats["dropped"]) == (5000, 3000)
+    assert writer.flush() == 5000
+    assert writer.stats()["written"] == 5000
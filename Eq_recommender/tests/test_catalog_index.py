@@ -0,0 +1,130 @@
+"""Regression tests for the scores of the persistent TF-IDF index.
+
+Sejak index di-fit sekali per katalog, IDF hanya dihitung dari katalog (query
+tidak ikut di-fit seperti pada implementasi awal), jadi ``sim`` dan
+urutannya berbeda dari versi sebelum index. Urutan di bawah dipatok pada
+perilaku baru dengan data seed.
+"""
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import linear_kernel
+
+import app as flask_app
+from benchmarks.synthetic import alat_rows, recommend_payloads
+from recommender.catalog_index import VECTORIZER_PARAMS, CatalogIndex, TokenCache
+
+
+def _recommend(client, jenis_konten: str, deskripsi_konten: str, budget: int):
+    payload = {"jenis_konten": jenis_konten, "deskripsi_konten": deskripsi_konten, "budget": budget}
+    return client.post("/api/recommend", json=payload).get_json()
+
+
+def test_ordering_uses_catalog_only_idf(client):
+    # Dengan query ikut di-fit (perilaku lama) urutannya [3, 1].
+    results = _recommend(client, "vlog", "outdoor", 500)
+    assert [item["alat"]["id_alat"] for item in results] == [1, 3]
+    assert [item["sim"] for item in results] == pytest.approx([0.574270538179477, 0.21950696982594542])
+
+
+def test_pinned_ordering_and_scores(client):
+    results = _recommend(client, "podcast studio", "interview malam", 0)
+    assert [item["alat"]["id_alat"] for item in results] == [4, 3, 2, 1]
+    assert [item["skor"] for item in results] == pytest.approx(
+        [0.8764153478795745, 0.6682593886020982, 0.505273365841382, 0.4824370410253931]
+    )
+
+
+def test_sim_matches_vectorizer_fitted_on_catalog(client):
+    with flask_app.app.app_context():
+        rows = flask_app.Alat.query.order_by(flask_app.Alat.id_alat).all()
+        documents = [flask_app.simple_preprocess(f"{row.kebutuhan_konten} {row.deskripsi}") for row in rows]
+        query = flask_app.simple_preprocess("podcast studio interview malam")
+    vectorizer = TfidfVectorizer(**VECTORIZER_PARAMS)
+    matrix = vectorizer.fit_transform(documents)
+    expected = (matrix @ vectorizer.transform([query]).T).toarray().ravel()
+    positions = {row.id_alat: position for position, row in enumerate(rows)}
+
+    for item in _recommend(client, "podcast studio", "interview malam", 0):
+        assert item["sim"] == pytest.approx(expected[positions[item["alat"]["id_alat"]]])
+
+
+def test_index_is_rebuilt_only_when_the_generation_changes(client, monkeypatch):
+    loads = []
+    load = flask_app.CatalogRows.load
+    monkeypatch.setattr(flask_app.CatalogRows, "load", lambda self: loads.append(self.generation) or load(self))
+
+    _recommend(client, "podcast studio", "interview malam", 0)
+    _recommend(client, "vlog", "outdoor", 500)
+    assert len(loads) == 1
+
+    # Tulisan dari luar app (mis. import_equipment.py tanpa invalidate_catalog di proses ini).
+    with flask_app.app.app_context():
+        alat = flask_app.Alat(
+            id_kategori=1, nama_alat="Mic Podcast", deskripsi="podcast interview malam", kebutuhan_konten="podcast",
+            harga_sewa=10, stok=1, rating_alat=5,
+        )
+        flask_app.db.session.add(alat)
+        flask_app.db.session.flush()
+        flask_app.record_catalog_change(alat.id_alat)
+        flask_app.db.session.commit()
+        new_id = alat.id_alat
+    results = _recommend(client, "podcast studio", "interview malam", 0)
+    assert len(loads) == 2
+    assert results[0]["alat"]["id_alat"] == new_id
+
+
+def _per_row_loop(rows, user_tokens, budget, fit_query):
+    """The original ``/api/recommend`` loop; ``fit_query`` adds the query to the TF-IDF fit as it used to."""
+    alat_tokens_list = [flask_app.preprocess_tokens(f"{a.kebutuhan_konten} {a.deskripsi}") for a in rows]
+    user_flags = flask_app.detect_flags(user_tokens)
+    corpus = [" ".join(tokens) for tokens in alat_tokens_list]
+    vectorizer = TfidfVectorizer(**VECTORIZER_PARAMS)
+    if fit_query:
+        tfidf = vectorizer.fit_transform(corpus + [" ".join(user_tokens)])
+        user_vec, alat_vecs = tfidf[-1], tfidf[:-1]
+    else:
+        alat_vecs = vectorizer.fit_transform(corpus)
+        user_vec = vectorizer.transform([" ".join(user_tokens)])
+    sims = linear_kernel(user_vec, alat_vecs).flatten()
+    user_set = set(user_tokens)
+    results = []
+    for alat, alat_tokens, sim in zip(rows, alat_tokens_list, sims):
+        overlap = 0.0 if not user_set else len(user_set & set(alat_tokens)) / len(user_set)
+        if overlap <= 0 and sim < 0.02:
+            continue
+        penalty = 0.0
+        if user_flags.get("outdoor") and not user_flags.get("lowlight") and flask_app.detect_flags(alat_tokens).get("lowlight"):
+            penalty = 0.15
+        budget_factor = 1.0 if budget <= 0 else max(0.25, min(1.0, (budget - alat.harga_sewa) / max(budget, 1)))
+        score = float(sim * 0.6 + overlap * 0.25 + alat.rating_alat * 0.05 + budget_factor * 0.1 - penalty)
+        if budget <= 0 or alat.harga_sewa <= budget * 1.2:
+            results.append((alat.id_alat, score))
+    results.sort(key=lambda item: item[1], reverse=True)
+    return results[:10]
+
+
+def test_index_matches_per_row_loop_with_catalog_only_idf():
+    rows = [SimpleNamespace(id_alat=i + 1, **row) for i, row in enumerate(alat_rows(200, seed=5))]
+    tokens = TokenCache(flask_app.preprocess_tokens, flask_app.detect_flags)
+    index = CatalogIndex.build(
+        [row.id_alat for row in rows],
+        [tokens.get(row) for row in rows],
+        [row.harga_sewa for row in rows],
+        [row.rating_alat for row in rows],
+    )
+    diverged = 0
+    for payload in recommend_payloads(40, seed=9):
+        user_tokens = flask_app.query_tokens(payload)
+        ranked = index.score(user_tokens, flask_app.detect_flags(user_tokens), payload["budget"])
+        actual = [(index.ids[item.position], item.score) for item in ranked]
+        expected = _per_row_loop(rows, user_tokens, payload["budget"], fit_query=False)
+        assert [i for i, _ in actual] == [i for i, _ in expected]
+        assert [score for _, score in actual] == pytest.approx([score for _, score in expected])
+        baseline = _per_row_loop(rows, user_tokens, payload["budget"], fit_query=True)
+        diverged += [i for i, _ in baseline] != [i for i, _ in actual]
+    # Satu-satunya perbedaan dengan implementasi awal adalah IDF tanpa query; itu memang disengaja.
+    assert diverged > 0
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import csv
+
+import pytest
+
+import import_equipment
+
+
+def _write_csv(path, count):
+    with open(path, "w", newline="", encoding="utf-8") as handle:
+        writer = csv.DictWriter(handle, fieldnames=["nama_alat", "kategori", "deskripsi", "harga_sewa", "stok"])
+        writer.writeheader()
+        for i in range(count):
+            writer.writerow({"nama_alat": f"Impor {i}", "kategori": "Audio", "deskripsi": "mic", "harga_sewa": 10, "stok": 1})
+    return path
+
+
+@pytest.fixture()
+def invalidations(monkeypatch):
+    calls = []
+    monkeypatch.setattr(import_equipment, "invalidate_catalog", lambda: calls.append(True))
+    return calls
+
+
+def test_failed_chunk_still_invalidates_committed_rows(client, tmp_path, monkeypatch, invalidations):
+    flush = import_equipment._flush_chunk
+    chunks = []
+
+    def failing_flush(inserts, updates, existing):
+        chunks.append(len(inserts))
+        if len(chunks) == 2:
+            raise RuntimeError("disk penuh")
+        return flush(inserts, updates, existing)
+
+    monkeypatch.setattr(import_equipment, "_flush_chunk", failing_flush)
+    with import_equipment.app.app_context():
+        assert import_equipment.import_data(_write_csv(tmp_path / "alat.csv", 4), chunk_size=2) is None
+        assert import_equipment.Alat.query.filter(import_equipment.Alat.nama_alat.like("Impor %")).count() == 2
+    assert invalidations == [True]
+
+
+def test_import_invalidates_once_and_skips_when_nothing_changed(client, tmp_path, invalidations):
+    path = _write_csv(tmp_path / "alat.csv", 3)
+    with import_equipment.app.app_context():
+        assert import_equipment.import_data(path, chunk_size=2)["added"] == 3
+        assert invalidations == [True]
+        assert import_equipment.import_data(path, chunk_size=2)["skipped"] == 3
+    assert invalidations == [True]
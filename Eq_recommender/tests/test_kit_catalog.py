@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import os
+import shutil
+import threading
+import time
+
+from data.loader import DATA_FILE
+from recommender.kit_catalog import KitCatalog
+
+
+def test_broken_source_is_not_reparsed_until_it_changes(tmp_path):
+    path = tmp_path / "equipment_data.csv"
+    shutil.copy(DATA_FILE, path)
+    catalog = KitCatalog(path, check_interval=0)
+    original = catalog.snapshot()
+
+    header = DATA_FILE.read_text(encoding="utf-8").splitlines()[0]
+    path.write_text(header + "\n", encoding="utf-8")
+    assert catalog.reload().version == original.version
+    assert catalog.reload_errors == 1
+
+    attempts = []
+    catalog._reload = attempts.append  # hanya mencatat; _maybe_reload memanggilnya di thread
+    catalog.snapshot()
+    catalog.snapshot()
+    assert attempts == []
+
+    shutil.copy(DATA_FILE, path)
+    os.utime(path, ns=(1, 1))
+    catalog.snapshot()
+    deadline = time.monotonic() + 2
+    while not attempts and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert attempts == [original]
+
+
+def test_forced_reload_waits_for_background_reload(tmp_path):
+    path = tmp_path / "equipment_data.csv"
+    lines = DATA_FILE.read_text(encoding="utf-8").splitlines()
+    path.write_text("\n".join(lines[:3]) + "\n", encoding="utf-8")
+    catalog = KitCatalog(path, check_interval=0)
+    assert catalog.snapshot().version == 1
+
+    builds, started, release = [], threading.Event(), threading.Event()
+    build = catalog._build
+
+    def slow_build(version):
+        builds.append(version)
+        started.set()
+        release.wait(5)
+        return build(version)
+
+    catalog._build = slow_build
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    catalog.snapshot()  # memulai reload di background
+    assert started.wait(2)
+
+    forced = []
+    thread = threading.Thread(target=lambda: forced.append(catalog.reload()))
+    thread.start()
+    time.sleep(0.05)
+    assert thread.is_alive()  # menunggu reload background, bukan membangun sendiri
+    release.set()
+    thread.join(5)
+
+    assert builds == [2]
+    assert forced[0].version == 2
+    assert len(forced[0].kits) == len(lines) - 1
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from benchmarks.synthetic import kit_rows, query_corpus, write_csv
+from data.loader import load_equipment
+from nlp.parser import parse_preferences
+from recommender.kit_matrix import KitMatrix
+from utils.models import EquipmentKit, Preference
+from utils.scoring import score_kit
+
+
+@pytest.fixture(scope="module")
+def kits(tmp_path_factory):
+    path = write_csv(tmp_path_factory.mktemp("kits") / "kits.csv", kit_rows(400, seed=4))
+    return [EquipmentKit.from_row(row) for row in load_equipment(path)]
+
+
+def _preferences():
+    rng = random.Random(8)
+    prefs = [parse_preferences(text) for text in query_corpus(30, seed=8)]
+    for _ in range(30):
+        prefs.append(
+            Preference(
+                environment=rng.sample(["indoor", "outdoor", "hybrid", "studio"], rng.randint(0, 2)),
+                budget=rng.choice(["low", "medium", "high"]),
+                mobility=rng.choice(["low", "medium", "high"]),
+                expertise=rng.choice(["beginner", "intermediate", "advanced"]),
+                focus=rng.sample(["travel", "podcast", "interview", "vlog", "tutorial"], rng.randint(0, 3)),
+                audio_priority=rng.random() < 0.5,
+                stabilization_priority=rng.random() < 0.5,
+                lighting=rng.choice(["daylight", "lowlight", "neutral"]),
+            )
+        )
+    return prefs
+
+
+def test_scores_equal_score_kit(kits):
+    matrix = KitMatrix.build(kits)
+    for pref in _preferences():
+        expected = [score_kit(kit, pref)["score"] for kit in kits]
+        assert matrix.scores(pref).tolist() == pytest.approx(expected, abs=1e-12)
+
+
+def test_top_k_matches_stable_sort_of_score_kit(kits):
+    matrix = KitMatrix.build(kits)
+    for pref in _preferences():
+        scored = [score_kit(kit, pref) for kit in kits]
+        expected = sorted(scored, key=lambda item: item["score"], reverse=True)[:5]
+        actual = matrix.recommend(pref, top_k=5)
+        assert [id(item["kit"]) for item in actual] == [id(item["kit"]) for item in expected]
+        assert [item["score"] for item in actual] == pytest.approx([item["score"] for item in expected])
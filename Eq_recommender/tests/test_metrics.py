@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+
+def _families(text: str) -> dict:
+    types, helps = {}, set()
+    for line in text.splitlines():
+        if line.startswith("# TYPE "):
+            _, _, name, kind = line.split(" ", 3)
+            types[name] = kind
+        elif line.startswith("# HELP "):
+            helps.add(line.split(" ", 3)[2])
+    return {name: (kind, name in helps) for name, kind in types.items()}
+
+
+def test_cache_and_audit_totals_are_counters_with_help(client):
+    client.post("/api/recommend", json={"jenis_konten": "podcast", "deskripsi_konten": "indoor", "budget": 0})
+    families = _families(client.get("/api/metrics").get_data(as_text=True))
+
+    for name in (
+        "eq_result_cache_hits_total",
+        "eq_result_cache_misses_total",
+        "eq_token_cache_misses_total",
+        "eq_audit_submitted_total",
+        "eq_audit_dropped_total",
+        "eq_catalog_index_builds_total",
+    ):
+        assert families[name] == ("counter", True), name
+    assert families["eq_result_cache_size"] == ("gauge", True)
+    assert families["eq_audit_queue_depth"] == ("gauge", True)
+    assert "eq_result_cache_hits" not in families
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from nlp import parser
+from nlp.normalize import PhraseMatcher, tokenize
+
+
+def _per_keyword_scan(groups, tokens, stopwords=frozenset()):
+    """Check every keyword of every group against every window of ``tokens``."""
+    hits = set()
+    for family, labels in groups.items():
+        for label, keywords in labels.items():
+            for keyword in keywords:
+                words = tokenize(keyword, stopwords)
+                if words and any(tokens[i:i + len(words)] == words for i in range(len(tokens) - len(words) + 1)):
+                    hits.add((family, label))
+    return hits
+
+
+def _vocabulary():
+    words = {"kamera", "lampu", "drone", "tripod", "head", "talking", "low", "light", "daily", "vlog", "hari"}
+    for labels in parser.KEYWORD_GROUPS.values():
+        for keywords in labels.values():
+            for keyword in keywords:
+                words.update(keyword.split())
+    return sorted(words)
+
+
+def test_matcher_finds_the_same_groups_as_the_per_keyword_scan():
+    rng = random.Random(25)
+    vocabulary = _vocabulary()
+    for _ in range(500):
+        text = " ".join(rng.choice(vocabulary) for _ in range(rng.randint(1, 40)))
+        tokens = parser._tokenize(text)
+        assert parser.KEYWORD_MATCHER.hits(tokens) == _per_keyword_scan(parser.KEYWORD_GROUPS, tokens, parser.STOPWORDS)
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("Bikin video talking head di kamar", {("focus", "talking head"), ("focus", "podcast")}),
+        ("head talking", {("focus", "podcast")}),
+        ("vlog harian pakai kamera", {("focus", "daily vlog"), ("focus", "travel")}),
+        ("QnA", {("focus", "interview")}),
+        ("sesi qna", {("focus", "interview")}),
+        ("sesi QNA malam", {("focus", "interview"), ("focus", "lowlight"), ("lighting", "lowlight")}),
+        ("syuting di tempat low light", {("focus", "lowlight"), ("lighting", "lowlight")}),
+    ],
+)
+def test_phrases_and_case(text, expected):
+    tokens = parser._tokenize(text)
+    hits = parser.KEYWORD_MATCHER.hits(tokens)
+    assert hits == expected
+    assert hits == _per_keyword_scan(parser.KEYWORD_GROUPS, tokens, parser.STOPWORDS)
+
+
+def test_overlapping_phrases_use_failure_links():
+    groups = {"f": {"a": {"x y z"}, "b": {"y"}, "c": {"y z w"}, "d": {"x y q"}}}
+    matcher = PhraseMatcher(groups)
+    for text in ["x y z w", "x y y z w", "x x y q", "x y", "z w y", "w x y z"]:
+        tokens = tokenize(text)
+        assert matcher.hits(tokens) == _per_keyword_scan(groups, tokens), text
+
+
+def test_parse_preferences_uses_phrase_hits():
+    pref = parser.parse_preferences("Mau rekam talking head minim cahaya, budget hemat")
+    assert "talking head" in pref.focus
+    assert pref.lighting == "lowlight"
+    assert pref.budget == "low"
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import asyncio
+import json
+
+import pytest
+
+QUERY = {"jenis_konten": "podcast", "deskripsi_konten": "interview indoor", "budget": 500}
+
+
+def test_recommend_rejects_non_numeric_kategori(client):
+    response = client.post("/api/recommend", json=dict(QUERY, id_kategori="abc"))
+    assert response.status_code == 400
+    assert "id_kategori" in response.get_json()["message"]
+
+
+def test_recommend_batch_rejects_non_numeric_kategori(client):
+    response = client.post("/api/recommend/batch", json=[QUERY, dict(QUERY, id_kategori=["1", "x"])])
+    assert response.status_code == 400
+    assert "id_kategori" in response.get_json()["message"]
+
+
+def test_recommend_accepts_numeric_kategori(client):
+    response = client.post("/api/recommend", json=dict(QUERY, id_kategori="2"))
+    assert response.status_code == 200
+    assert {item["alat"]["id_kategori"] for item in response.get_json()} <= {2}
+
+
+def test_cached_results_do_not_survive_catalog_rebuild(client):
+    import app as flask_app
+
+    first = client.post("/api/recommend", json=QUERY).get_json()
+    top_id = first[0]["alat"]["id_alat"]
+    with flask_app.app.app_context():
+        # Seperti `flask initdb` + impor ulang: log perubahan mulai lagi dari 0.
+        flask_app.db.drop_all()
+        flask_app.db.create_all()
+        flask_app.seed_data()
+        flask_app.db.session.delete(flask_app.db.session.get(flask_app.Alat, top_id))
+        flask_app.db.session.commit()
+    second = client.post("/api/recommend", json=QUERY).get_json()
+    assert top_id not in {item["alat"]["id_alat"] for item in second}
+
+
+def test_audit_keeps_only_audit_top_k_rows(client, monkeypatch):
+    import app as flask_app
+
+    monkeypatch.setitem(flask_app.app.config, "AUDIT_TOP_K", 2)
+    query = {"jenis_konten": "podcast studio", "deskripsi_konten": "interview malam", "budget": 0}
+    response = client.post("/api/recommend?top_k=5&detail=ids", json=query)
+    assert len(response.get_json()) == 4
+    with flask_app.app.app_context():
+        assert flask_app.Rekomendasi.query.count() == 2
+
+
+@pytest.mark.parametrize(
+    ("body", "query_string", "message"),
+    [
+        (dict(QUERY, budget="murah"), "", "budget harus berupa angka"),
+        (dict(QUERY, budget=None), "", "budget harus berupa angka"),
+        (QUERY, "top_k=banyak", "top_k harus berupa angka"),
+        (QUERY, "top_k=0", "top_k harus antara 1 dan 1000"),
+        (QUERY, "detail=semua", "detail harus salah satu dari: ids, summary, full"),
+    ],
+)
+def test_invalid_options_give_the_same_400_on_every_route(client, body, query_string, message):
+    import asgi
+
+    for path, payload in (("/api/recommend", body), ("/api/recommend/batch", [body])):
+        response = client.post(f"{path}?{query_string}", json=payload)
+        assert (response.status_code, response.get_json()) == (400, {"message": message})
+        status, response_body = asyncio.run(_asgi_post(asgi.application, path, query_string, payload))
+        assert (status, json.loads(response_body)) == (400, {"message": message})
+
+
+def test_recommend_rejects_non_object_body(client):
+    response = client.post("/api/recommend", json=[QUERY])
+    assert response.status_code == 400
+    assert "message" in response.get_json()
+
+
+async def _asgi_post(application, path: str, query_string: str, payload) -> tuple:
+    messages = [{"type": "http.request", "body": json.dumps(payload).encode(), "more_body": False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": path,
+        "query_string": query_string.encode(),
+        "headers": [(b"content-type", b"application/json"), (b"host", b"test")],
+        "http_version": "1.1",
+        "scheme": "http",
+        "server": ("test", 80),
+        "client": ("test", 1),
+    }
+    await application(scope, receive, send)
+    return sent[0]["status"], b"".join(message.get("body", b"") for message in sent[1:])
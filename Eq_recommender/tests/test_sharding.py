@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+import app as flask_app
+from benchmarks.synthetic import alat_rows, kit_rows, query_corpus, recommend_payloads, write_csv
+from data.loader import load_equipment
+from nlp.parser import parse_preferences
+from recommender import engine
+from recommender.catalog_index import CandidateFilter, CatalogIndex, ShardedIndex, TokenCache
+from recommender.kit_catalog import CatalogSnapshot
+from recommender.kit_matrix import KitMatrix
+from recommender.sharding import ShardPool
+from utils.models import EquipmentKit
+
+
+@pytest.fixture(scope="module")
+def pool():
+    # Dua proses shard (spawn), dipakai bersama oleh semua test di modul ini.
+    pool = ShardPool(2)
+    yield pool
+    pool.shutdown()
+
+
+def _catalog(count: int = 250) -> CatalogIndex:
+    tokens = TokenCache(flask_app.preprocess_tokens, flask_app.detect_flags)
+    rows = [
+        SimpleNamespace(id_alat=i + 1, id_kategori=i % 4 + 1, **row)
+        for i, row in enumerate(alat_rows(count, seed=6))
+    ]
+    return CatalogIndex.build(
+        [row.id_alat for row in rows],
+        [tokens.get(row) for row in rows],
+        [row.harga_sewa for row in rows],
+        [row.rating_alat for row in rows],
+        [row.stok for row in rows],
+        [row.id_kategori for row in rows],
+    )
+
+
+def _ranking(items):
+    return [item.position for item in items], [item.score for item in items]
+
+
+def test_sharded_index_ranks_like_the_unsharded_index(pool):
+    index = _catalog()
+    sharded = ShardedIndex(index, pool, "v1")
+    queries = []
+    for payload in recommend_payloads(40, seed=11):
+        tokens = flask_app.query_tokens(payload)
+        queries.append((tokens, flask_app.detect_flags(tokens), payload["budget"]))
+    filters = [CandidateFilter(in_stock=i % 2 == 0, categories=frozenset({1, 3}) if i % 3 == 0 else frozenset())
+               for i in range(len(queries))]
+
+    for top_k in (1, 5, 10):
+        for kwargs in ({}, {"filters": filters}):
+            expected = index.score_many(queries, top_k=top_k, **kwargs)
+            actual = sharded.score_many(queries, top_k=top_k, **kwargs)
+            assert len(actual) == len(expected)
+            for got, want in zip(actual, expected):
+                positions, scores = _ranking(got)
+                assert positions == _ranking(want)[0]
+                assert scores == pytest.approx(_ranking(want)[1])
+
+
+def test_sharded_kit_scoring_matches_the_kit_matrix(pool, tmp_path, monkeypatch):
+    path = write_csv(tmp_path / "kits.csv", kit_rows(300, seed=12))
+    kits = [EquipmentKit.from_row(row) for row in load_equipment(path)]
+    snapshot = CatalogSnapshot(
+        version=1, digest="kits-v1", kits=kits, matrix=KitMatrix.build(kits), loaded_at=datetime.now(), source=(0, 0)
+    )
+    monkeypatch.setattr(engine, "shard_pool", pool)
+    monkeypatch.setattr(engine, "SHARD_MIN_ROWS", 0)
+
+    for text in query_corpus(30, seed=12):
+        preference = parse_preferences(text)
+        for top_k in (3, 10):
+            expected = snapshot.matrix.recommend(preference, top_k=top_k)
+            actual = engine._score(snapshot, preference, top_k)
+            assert [id(item["kit"]) for item in actual] == [id(item["kit"]) for item in expected]
+            assert [item["score"] for item in actual] == pytest.approx([item["score"] for item in expected])
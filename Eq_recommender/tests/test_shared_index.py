@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import os
+from types import SimpleNamespace
+
+import pytest
+
+import app as flask_app
+from benchmarks.synthetic import alat_rows, recommend_payloads
+from recommender.catalog_index import CatalogIndex, TokenCache
+from recommender.shared_index import MappedCatalogIndex, SharedIndexStore
+
+QUERY = {"jenis_konten": "podcast studio", "deskripsi_konten": "interview malam", "budget": 0}
+
+
+def test_recommend_in_shared_mode(client, shared, monkeypatch):
+    with monkeypatch.context() as patch:
+        patch.setattr(flask_app, "shared_index", None)
+        patch.setattr(flask_app.catalog_index, "store", None)
+        in_process = client.post("/api/recommend", json=QUERY).get_json()
+    flask_app.invalidate_catalog()
+
+    response = client.post("/api/recommend", json=QUERY)
+    assert response.status_code == 200
+    assert response.get_json() == in_process
+    assert shared.generations()
+
+
+def test_build_index_cli(client, shared, tmp_path):
+    directory = tmp_path / "index"
+    result = flask_app.app.test_cli_runner().invoke(args=["build-index", "--dir", str(directory)])
+    assert result.exit_code == 0, result.output
+    with flask_app.app.app_context():
+        generation = flask_app.catalog_generation()[0]
+    assert shared.verify(generation) == []
+
+
+def _catalog(count: int = 300) -> CatalogIndex:
+    tokens = TokenCache(flask_app.preprocess_tokens, flask_app.detect_flags)
+    rows = [
+        SimpleNamespace(id_alat=i + 1, id_kategori=i % 6 + 1, **row)
+        for i, row in enumerate(alat_rows(count, seed=3))
+    ]
+    return CatalogIndex.build(
+        [row.id_alat for row in rows],
+        [tokens.get(row) for row in rows],
+        [row.harga_sewa for row in rows],
+        [row.rating_alat for row in rows],
+        [row.stok for row in rows],
+        [row.id_kategori for row in rows],
+    )
+
+
+def test_attached_generation_ranks_like_the_in_process_index(tmp_path):
+    index = _catalog()
+    store = SharedIndexStore(tmp_path)
+    store.publish("g1", index)
+    mapped = store.attach("g1")
+    assert isinstance(mapped, MappedCatalogIndex)
+    assert store.verify("g1") == []
+
+    queries = [
+        (tokens, flask_app.detect_flags(tokens), payload["budget"])
+        for payload in recommend_payloads(40, seed=11)
+        for tokens in [flask_app.query_tokens(payload)]
+    ]
+    expected = index.score_many(queries, top_k=10)
+    actual = mapped.score_many(queries, top_k=10)
+    assert any(expected)
+    for want, got in zip(expected, actual):
+        assert [item.position for item in got] == [item.position for item in want]
+        assert [item.score for item in got] == pytest.approx([item.score for item in want])
+        assert [item.sim for item in got] == pytest.approx([item.sim for item in want])
+    assert [mapped.flags(position) for position in range(5)] == [index.flags(position) for position in range(5)]
+
+
+def test_attach_ignores_unknown_generation(tmp_path):
+    store = SharedIndexStore(tmp_path)
+    store.publish("g1", _catalog(20))
+    assert store.attach("g2") is None
+
+
+def test_retire_keeps_current_and_newest(tmp_path):
+    store = SharedIndexStore(tmp_path, keep=2)
+    index = _catalog(20)
+    for age, generation in enumerate(["g1", "g2", "g3"]):
+        path = store.publish(generation, index)
+        os.utime(path, (1000 + age, 1000 + age))
+    store.retire("g1")
+    assert sorted(store.generations()) == ["g1", "g3"]
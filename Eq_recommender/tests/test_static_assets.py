@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+import pytest
+
+from utils.static_assets import build_asset
+
+
+@pytest.fixture()
+def asset():
+    asset = build_asset("app.js", b"console.log('x');" * 50)
+    asset.encoded["br"] = b"br-body"
+    return asset
+
+
+@pytest.mark.parametrize(
+    ("header", "expected"),
+    [
+        ("gzip;q=0", None),
+        ("gzip, br;q=0", "gzip"),
+        ("br;q=0.5, gzip", "gzip"),
+        ("br, gzip", "br"),
+        ("*;q=0", None),
+        ("*", "br"),
+        ("gzip;q=oops", None),
+        ("", None),
+    ],
+)
+def test_negotiate_honours_q_values(asset, header, expected):
+    body, encoding = asset.negotiate(header)
+    assert encoding == expected
+    assert body == (asset.body if expected is None else asset.encoded[expected])
+
+
+def test_index_html_is_not_compressed_when_refused(client):
+    response = client.get("/", headers={"Accept-Encoding": "gzip;q=0"})
+    assert response.status_code == 200
+    assert "Content-Encoding" not in response.headers
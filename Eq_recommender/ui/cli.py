@@ -8,11 +8,13 @@ PROJECT_ROOT = Path(__file__).resolve().parents[1]
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
-from recommender.engine import recommend_from_text
+from recommender.engine import catalog_info, recommend_from_text
 
 
 def main() -> None:
     print("=== EQ Recommender Demo ===")
+    info = catalog_info()
+    print(f"Katalog v{info['version']} ({info['kits']} kit, dimuat {info['loaded_at']})")
     query = input("Tuliskan kebutuhan vlog Anda: ")
     try:
         results = recommend_from_text(query, top_k=3)
@@ -0,0 +1,124 @@
+"""Background write-behind queue for recommendation audit records."""
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List
+
+logger = logging.getLogger(__name__)
+
+
+class AuditWriter:
+    """Collects audit records in a bounded queue and flushes them in batches.
+
+    ``flush_fn`` receives a list of records and must persist them in one
+    transaction. Records submitted while the queue is full are dropped and
+    counted instead of blocking the request thread.
+    """
+
+    def __init__(
+        self,
+        flush_fn: Callable[[List[Any]], None],
+        max_queue: int = 10000,
+        flush_interval: float = 1.0,
+        flush_size: int = 200,
+    ) -> None:
+        self._flush_fn = flush_fn
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_queue)
+        self.flush_interval = flush_interval
+        self.flush_size = max(1, flush_size)
+        self._stop = threading.Event()
+        self._write_lock = threading.Lock()
+        # Terpisah dari _write_lock supaya submit() tidak menunggu flush ke database.
+        self._count_lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self.submitted = 0
+        self.dropped = 0
+        self.written = 0
+        self.failed = 0
+        self.flushes = 0
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, record: Any) -> bool:
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            with self._count_lock:
+                self.dropped += 1
+            return False
+        with self._count_lock:
+            self.submitted += 1
+        return True
+
+    def flush(self) -> int:
+        """Write everything currently queued, in ``flush_size`` batches."""
+        total = 0
+        while True:
+            batch = self._take(self.flush_size)
+            if not batch:
+                return total
+            self._write(batch)
+            total += len(batch)
+
+    def stop(self, timeout: float | None = 5.0) -> None:
+        """Stop the background thread and flush what is left in the queue."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self.flush()
+
+    def stats(self) -> Dict[str, int]:
+        with self._count_lock:
+            submitted, dropped = self.submitted, self.dropped
+        return {
+            "queue_depth": self._queue.qsize(),
+            "submitted": submitted,
+            "dropped": dropped,
+            "written": self.written,
+            "failed": self.failed,
+            "flushes": self.flushes,
+        }
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            batch: List[Any] = []
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.flush_size and not self._stop.is_set():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            if batch:
+                self._write(batch)
+
+    def _take(self, limit: int) -> List[Any]:
+        batch: List[Any] = []
+        while len(batch) < limit:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch: List[Any]) -> None:
+        with self._write_lock:
+            try:
+                self._flush_fn(batch)
+            except Exception:
+                self.failed += len(batch)
+                logger.exception("Gagal menulis %d audit record", len(batch))
+                return
+            self.written += len(batch)
+            self.flushes += 1
@@ -0,0 +1,166 @@
+"""In-process counters, gauges and stage histograms rendered in Prometheus text format."""
+from __future__ import annotations
+
+import bisect
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Tuple
+
+# Batas bucket (detik) untuk tahap hot path: dari 50µs sampai 10s.
+STAGE_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 10.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Counter:
+    def __init__(self) -> None:
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+    def set(self, value: float) -> None:
+        """Mirror a total that is counted elsewhere, e.g. in a cache's own ``stats()``."""
+        with self._lock:
+            self.value = value
+
+
+class Gauge:
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class Histogram:
+    def __init__(self, buckets: Tuple[float, ...] = STAGE_BUCKETS) -> None:
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        slot = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[slot] += 1
+            self.sum += value
+            self.count += 1
+
+    def snapshot(self) -> Tuple[List[int], float, int]:
+        with self._lock:
+            return list(self.counts), self.sum, self.count
+
+
+class Registry:
+    """Named metric families, each holding one child per label set.
+
+    ``collect`` callbacks are evaluated on every :meth:`render`, which lets
+    existing ``stats()`` dicts be exported without touching their hot paths.
+    """
+
+    def __init__(self) -> None:
+        self._families: Dict[str, Tuple[str, str, Dict[Labels, object]]] = {}
+        self._collectors: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+
+    def _child(self, kind: str, name: str, help_text: str, labels: Dict[str, str], factory: Callable[[], object]):
+        key: Labels = tuple(sorted(labels.items()))
+        family = self._families.get(name)
+        if family is not None:
+            child = family[2].get(key)
+            if child is not None:
+                return child
+        with self._lock:
+            family = self._families.setdefault(name, (kind, help_text, {}))
+            return family[2].setdefault(key, factory())
+
+    def counter(self, name: str, help_text: str = "", **labels: str) -> Counter:
+        return self._child("counter", name, help_text, labels, Counter)
+
+    def gauge(self, name: str, help_text: str = "", **labels: str) -> Gauge:
+        return self._child("gauge", name, help_text, labels, Gauge)
+
+    def histogram(self, name: str, help_text: str = "", **labels: str) -> Histogram:
+        return self._child("histogram", name, help_text, labels, Histogram)
+
+    def add_collector(self, collect: Callable[[], None]) -> None:
+        self._collectors.append(collect)
+
+    def render(self) -> str:
+        for collect in self._collectors:
+            collect()
+        lines: List[str] = []
+        with self._lock:
+            families = sorted((name, kind, help_text, dict(children)) for name, (kind, help_text, children) in self._families.items())
+        for name, kind, help_text, children in families:
+            if help_text:
+                lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for key, child in sorted(children.items()):
+                if kind == "histogram":
+                    counts, total, count = child.snapshot()
+                    cumulative = 0
+                    for bound, bucket_count in zip(child.buckets + (float("inf"),), counts):
+                        cumulative += bucket_count
+                        le = "+Inf" if bound == float("inf") else repr(bound)
+                        lines.append(f"{name}_bucket{_labels(key + (('le', le),))} {cumulative}")
+                    lines.append(f"{name}_sum{_labels(key)} {total!r}")
+                    lines.append(f"{name}_count{_labels(key)} {count}")
+                else:
+                    lines.append(f"{name}{_labels(key)} {_number(child.value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _labels(key: Labels) -> str:
+    if not key:
+        return ""
+    parts = []
+    for name, value in key:
+        value = value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        parts.append(f'{name}="{value}"')
+    return "{" + ",".join(parts) + "}"
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+registry = Registry()
+
+# Rincian per request (stage -> detik); None di luar request yang meminta Server-Timing.
+_breakdown: contextvars.ContextVar[Dict[str, float] | None] = contextvars.ContextVar("stage_breakdown", default=None)
+
+
+@contextmanager
+def stage(name: str, path: str = "api") -> Iterator[None]:
+    """Time a block into ``eq_stage_seconds{path,stage}`` and the current breakdown."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        registry.histogram("eq_stage_seconds", "Durasi per tahap pipeline rekomendasi.", path=path, stage=name).observe(elapsed)
+        breakdown = _breakdown.get()
+        if breakdown is not None:
+            breakdown[name] = breakdown.get(name, 0.0) + elapsed
+
+
+def start_breakdown() -> contextvars.Token:
+    return _breakdown.set({})
+
+
+def finish_breakdown(token: contextvars.Token) -> Dict[str, float]:
+    breakdown = _breakdown.get() or {}
+    _breakdown.reset(token)
+    return breakdown
+
+
+def server_timing(breakdown: Dict[str, float]) -> str:
+    """Format a breakdown as a ``Server-Timing`` header value (milliseconds)."""
+    return ", ".join(f"{name};dur={seconds * 1000:.3f}" for name, seconds in breakdown.items())
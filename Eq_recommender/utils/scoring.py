@@ -3,6 +3,8 @@ from __future__ import annotations
 
 from typing import Dict
 
+import numpy as np
+
 from .models import EquipmentKit, Preference
 
 
@@ -38,3 +40,16 @@ def score_kit(kit: EquipmentKit, pref: Preference) -> Dict[str, float]:
         score += {"high": 1.0, "medium": 0.5}.get(kit.stabilization, 0.0)
 
     return {"name": kit.name, "score": score, "kit": kit}
+
+
+def top_k_positions(positions: np.ndarray, scores: np.ndarray, k: int) -> np.ndarray:
+    """Positions of the ``k`` highest scores via partial sort.
+
+    Ties keep their original order, exactly like ``sorted(..., reverse=True)``.
+    """
+    if len(scores) > k > 0:
+        threshold = np.partition(scores, len(scores) - k)[len(scores) - k]
+        keep = scores >= threshold
+        positions, scores = positions[keep], scores[keep]
+    order = np.argsort(-scores, kind="stable")[: max(k, 0)]
+    return positions[order]
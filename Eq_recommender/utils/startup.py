@@ -0,0 +1,68 @@
+"""Deferred imports of heavy dependencies and a record of startup costs.
+
+scikit-learn, scipy dan stemmer Sastrawi baru dimuat saat pertama dipakai
+(atau oleh ``app.warm_up()`` di server), jadi perintah CLI dan job impor
+yang tidak pernah membuat rekomendasi tidak membayar biayanya. Setiap impor
+tertunda dan langkah inisialisasi dicatat di sini untuk laporan startup.
+"""
+from __future__ import annotations
+
+import importlib
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from types import ModuleType
+from typing import Dict, Iterator, List, Tuple
+
+from utils.metrics import registry
+
+_timings: Dict[str, float] = {}
+_lock = threading.Lock()
+
+
+def record(name: str, seconds: float) -> None:
+    """Keep the first measurement of ``name``; later repeats are not startup cost."""
+    with _lock:
+        _timings.setdefault(name, seconds)
+
+
+@contextmanager
+def timed(name: str) -> Iterator[None]:
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - started)
+
+
+def lazy_import(name: str) -> ModuleType:
+    """``importlib.import_module`` that records how long a first import took."""
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    with timed(f"import {name}"):
+        return importlib.import_module(name)
+
+
+def report() -> List[Tuple[str, float]]:
+    """``(step, seconds)`` in the order the steps happened."""
+    with _lock:
+        return list(_timings.items())
+
+
+def render_report() -> str:
+    rows = report()
+    if not rows:
+        return "Startup: belum ada langkah tercatat"
+    width = max(len(name) for name, _ in rows)
+    lines = [f"  {name:<{width}}  {seconds * 1000:9.1f} ms" for name, seconds in rows]
+    return "\n".join(["Startup:", *lines])
+
+
+def _collect() -> None:
+    for name, seconds in report():
+        registry.gauge("eq_startup_seconds", "Durasi impor/inisialisasi saat startup", step=name).set(seconds)
+
+
+registry.add_collector(_collect)
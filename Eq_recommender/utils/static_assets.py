@@ -0,0 +1,107 @@
+"""Fingerprinted, precompressed static assets for the SPA."""
+from __future__ import annotations
+
+import gzip
+import hashlib
+import mimetypes
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Tuple
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+@dataclass(frozen=True, slots=True)
+class Asset:
+    name: str
+    fingerprinted: str
+    mimetype: str
+    etag: str
+    mtime_ns: int
+    body: bytes
+    encoded: Dict[str, bytes]
+
+    def negotiate(self, accept_encoding: str) -> Tuple[bytes, str | None]:
+        """Pick the best precompressed body for an ``Accept-Encoding`` header.
+
+        The highest q-value wins (``br`` before ``gzip`` on a tie); encodings
+        with ``q=0``, explicit or via ``*;q=0``, are never sent.
+        """
+        weights = _accept_weights(accept_encoding)
+
+        def weight(encoding: str) -> float:
+            return weights.get(encoding, weights.get("*", 0.0))
+
+        candidates = [encoding for encoding in ("br", "gzip") if encoding in self.encoded and weight(encoding) > 0]
+        if not candidates:
+            return self.body, None
+        best = max(candidates, key=weight)  # max() menyimpan yang pertama saat seri: br
+        return self.encoded[best], best
+
+
+def _accept_weights(header: str) -> Dict[str, float]:
+    """``{coding: q}`` of an ``Accept-Encoding`` header; a malformed q counts as 0."""
+    weights: Dict[str, float] = {}
+    for part in (header or "").lower().split(","):
+        coding, _, params = part.partition(";")
+        coding = coding.strip()
+        if not coding:
+            continue
+        weight = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    weight = min(max(float(value), 0.0), 1.0)
+                except ValueError:
+                    weight = 0.0
+        weights[coding] = weight
+    return weights
+
+
+def build_asset(name: str, body: bytes, mtime_ns: int = 0) -> Asset:
+    digest = hashlib.sha256(body).hexdigest()
+    stem, dot, suffix = name.rpartition(".")
+    fingerprinted = f"{stem}.{digest[:12]}.{suffix}" if dot else f"{name}.{digest[:12]}"
+    encoded = {"gzip": gzip.compress(body, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        encoded["br"] = brotli.compress(body)
+    return Asset(
+        name=name,
+        fingerprinted=fingerprinted,
+        mimetype=mimetypes.guess_type(name)[0] or "application/octet-stream",
+        etag=digest[:32],
+        mtime_ns=mtime_ns,
+        body=body,
+        encoded=encoded,
+    )
+
+
+class AssetBundle:
+    """Compresses the given files once and re-reads them only when their mtime changes."""
+
+    def __init__(self, directory: Path | str, names: Iterable[str]) -> None:
+        self.directory = Path(directory)
+        self.names = tuple(names)
+        self._assets: Dict[str, Asset] = {}
+        self._lock = threading.Lock()
+
+    def assets(self) -> Dict[str, Asset]:
+        with self._lock:
+            for name in self.names:
+                path = self.directory / name
+                mtime_ns = path.stat().st_mtime_ns
+                current = self._assets.get(name)
+                if current is None or current.mtime_ns != mtime_ns:
+                    self._assets[name] = build_asset(name, path.read_bytes(), mtime_ns)
+            return dict(self._assets)
+
+    def by_fingerprint(self, fingerprinted: str) -> Asset | None:
+        for asset in self.assets().values():
+            if asset.fingerprinted == fingerprinted:
+                return asset
+        return None